@@ -39,7 +39,11 @@ class ContextMenuManager:
         elif obj_type == "wire_node":
             wire = obj.parent
             self.menu.add_command(label="Add Node", command=lambda: self.app.add_node_to_wire(wire, event.x, event.y))
+            self.menu.add_command(label="Route Wire", command=lambda: self.app.route_wires([wire]))
+            self.menu.add_command(label="Select Net", command=lambda: self.app.select_net(obj))
             self.menu.add_command(label="Delete Wire", command=lambda: self.app.delete_object(wire))
+        elif obj_type == "pin_node":
+            self.menu.add_command(label="Select Net", command=lambda: self.app.select_net(obj))
         elif obj_type is None:
             self.menu.add_command(label="Paste", command=self.app.paste)
             self.menu.add_command(label="Add Wire", command=self.app.wire_mode)
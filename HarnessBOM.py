@@ -0,0 +1,292 @@
+"""
+This module builds the bill of materials for a harness.
+
+Connectors are counted by part number and image; wires are counted and their lengths totalled by
+gauge, color and part number. The totals are built in one pass over `HDF.connectors` and
+`HDF.wires` and can then be kept up to date incrementally as objects are added, edited or removed,
+following the model events of the bus.
+"""
+
+import csv
+import json
+
+import HarnessModel
+from HarnessEvents import CREATED, DELETED, MOVED, FLIPPED, CHANGED, RESET
+
+# The kinds of events that change the bill of materials.
+EVENT_KINDS = (CREATED, DELETED, MOVED, FLIPPED, CHANGED, RESET)
+
+HEADERS = ["Type", "Part Number", "Description", "Gauge", "Color", "Quantity", "Length"]
+
+
+class BillOfMaterials():
+    """
+    Aggregated connector counts and wire length totals for a harness.
+
+    A bill of materials given a drawing frame follows the model events of the bus: subscribe its
+    `on_events` with EVENT_KINDS. Changed objects are recounted when the totals are next read, so
+    the wire lengths the editor updates after an event are the ones totalled.
+    """
+    def __init__(self, connectors=(), wires=(), frame=None):
+        """
+        Initializes the BillOfMaterials.
+
+        Args:
+            connectors (iterable, optional): The connectors to count. Defaults to ().
+            wires (iterable, optional): The wires to total. Defaults to ().
+            frame (DrawFrame, optional): The drawing frame whose harness is followed, instead of
+                the connectors and wires given. Defaults to None.
+        """
+        self.frame = frame
+        self.connector_counts = {}
+        self.wire_totals = {}
+        self._connector_keys = {}
+        self._wire_entries = {}
+        # The lengths of the wires of each (gauge, color, part number) group, the wires taken out
+        # of each group since its total was last summed, the wires attached to each connector and
+        # the changed objects.
+        self._groups = {}
+        self._removed = {}
+        self._attached = {}
+        self._dirty = {}
+        self._stale = frame is not None
+        if frame is None:
+            self.build(connectors, wires)
+
+    def build(self, connectors, wires):
+        """
+        Rebuilds the totals from scratch in a single pass.
+        """
+        self.connector_counts.clear()
+        self.wire_totals.clear()
+        self._connector_keys.clear()
+        self._wire_entries.clear()
+        self._groups.clear()
+        self._removed.clear()
+        self._attached.clear()
+        self._dirty.clear()
+        self._stale = False
+
+        counts = self.connector_counts
+        keys = self._connector_keys
+        for c in connectors:
+            key = (c.partNumber, c.imageFile)
+            keys[c] = key
+            counts[key] = counts.get(key, 0) + 1
+
+        for w in wires:
+            self._add_wire(w)
+
+    def on_events(self, events):
+        """
+        Notes the objects changed by a batch of model events, to recount them when the totals are
+        next read.
+        """
+        if self._stale:
+            return
+        for e in events:
+            obj = e.obj
+            if e.kind == RESET:
+                self._stale = True
+                return
+            if e.kind == DELETED:
+                self._dirty.pop(obj, None)
+                if isinstance(obj, HarnessModel.Connector):
+                    self.remove_connector(obj)
+                elif isinstance(obj, HarnessModel.Wire):
+                    self.remove_wire(obj)
+            elif isinstance(obj, HarnessModel.Connector):
+                if e.kind in (MOVED, FLIPPED):
+                    for wire in self._attached.get(obj, ()):
+                        self._dirty[wire] = None
+                else:
+                    self._dirty[obj] = None
+            elif isinstance(obj, HarnessModel.Wire):
+                self._dirty[obj] = None
+            elif isinstance(obj, HarnessModel.Node) and isinstance(obj.parent, HarnessModel.Wire):
+                self._dirty[obj.parent] = None
+
+    def invalidate(self):
+        """
+        Marks the totals to be rebuilt from the harness when next read, as after every wire
+        length was recomputed.
+        """
+        if self.frame is not None:
+            self._stale = True
+
+    def refresh(self):
+        """
+        Brings the totals up to date with the harness followed.
+        """
+        if self._stale:
+            self.build(self.frame.connectors, self.frame.wires)
+            return
+        dirty = self._dirty
+        self._dirty = {}
+        for obj in dirty:
+            if isinstance(obj, HarnessModel.Connector):
+                self.update_connector(obj)
+            else:
+                self.update_wire(obj)
+
+    def add_connector(self, connector):
+        """
+        Counts a connector. A connector that is already counted is updated instead.
+        """
+        if connector in self._connector_keys:
+            self.remove_connector(connector)
+        key = (connector.partNumber, connector.imageFile)
+        self._connector_keys[connector] = key
+        self.connector_counts[key] = self.connector_counts.get(key, 0) + 1
+
+    def remove_connector(self, connector):
+        """
+        Stops counting a connector.
+        """
+        key = self._connector_keys.pop(connector, None)
+        if key is None:
+            return
+        self.connector_counts[key] -= 1
+        if self.connector_counts[key] == 0:
+            del self.connector_counts[key]
+
+    def update_connector(self, connector):
+        """
+        Updates the totals after a connector's part number or image changed.
+        """
+        self.add_connector(connector)
+
+    def _add_wire(self, wire):
+        """
+        Totals a wire that is not yet totalled.
+        """
+        key = (wire.gauge, wire.color, wire.partnumber)
+        length = wire.get_total_length()
+        ends = [end.parent for end in wire.nodes[:1] + wire.nodes[-1:]
+                if isinstance(end.parent, HarnessModel.Connector)]
+        self._wire_entries[wire] = (key, ends)
+        self._groups.setdefault(key, {})[wire] = length
+        total = self.wire_totals.get(key)
+        if total is None:
+            self.wire_totals[key] = [1, length]
+        else:
+            total[0] += 1
+            total[1] += length
+        for connector in ends:
+            self._attached.setdefault(connector, {})[wire] = None
+
+    def add_wire(self, wire):
+        """
+        Totals a wire. A wire that is already totalled is updated instead.
+        """
+        if wire in self._wire_entries:
+            self.remove_wire(wire)
+        self._add_wire(wire)
+
+    def remove_wire(self, wire):
+        """
+        Stops totalling a wire.
+
+        The wire's length is subtracted from its group's total. Once as many wires have been taken
+        out of a group as it has left, the total is summed again from the lengths left, so it does
+        not drift from a total built from scratch; that costs no more than the removals did.
+        """
+        entry = self._wire_entries.pop(wire, None)
+        if entry is None:
+            return
+        key, ends = entry
+        group = self._groups[key]
+        length = group.pop(wire)
+        if group:
+            total = self.wire_totals[key]
+            total[0] -= 1
+            total[1] -= length
+            removed = self._removed.get(key, 0) + 1
+            if removed >= len(group):
+                total[1] = sum(group.values())
+                removed = 0
+            self._removed[key] = removed
+        else:
+            del self._groups[key]
+            del self.wire_totals[key]
+            self._removed.pop(key, None)
+        for connector in ends:
+            wires = self._attached.get(connector)
+            if wires is not None:
+                wires.pop(wire, None)
+                if not wires:
+                    del self._attached[connector]
+
+    def update_wire(self, wire):
+        """
+        Updates the totals after a wire's gauge, color, part number or length changed.
+        """
+        self.add_wire(wire)
+
+    def rows(self):
+        """
+        Returns the bill of materials rows, in the order of `HEADERS`.
+        """
+        self.refresh()
+        rows = []
+        for (partnumber, image), count in sorted(self.connector_counts.items()):
+            rows.append(["connector", partnumber, image, "", "", count, ""])
+        for (gauge, color, partnumber), (count, length) in sorted(self.wire_totals.items()):
+            rows.append(["wire", partnumber, "", gauge, color, count, round(length, 3)])
+        return rows
+
+    def to_dict(self):
+        """
+        Returns a dictionary representation of the bill of materials.
+        """
+        self.refresh()
+        return {
+            "connectors": [
+                {"partnumber": partnumber, "image": image, "quantity": count}
+                for (partnumber, image), count in sorted(self.connector_counts.items())
+            ],
+            "wires": [
+                {"gauge": gauge, "color": color, "partnumber": partnumber, "quantity": count,
+                 "length": round(length, 3)}
+                for (gauge, color, partnumber), (count, length) in sorted(self.wire_totals.items())
+            ],
+        }
+
+    def to_csv(self, filepath):
+        """
+        Writes the bill of materials to a CSV file.
+        """
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(self.rows())
+
+    def to_json(self, filepath):
+        """
+        Writes the bill of materials to a JSON file.
+        """
+        with open(filepath, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def write(self, filepath):
+        """
+        Writes the bill of materials to a CSV or, for a `.json` path, a JSON file.
+        """
+        if filepath.lower().endswith(".json"):
+            self.to_json(filepath)
+        else:
+            self.to_csv(filepath)
+
+
+def bom_rows(connectors, wires):
+    """
+    Returns the bill of materials rows for a harness, in the order of `HEADERS`.
+    """
+    return BillOfMaterials(connectors, wires).rows()
+
+
+def write_bom(filepath, connectors, wires):
+    """
+    Writes the bill of materials for a harness to a CSV or, for a `.json` path, a JSON file.
+    """
+    BillOfMaterials(connectors, wires).write(filepath)
@@ -7,6 +7,7 @@ import tkinter.ttk as ttk
 import tktooltip
 import HarnessITUtils
 from HarnessComponents import Node
+from HarnessEvents import bus, CHANGED
 
 class ConnectorProperies():
     """
@@ -79,6 +80,8 @@ class WireProperies():
         self.parent = parent
         self.frame = tk.Frame(self.parent, height=200)
         self.length_entries = []
+        self.loop_widgets = []
+        self.loop_entries = []
         self.component = None
 
         self.titleLabel = ttk.Label(self.frame, text="Wire prop.")
@@ -141,18 +144,37 @@ class WireProperies():
             self.length_entries.append(entry)
             row += 2
 
+        for widget in self.loop_widgets:
+            widget.destroy()
+        self.loop_widgets.clear()
+        self.loop_entries.clear()
+
+        for end, allowance in zip(("Start", "End"), component.service_loops):
+            label = ttk.Label(self.frame, text=f"{end} Service Loop")
+            label.grid(column=0, row=row, sticky="n")
+            entry = ttk.Entry(self.frame, width=20)
+            entry.grid(column=0, row=row+1, sticky="n")
+            entry.insert(0, str(allowance))
+            self.loop_widgets.extend([label, entry])
+            self.loop_entries.append(entry)
+            row += 2
+
 
     def save(self):
         """
         Saves the properties of the wire.
         """
         if self.component:
-            self.component.set_name(self.nameTextBox.get())
-            self.component.set_color(self.colorChooser.get())
-            self.component.set_gauge(self.gaugeChooser.get())
+            with bus.transaction():
+                self.component.set_name(self.nameTextBox.get())
+                self.component.set_color(self.colorChooser.get())
+                self.component.set_gauge(self.gaugeChooser.get())
 
-            for i, entry in enumerate(self.length_entries):
-                self.component.lengths[i] = int(entry.get())
+                for i, entry in enumerate(self.length_entries):
+                    self.component.lengths[i] = float(entry.get())
+                for i, entry in enumerate(self.loop_entries):
+                    self.component.service_loops[i] = float(entry.get())
+                bus.emit(CHANGED, self.component, property="lengths")
 
     def add_node(self):
         """
@@ -166,4 +188,7 @@ class WireProperies():
                 node = Node(pos, wire, 0, 0)
                 wire.nodes.insert(-1, node)
                 wire.lengths.append(0)
+                if self.app.auto_lengths.get():
+                    self.app.length_engine.update_segments(wire, (len(wire.lengths) - 2, len(wire.lengths) - 1))
+                bus.emit(CHANGED, wire, property="nodes")
                 self.load(wire)
@@ -7,6 +7,20 @@ from tkinter import ttk, filedialog, simpledialog
 import csv
 import os
 
+from HarnessProfiler import profiler
+
+LIBRARY_FILE = 'resources/library/Connectors.csv'
+
+
+def write_library_csv(filepath, rows):
+    """
+    Writes connector library rows to a CSV file.
+    """
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
 class ConnectorLibrary():
     """
     The connector library window for the HarnessIT application.
@@ -114,6 +128,7 @@ class ConnectorLibrary():
         self.filtered_library = self.app.library
         self.load_library_table()
 
+    @profiler.timed("library table")
     def load_library_table(self):
         """
         Loads the connector library table with the filtered data.
@@ -147,12 +162,11 @@ class ConnectorLibrary():
             self.clear_filter()
 
     def save_library_to_csv(self):
-        """Saves the library to the CSV file."""
-        filepath = 'resources/library/Connectors.csv'
-        with open(filepath, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=self.app.library[0].keys())
-            writer.writeheader()
-            writer.writerows(self.app.library)
+        """Saves a copy of the library to the CSV file in the background."""
+        rows = [dict(row) for row in self.app.library]
+        self.app.jobs.submit("Saving library", write_library_csv, LIBRARY_FILE, rows,
+                             on_done=lambda result: self.app._set_status("Saved the connector library"),
+                             on_error=self.app._job_failed)
 
 
 class AddConnectorDialog:
@@ -0,0 +1,120 @@
+"""
+This module builds the cut sheet for a harness.
+"""
+
+import csv
+
+import HarnessModel
+
+HEADERS = ["From Connector", "From Pin", "Wire Name", "Length", "Color", "To Pin", "To Connector"]
+
+
+def cut_sheet_row(wire):
+    """
+    Returns the cut sheet row for a wire, in the order of `HEADERS`.
+    """
+    return [
+        wire.nodes[0].get_name(),
+        wire.nodes[0].get_display_pin(),
+        wire.name,
+        round(wire.get_total_length(), 3),
+        wire.get_color(),
+        wire.nodes[-1].get_display_pin(),
+        wire.nodes[-1].get_name(),
+    ]
+
+
+def cut_sheet_rows(wires):
+    """
+    Returns the cut sheet rows for a list of wires.
+    """
+    return [cut_sheet_row(w) for w in wires]
+
+
+def write_cut_sheet(filepath, wires):
+    """
+    Writes the cut sheet for a list of wires to a CSV file.
+    """
+    write_cut_sheet_rows(filepath, cut_sheet_rows(wires))
+
+
+def write_cut_sheet_rows(filepath, rows):
+    """
+    Writes cut sheet rows, as from `cut_sheet_rows`, to a CSV file.
+    """
+    with open(filepath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+
+
+def _reel(wire):
+    """
+    Returns the (gauge, color) reel a wire is cut from.
+    """
+    return (wire.gauge, wire.color)
+
+
+def count_changeovers(wires):
+    """
+    Counts the reel changes needed to cut wires in the given order.
+
+    Returns:
+        tuple: A tuple of (reel changes, gauge changes, color changes).
+    """
+    reels = gauges = colors = 0
+    prev = None
+    for w in wires:
+        reel = _reel(w)
+        if prev is not None and reel != prev:
+            reels += 1
+            gauges += reel[0] != prev[0]
+            colors += reel[1] != prev[1]
+        prev = reel
+    return reels, gauges, colors
+
+
+def _gauge_rank(gauge):
+    """
+    Returns the sort rank of a gauge, from thinnest to thickest.
+    """
+    order = list(HarnessModel.GAUGE)
+    return order.index(gauge) if gauge in order else len(order)
+
+
+def schedule_cut_order(wires):
+    """
+    Orders wires to minimize reel changeovers on the cutting machine.
+
+    Wires cut from the same (gauge, color) reel are grouped, so every reel is loaded once. Gauges are
+    cut from thinnest to thickest, and within a gauge the colors are chained so the first color
+    repeats the last color of the previous gauge and the last color is one the next gauge also uses,
+    saving a color change at each gauge boundary where possible. Within a reel, wires are cut
+    longest first so identical lengths are consecutive. Runs in O(n log n).
+
+    Args:
+        wires (list): The wires to order.
+
+    Returns:
+        list: The wires in cutting order.
+    """
+    groups = {}
+    for w in wires:
+        groups.setdefault(w.gauge, {}).setdefault(w.color, []).append(w)
+
+    gauges = sorted(groups, key=_gauge_rank)
+    ordered = []
+    prev_color = None
+    for i, gauge in enumerate(gauges):
+        colors = sorted(groups[gauge], key=lambda c: (-len(groups[gauge][c]), c))
+        next_colors = groups[gauges[i + 1]] if i + 1 < len(gauges) else {}
+
+        first = prev_color if prev_color in groups[gauge] else None
+        last = next((c for c in colors if c in next_colors and c != first), None)
+        middle = [c for c in colors if c != first and c != last]
+        chain = ([first] if first is not None else []) + middle + ([last] if last is not None else [])
+
+        for color in chain:
+            ordered.extend(sorted(groups[gauge][color], key=lambda w: -w.get_total_length()))
+        prev_color = chain[-1]
+    return ordered
@@ -7,9 +7,208 @@ import tkinter
 import pygame
 import tkinter as tk
 import os
+import math
 
 import HarnessComponents
 import HarnessITUtils
+import HarnessSelection
+from collections import OrderedDict
+from HarnessProfiler import profiler
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Zoom levels below which the drawing switches to the mid and far levels of detail.
+LOD_MID_ZOOM = 0.75
+LOD_FAR_ZOOM = 0.3
+# The grid is not drawn when its lines would be closer together than this, in pixels.
+MIN_GRID_SPACING = 5
+IMAGE_CACHE_SIZE = 256
+# Atlases are built at scales a fixed step apart, this many steps to each doubling, and drawn at the
+# zoom levels in between by scaling the whole atlas at once. Atlases are kept for this many scales,
+# are at most this wide, and leave this many pixels between images, so scaling does not bleed one
+# image into the next.
+ATLAS_SCALE_STEPS = 4
+ATLAS_CACHE_SIZE = 4
+ATLAS_WIDTH = 1024
+ATLAS_PADDING = 2
+# Screen pixels by which culling grows the drawn area, to keep labels, pins and node handles that
+# stick out of an object's bounds.
+CULL_MARGIN = 100
+# Selections with more items than this are outlined with rects instead of image outlines.
+OUTLINE_IMAGE_LIMIT = 64
+# Far-zoom wires are splatted into the pixels only while their segments average at most this many
+# pixels; longer segments are drawn faster by pygame's own line drawing.
+SPLAT_MAX_STEPS = 8
+
+
+class Setting():
+    """
+    A plain value with the `get`/`set` interface of the Tk variables the app uses for its options.
+    """
+    def __init__(self, value):
+        """
+        Initializes the Setting.
+        """
+        self.value = value
+
+    def get(self):
+        """
+        Gets the value.
+        """
+        return self.value
+
+    def set(self, value):
+        """
+        Sets the value.
+        """
+        self.value = value
+
+
+class RenderOptions():
+    """
+    The display options a DrawFrame reads from the app, for drawing without the main window.
+    """
+    def __init__(self, grid_visible=True, grid_size=25, wire_names=False, connector_names=False, pin_numbers=True,
+                 state="selecting"):
+        """
+        Initializes the RenderOptions.
+
+        Args:
+            grid_visible (bool, optional): Whether to draw the grid. Defaults to True.
+            grid_size (int, optional): The grid spacing in world units. Defaults to 25.
+            wire_names (bool, optional): Whether to draw wire names. Defaults to False.
+            connector_names (bool, optional): Whether to draw connector names. Defaults to False.
+            pin_numbers (bool, optional): Whether to draw pin numbers. Defaults to True.
+            state (str, optional): The editor mode to draw for. Defaults to "selecting".
+        """
+        self.grid_visible = Setting(grid_visible)
+        self.grid_size = grid_size
+        self.view_wire_names = Setting(wire_names)
+        self.view_connector_names = Setting(connector_names)
+        self.view_pin_numbers = Setting(pin_numbers)
+        self.state = state
+        self.wirenodes = []
+
+
+class WireGeometry():
+    """
+    The world coordinates and bounding boxes of the wire nodes, gathered in one pass for drawing.
+    """
+    def __init__(self, wires):
+        """
+        Initializes the WireGeometry.
+
+        Args:
+            wires (list): The wires; wires with fewer than two nodes are left out.
+        """
+        self.wires = [w for w in wires if len(w.nodes) > 1]
+        self.nodes = [n for w in self.wires for n in w.nodes]
+        if np is None or not self.wires:
+            return
+        count = len(self.nodes)
+        self.counts = np.fromiter([len(w.nodes) for w in self.wires], dtype=np.int64, count=len(self.wires))
+        self.xs = np.fromiter([n.x for n in self.nodes], dtype=np.float64, count=count)
+        self.ys = np.fromiter([n.y for n in self.nodes], dtype=np.float64, count=count)
+        starts = np.cumsum(self.counts) - self.counts
+        self.left = np.minimum.reduceat(self.xs, starts)
+        self.right = np.maximum.reduceat(self.xs, starts)
+        self.top = np.minimum.reduceat(self.ys, starts)
+        self.bottom = np.maximum.reduceat(self.ys, starts)
+
+    def visible_points(self, view):
+        """
+        Returns the wires whose bounding box overlaps a world-space rect, and their node coordinates.
+
+        Args:
+            view (tuple): The (left, top, right, bottom) of the rect.
+
+        Returns:
+            tuple: A tuple of (wires, points), with the points of all wires in order as an (N, 2)
+            array, or as a list of (x, y) tuples without NumPy.
+        """
+        if np is None:
+            return self.wires, [(n.x, n.y) for n in self.nodes]
+        left, top, right, bottom = view
+        visible = (self.right >= left) & (self.left <= right) & (self.bottom >= top) & (self.top <= bottom)
+        node_visible = np.repeat(visible, self.counts)
+        points = np.empty((int(node_visible.sum()), 2), dtype=np.float64)
+        points[:, 0] = self.xs[node_visible]
+        points[:, 1] = self.ys[node_visible]
+        return [w for w, v in zip(self.wires, visible.tolist()) if v], points
+
+
+class ImageAtlas():
+    """
+    Scaled connector images packed into one surface, so connectors are drawn as sub-rect blits of
+    a single source.
+    """
+    def __init__(self, images, scale=1.0, smooth=False):
+        """
+        Initializes the ImageAtlas.
+
+        Args:
+            images (dict): The images to pack, keyed by (image file, direction, world size).
+            scale (float, optional): The zoom level the images are scaled for. Defaults to 1.0.
+            smooth (bool, optional): Whether the images are smooth-scaled. Defaults to False.
+        """
+        self.scale = scale
+        self.smooth = smooth
+        # The atlas scaled to the last zoom level drawn at, as (zoom, surface, rects).
+        self._view = None
+        # Shelf packing: the tallest images first, in rows no wider than ATLAS_WIDTH.
+        self.rects = {}
+        x = y = shelf = width = 0
+        for key, image in sorted(images.items(), key=lambda item: -item[1].get_height()):
+            w, h = image.get_size()
+            if x and x + w > ATLAS_WIDTH:
+                x, y, shelf = 0, y + shelf, 0
+            self.rects[key] = pygame.Rect(x, y, w, h)
+            x += w + ATLAS_PADDING
+            shelf = max(shelf, h + ATLAS_PADDING)
+            width = max(width, x)
+        self.surface = pygame.Surface((max(width, 1), max(y + shelf, 1)), pygame.SRCALPHA, 32)
+        for key, image in images.items():
+            # Onto the empty atlas, the max of each channel is an exact copy, alpha included.
+            self.surface.blit(image, self.rects[key], special_flags=pygame.BLEND_RGBA_MAX)
+        if pygame.display.get_surface() is not None:
+            # Blits are fastest from the display's pixel format.
+            self.surface = self.surface.convert_alpha()
+        self.images = images
+
+    def at_zoom(self, zoom):
+        """
+        Returns the atlas for drawing at a zoom level at or below its scale.
+
+        Below its scale the whole atlas is scaled down in one transform, kept until the zoom level
+        changes, and each image's rect is sized as the connector is drawn at that zoom level.
+
+        Returns:
+            tuple: A tuple of (surface, rects), with the rects keyed as the images.
+        """
+        if zoom == self.scale:
+            return self.surface, self.rects
+        if self._view is None or self._view[0] != zoom:
+            factor = zoom / self.scale
+            width, height = self.surface.get_size()
+            size = (max(math.ceil(width * factor), 1), max(math.ceil(height * factor), 1))
+            transform = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+            rects = {key: pygame.Rect(int(r.x * factor + 0.5), int(r.y * factor + 0.5),
+                                      max(int(key[2][0] * zoom), 1), max(int(key[2][1] * zoom), 1))
+                     for key, r in self.rects.items()}
+            self._view = (zoom, transform(self.surface, size), rects)
+        return self._view[1], self._view[2]
+
+
+def atlas_scale(zoom):
+    """
+    Returns the scale step an image atlas is built at for a zoom level: the nearest at or above it.
+    """
+    step = math.ceil(math.log2(zoom) * ATLAS_SCALE_STEPS - 1e-9)
+    return 2 ** (step / ATLAS_SCALE_STEPS)
+
 
 class DrawFrame():
     """
@@ -32,11 +231,19 @@ class DrawFrame():
         self.screen = pygame.display.set_mode()
 
         pygame.display.init()
+        self._init_view()
+
+    def _init_view(self):
+        """
+        Initializes the drawing state shared by on-screen and offscreen frames.
+        """
         pygame.font.init()
         self.font = pygame.font.SysFont(None, 24)
 
 
-        self.selected = []
+        self._selected = HarnessSelection.Selection()
+        # The rubber band being dragged out, as (left, top, right, bottom) in world coordinates.
+        self.band = None
 
         self.connectors = []
         self.wires =[]
@@ -44,12 +251,54 @@ class DrawFrame():
         self.zoom_level = 1.0
         self.view_offset = [0, 0]
 
+        self._image_cache = OrderedDict()
+        self._image_colors = {}
+        self._atlases = OrderedDict()
+
+        # State for repainting only what changed; see `refresh`.
+        self._dirty = True
+        self._fingerprint = None
+        self._pending_pan = [0, 0]
+        self._geometry = None
+        self.spatial = HarnessSelection.SpatialIndex(self)
+
+        # An overlay with draw(screen), update() and rect(), such as a HarnessMiniMap.MiniMap.
+        self.minimap = None
+        # An overlay with shown(), update(), rect() and draw(screen), such as a
+        # HarnessProfiler.ProfilerHUD, and the pixels it covers.
+        self.hud = None
+        self._hud_background = None
+
     def world_to_screen(self, x, y):
         """Converts world coordinates to screen coordinates."""
         screen_x = (x - self.view_offset[0]) * self.zoom_level
         screen_y = (y - self.view_offset[1]) * self.zoom_level
         return int(screen_x), int(screen_y)
 
+    def world_to_screen_array(self, points):
+        """
+        Converts an (N, 2) array of world coordinates to screen coordinates in one operation.
+
+        Returns:
+            list: The screen coordinates as [x, y] lists, truncated like `world_to_screen`.
+        """
+        if np is None:
+            return [list(self.world_to_screen(x, y)) for x, y in points]
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return ((points - self.view_offset) * self.zoom_level).astype(np.int64).tolist()
+
+    def node_points(self, nodes):
+        """
+        Returns the screen coordinates of a list of nodes, transformed in one batch.
+        """
+        if np is None:
+            return [list(self.world_to_screen(n.x, n.y)) for n in nodes]
+        count = len(nodes)
+        points = np.empty((count, 2), dtype=np.float64)
+        points[:, 0] = np.fromiter([n.x for n in nodes], dtype=np.float64, count=count)
+        points[:, 1] = np.fromiter([n.y for n in nodes], dtype=np.float64, count=count)
+        return self.world_to_screen_array(points)
+
     def screen_to_world(self, x, y):
         """Converts screen coordinates to world coordinates."""
         world_x = x / self.zoom_level + self.view_offset[0]
@@ -80,18 +329,259 @@ class DrawFrame():
         self.view_offset[1] += mouse_pos_before_zoom[1] - mouse_pos_after_zoom[1]
 
 
-    def draw(self):
+    def pan(self, dx, dy):
+        """
+        Moves the view by a number of screen pixels.
+
+        The offset changes by a whole number of pixels so the previous frame can be shifted by
+        `refresh` instead of repainted.
+        """
+        dx, dy = int(dx), int(dy)
+        self.view_offset[0] -= dx / self.zoom_level
+        self.view_offset[1] -= dy / self.zoom_level
+        self._pending_pan[0] += dx
+        self._pending_pan[1] += dy
+
+    @property
+    def selected(self):
+        """
+        The selected objects, as a `HarnessSelection.Selection`. Assigning a list replaces its
+        contents.
+        """
+        return self._selected
+
+    @selected.setter
+    def selected(self, objects):
+        self._selected[:] = objects
+
+    def invalidate(self):
+        """
+        Marks the frame for a full repaint on the next `refresh`.
+        """
+        self._dirty = True
+        self.spatial.invalidate()
+        if self.minimap is not None:
+            self.minimap.mark_stale()
+
+    def model_revision(self):
+        """
+        Returns a value that changes whenever objects are added or removed or an undoable edit is
+        made or undone.
+        """
+        undo_manager = getattr(self.app, "undo_manager", None)
+        history = ()
+        if undo_manager is not None:
+            top = undo_manager.undo_stack[-1] if undo_manager.undo_stack else None
+            history = (len(undo_manager.undo_stack), len(undo_manager.redo_stack), id(top))
+        return len(self.connectors), len(self.wires), history
+
+    def fingerprint(self):
+        """
+        Returns a value that changes whenever the harness or the way it is drawn changes, other than
+        by panning.
+
+        Moving a connector or node by dragging does not change it; the code that moves them calls
+        `invalidate` instead.
+        """
+        return (self.zoom_level, self.screen.get_size(), self.model_revision(), self._minimap_shown(),
+                self._selected.revision, self.band, self.app.state, len(self.app.wirenodes),
+                self.app.grid_visible.get(), self.app.grid_size, self.app.view_wire_names.get(),
+                self.app.view_connector_names.get(), self.app.view_pin_numbers.get())
+
+    def _minimap_shown(self):
+        """
+        Returns whether the mini-map is drawn on top of the frame.
+        """
+        return self.minimap is not None and self.minimap.visible.get()
+
+    def refresh(self):
+        """
+        Brings the screen up to date, doing as little drawing as possible.
+
+        The previous frame stays on the screen surface. After a pure pan it is shifted with
+        `Surface.scroll` and only the newly exposed strips are drawn; a changed fingerprint or an
+        `invalidate` call repaints everything, and otherwise nothing is drawn. The mini-map, if
+        shown, is drawn on top and the area it covered before a pan is repainted. The HUD, if shown,
+        is drawn on top of everything every time, over the pixels it covered, which are put back
+        first.
+
+        Returns:
+            bool: True if anything was drawn.
+        """
+        if self._hud_background is not None:
+            self.screen.blit(*self._hud_background)
+            self._hud_background = None
+        with profiler.timer("refresh"):
+            drawn = self._repaint()
+        if self.hud is None or not self.hud.shown():
+            return drawn
+        self.hud.update()
+        rect = self.hud.rect().clip(self.screen.get_rect())
+        self._hud_background = (self.screen.subsurface(rect).copy(), rect)
+        self.hud.draw(self.screen)
+        return True
+
+    def _repaint(self):
+        """
+        Brings the harness and the mini-map on the screen up to date; see `refresh`.
+
+        Returns:
+            bool: True if anything was drawn.
+        """
+        fingerprint = self.fingerprint()
+        minimap = self.minimap if self._minimap_shown() else None
+        dx, dy = self._pending_pan
+        self._pending_pan = [0, 0]
+        width, height = self.screen.get_size()
+        if self._dirty or fingerprint != self._fingerprint or abs(dx) >= width or abs(dy) >= height:
+            self._dirty = False
+            self._fingerprint = fingerprint
+            self._geometry = None
+            for c in self.connectors:
+                c.update()
+            self.draw()
+            if minimap is not None:
+                minimap.update()
+                minimap.draw(self.screen)
+            return True
+        if not dx and not dy:
+            if minimap is not None and minimap.update():
+                minimap.draw(self.screen)
+                return True
+            return False
+
+        # The harness has not changed since the last full repaint, so its wire geometry is reused.
+        if self._geometry is None:
+            self._geometry = WireGeometry(self.wires)
+        self.screen.scroll(dx, dy)
+        strips = []
+        if dx > 0:
+            strips.append(pygame.Rect(0, 0, dx, height))
+        elif dx < 0:
+            strips.append(pygame.Rect(width + dx, 0, -dx, height))
+        if dy > 0:
+            strips.append(pygame.Rect(0, 0, width, dy))
+        elif dy < 0:
+            strips.append(pygame.Rect(0, height + dy, width, -dy))
+        if minimap is not None:
+            # The mini-map was scrolled along with the frame; paint the harness where it went and
+            # under where it stays.
+            strips.append(minimap.rect().move(dx, dy).clip(self.screen.get_rect()))
+            strips.append(minimap.rect())
+        for strip in strips:
+            self.screen.set_clip(strip)
+            self.draw(self._geometry)
+        self.screen.set_clip(None)
+        if minimap is not None:
+            minimap.update()
+            minimap.draw(self.screen)
+        return True
+
+    def lod_tier(self):
+        """
+        Returns the level of detail to draw at the current zoom level.
+
+        Returns:
+            str: "full", "mid" (no pin numbers, cached smoothed images) or "far" (connectors as filled
+            rects, no pins or labels, wires as batched one-pixel polylines).
+        """
+        if self.zoom_level < LOD_FAR_ZOOM:
+            return "far"
+        if self.zoom_level < LOD_MID_ZOOM:
+            return "mid"
+        return "full"
+
+    def scaled_image(self, connector, size, smooth=False):
+        """
+        Returns a connector's image scaled to a size, from a cache shared by every connector with the
+        same image and direction.
+        """
+        size = (max(size[0], 1), max(size[1], 1))
+        key = (connector.imageFile, connector.direction, size, smooth)
+        image = self._image_cache.get(key)
+        if image is None:
+            image = self._scale_image(connector, size, smooth)
+            self._image_cache[key] = image
+            if len(self._image_cache) > IMAGE_CACHE_SIZE:
+                self._image_cache.popitem(last=False)
+        else:
+            self._image_cache.move_to_end(key)
+        return image
+
+    def _scale_image(self, connector, size, smooth):
+        """
+        Returns a connector's image scaled to a size.
+        """
+        if smooth:
+            return pygame.transform.smoothscale(connector.image.convert_alpha(), size)
+        return pygame.transform.scale(connector.image, size)
+
+    def image_atlas(self, connectors, smooth=False):
+        """
+        Returns the image atlas for the current zoom level, with the images of the given connectors.
+
+        The atlas is built at the nearest scale step at or above the zoom level, so zooming within a
+        step reuses it; `ImageAtlas.at_zoom` scales it to the zoom level. Atlases are kept for the
+        last few scales. An atlas that lacks an image is rebuilt with it added, which only happens
+        when a new kind of connector comes into view.
+
+        Returns:
+            ImageAtlas: The atlas, with its rects keyed by (image file, direction, world size).
+        """
+        scale = atlas_scale(self.zoom_level)
+        key = (scale, smooth)
+        atlas = self._atlases.get(key)
+        images = None
+        for c in connectors:
+            world_size = (c.rect.width, c.rect.height)
+            image_key = (c.imageFile, c.direction, world_size)
+            if atlas is None or image_key not in atlas.rects:
+                if images is None:
+                    images = dict(atlas.images) if atlas is not None else {}
+                if image_key not in images:
+                    size = (max(int(world_size[0] * scale), 1), max(int(world_size[1] * scale), 1))
+                    images[image_key] = self._scale_image(c, size, smooth)
+        if images is not None:
+            atlas = ImageAtlas(images, scale, smooth)
+            self._atlases[key] = atlas
+            if len(self._atlases) > ATLAS_CACHE_SIZE:
+                self._atlases.popitem(last=False)
+        elif atlas is None:
+            atlas = ImageAtlas({})
+        else:
+            self._atlases.move_to_end(key)
+        return atlas
+
+    def image_color(self, connector):
+        """
+        Returns the average color of a connector's image, used to draw it as a filled rect.
+        """
+        color = self._image_colors.get(connector.imageFile)
+        if color is None:
+            color = pygame.transform.average_color(connector.image)[:3]
+            self._image_colors[connector.imageFile] = color
+        return color
+
+    @profiler.timed("draw")
+    def draw(self, geometry=None):
         """
         Draws the harness components on the screen.
+
+        Only the screen's clip area is drawn, and only what overlaps it is processed.
+
+        Args:
+            geometry (WireGeometry, optional): The wire geometry, if it is already built.
         """
         self.screen.fill(pygame.Color(100, 100, 100))
-        
-        # Draw grid
-        if self.app.grid_visible.get():
+        tier = self.lod_tier()
+
+        # Draw grid, unless its lines would be too close together to tell apart
+        if self.app.grid_visible.get() and self.app.grid_size * self.zoom_level >= MIN_GRID_SPACING:
             grid_size = self.app.grid_size
+            clip = self.screen.get_clip()
             
-            start_x, start_y = self.screen_to_world(0, 0)
-            end_x, end_y = self.screen_to_world(self.screen.get_width(), self.screen.get_height())
+            start_x, start_y = self.screen_to_world(clip.left, clip.top)
+            end_x, end_y = self.screen_to_world(clip.right, clip.bottom)
 
             for x in range(start_x - (start_x % grid_size), end_x, grid_size):
                 start_pos = self.world_to_screen(x, start_y)
@@ -104,66 +594,205 @@ class DrawFrame():
                 pygame.draw.line(self.screen, (155, 155, 155), start_pos, end_pos, 1)
 
 
+        # Large selections are outlined with plain rects, which need no per-image outline surfaces.
+        outline_rects = tier == "far" or len(self.selected) > OUTLINE_IMAGE_LIMIT
+        left, top, right, bottom = self.view_rect(CULL_MARGIN)
         for s in self.selected:
             if isinstance(s,HarnessComponents.Connector):
+                if s.rect.right < left or s.rect.left > right or s.rect.bottom < top or s.rect.top > bottom:
+                    continue
                 screen_pos = self.world_to_screen(s.rect.x, s.rect.y)
-                scaled_image = pygame.transform.scale(s.image, (int(s.rect.width * self.zoom_level), int(s.rect.height * self.zoom_level)))
-                HarnessITUtils.outline_image(scaled_image,self.screen,screen_pos)
+                size = (int(s.rect.width * self.zoom_level), int(s.rect.height * self.zoom_level))
+                if outline_rects:
+                    pygame.draw.rect(self.screen, (255, 255, 255), pygame.Rect(screen_pos, size).inflate(4, 4), 2)
+                else:
+                    smooth = tier == "mid"
+                    HarnessITUtils.outline_image(self.scaled_image(s, size, smooth),self.screen,screen_pos,
+                                                 key=(s.imageFile, s.direction, size, smooth))
             elif isinstance(s,HarnessComponents.Node):
                 screen_pos = self.world_to_screen(s.rect.centerx, s.rect.centery)
                 pygame.draw.circle(self.screen, (0, 0, 0), screen_pos, 7)
                 pygame.draw.circle(self.screen, (200, 200, 200), screen_pos, 5)
+            elif isinstance(s, HarnessComponents.Wire):
+                # A selected wire shows the handles of its bend nodes.
+                for n in s.nodes:
+                    if n.parent is s and left <= n.x <= right and top <= n.y <= bottom:
+                        screen_pos = self.world_to_screen(n.x, n.y)
+                        pygame.draw.circle(self.screen, (0, 0, 0), screen_pos, 7)
+                        pygame.draw.circle(self.screen, (200, 200, 200), screen_pos, 5)
 
-        for c in self.connectors:
-            screen_pos = self.world_to_screen(c.rect.x, c.rect.y)
-            scaled_image = pygame.transform.scale(c.image, (int(c.rect.width * self.zoom_level), int(c.rect.height * self.zoom_level)))
-            self.screen.blit(scaled_image, screen_pos)
-
-            if self.app.view_connector_names.get():
+        connectors = self._visible_connectors()
+        profiler.count("connectors drawn", len(connectors))
+        positions = self.world_to_screen_array([(c.rect.x, c.rect.y) for c in connectors])
+        if tier == "far":
+            for c, screen_pos in zip(connectors, positions):
+                size = (int(c.rect.width * self.zoom_level), int(c.rect.height * self.zoom_level))
+                self.screen.fill(self.image_color(c), (screen_pos, (max(size[0], 1), max(size[1], 1))))
+        else:
+            surface, rects = self.image_atlas(connectors, tier == "mid").at_zoom(self.zoom_level)
+            blits = [(surface, screen_pos, rects[(c.imageFile, c.direction, (c.rect.width, c.rect.height))])
+                     for c, screen_pos in zip(connectors, positions)]
+            if hasattr(self.screen, "blits"):
+                self.screen.blits(blits, False)
+            else:
+                for blit in blits:
+                    self.screen.blit(*blit)
+
+        if tier != "far" and self.app.view_connector_names.get():
+            centers = self.world_to_screen_array([(c.rect.centerx, c.rect.centery - 20) for c in connectors])
+            for c, screen_pos in zip(connectors, centers):
                 text = self.font.render(c.name, True, (0, 0, 0))
-                text_rect = text.get_rect(center=self.world_to_screen(c.rect.centerx, c.rect.centery - 20))
+                text_rect = text.get_rect(center=screen_pos)
                 self.screen.blit(text, text_rect)
 
+        show_pin_numbers = tier == "full" and self.app.view_pin_numbers.get()
+        if tier != "far" and (self.app.state == "wire" or show_pin_numbers):
+            pins = [n for c in connectors for n in c.nodes]
+            pin_points = self.node_points(pins)
+
             if self.app.state == "wire":
-                for n in c.nodes:
-                    screen_pos = self.world_to_screen(n.rect.centerx, n.rect.centery)
+                for n, screen_pos in zip(pins, pin_points):
+                    pygame.draw.circle(self.screen, (255, 255, 255), screen_pos, 7)
                     if n in self.app.wirenodes:
-                        pygame.draw.circle(self.screen, (255, 255, 255), screen_pos, 7)
                         pygame.draw.circle(self.screen, (100, 155, 55), screen_pos, 5)
                     else:
-                        pygame.draw.circle(self.screen, (255, 255, 255), screen_pos, 7)
                         pygame.draw.circle(self.screen,(0,155,255), screen_pos,5)
 
-            if self.app.view_pin_numbers.get():
-                for n in c.nodes:
-                    screen_pos = self.world_to_screen(n.rect.centerx, n.rect.centery)
+            if show_pin_numbers:
+                for n, screen_pos in zip(pins, pin_points):
                     pin_text = self.font.render(str(n.get_display_pin()), True, (0, 0, 0))
                     text_rect = pin_text.get_rect(center=screen_pos)
                     self.screen.blit(pin_text, text_rect)
 
-        for w in self.wires:
+        with profiler.timer("wires"):
+            geometry = geometry or WireGeometry(self.wires)
+            if not (tier == "far" and np is not None and self.screen.get_bytesize() != 3 and self._draw_wires_batched(geometry)):
+                self._draw_wires(tier, geometry)
+
+        if self.band is not None:
+            left, top = self.world_to_screen(self.band[0], self.band[1])
+            right, bottom = self.world_to_screen(self.band[2], self.band[3])
+            pygame.draw.rect(self.screen, (255, 255, 255), pygame.Rect(left, top, right - left + 1, bottom - top + 1), 1)
+
+    def view_rect(self, margin=0):
+        """
+        Returns the world-space rect covered by the screen's clip area.
+
+        Args:
+            margin (int, optional): Screen pixels to grow the area by on every side. Defaults to 0.
+
+        Returns:
+            tuple: A tuple of (left, top, right, bottom) in world coordinates.
+        """
+        clip = self.screen.get_clip().inflate(2 * margin, 2 * margin)
+        return (clip.left / self.zoom_level + self.view_offset[0], clip.top / self.zoom_level + self.view_offset[1],
+                clip.right / self.zoom_level + self.view_offset[0], clip.bottom / self.zoom_level + self.view_offset[1])
+
+    def _visible_connectors(self):
+        """
+        Returns the connectors that overlap the screen's clip area.
+
+        The area is grown by `CULL_MARGIN` so that labels and pins sticking out of a connector are
+        still drawn.
+        """
+        left, top, right, bottom = self.view_rect(CULL_MARGIN)
+        return [c for c in self.connectors
+                if c.rect.right >= left and c.rect.left <= right and c.rect.bottom >= top and c.rect.top <= bottom]
+
+    def _draw_wires(self, tier="full", geometry=None):
+        """
+        Draws the wires, with the nodes of the visible wires transformed to screen coordinates in one
+        batch and one polyline per wire.
+
+        Args:
+            tier (str, optional): The level of detail. Defaults to "full".
+            geometry (WireGeometry, optional): The wire geometry, if it is already built.
+        """
+        geometry = geometry or WireGeometry(self.wires)
+        if not geometry.wires:
+            return
+        wires, points = geometry.visible_points(self.view_rect(CULL_MARGIN))
+        profiler.count("wires drawn", len(wires))
+        points = self.world_to_screen_array(points)
+        show_names = tier != "far" and self.app.view_wire_names.get()
+        show_nodes = tier != "far" and (self.app.state == "wire" or self.app.state == "selecting")
+
+        start = 0
+        for w in wires:
+            stop = start + len(w.nodes)
+            wire_points = points[start:stop]
             color = HarnessITUtils.COLORS[w.get_color()]
-            gauge = HarnessITUtils.GAUGE[w.get_gauge()]
-            
-            for i in range(len(w.nodes) - 1):
-                start_pos = self.world_to_screen(w.nodes[i].rect.centerx, w.nodes[i].rect.centery)
-                end_pos = self.world_to_screen(w.nodes[i+1].rect.centerx, w.nodes[i+1].rect.centery)
-                pygame.draw.line(self.screen, color, start_pos, end_pos, gauge)
-            
-            if self.app.view_wire_names.get():
-                midpoint_x = (w.nodes[0].rect.centerx + w.nodes[-1].rect.centerx) / 2
-                midpoint_y = (w.nodes[0].rect.centery + w.nodes[-1].rect.centery) / 2
-                screen_pos = self.world_to_screen(midpoint_x, midpoint_y)
+            gauge = HarnessITUtils.GAUGE[w.get_gauge()] if tier != "far" else 1
+            pygame.draw.lines(self.screen, color, False, wire_points, gauge)
+
+            if show_names:
+                midpoint = ((wire_points[0][0] + wire_points[-1][0]) // 2, (wire_points[0][1] + wire_points[-1][1]) // 2)
                 text = self.font.render(w.name, True, (0, 0, 0))
-                text_rect = text.get_rect(center=screen_pos)
+                text_rect = text.get_rect(center=midpoint)
                 self.screen.blit(text, text_rect)
 
-            if self.app.state == "wire" or self.app.state == "selecting":
-                for node in w.nodes:
+            if show_nodes:
+                for node, screen_pos in zip(w.nodes, wire_points):
                     if not isinstance(node.parent, HarnessComponents.Connector):
-                        screen_pos = self.world_to_screen(node.rect.centerx, node.rect.centery)
                         pygame.draw.circle(self.screen, (200, 200, 200), screen_pos, 5)
+            start = stop
 
+    def _draw_wires_batched(self, geometry=None):
+        """
+        Draws all wires as one-pixel polylines in a single vectorized pass.
+
+        pygame draws one connected polyline per call, so the wires of a color cannot be merged into
+        one call without also drawing the jumps between them. Instead every segment is sampled at
+        one-pixel steps and the samples of all wires, of every color, are written straight into the
+        surface's pixels, so the cost depends on the number of pixels drawn rather than on the
+        number of wires and segments. Long segments need so many samples that pygame's own line
+        drawing, one polyline per wire, is faster, so they are left to `_draw_wires`.
+
+        Returns:
+            bool: False if the segments are too long on screen for this to pay off and nothing
+                was drawn.
+        """
+        geometry = geometry or WireGeometry(self.wires)
+        if not geometry.wires:
+            return True
+        counts = geometry.counts
+        xs = (geometry.xs - self.view_offset[0]) * self.zoom_level
+        ys = (geometry.ys - self.view_offset[1]) * self.zoom_level
+
+        # Segments, without the ones that would join the last node of a wire to the next wire.
+        keep = np.ones(len(xs) - 1, dtype=bool)
+        keep[np.cumsum(counts)[:-1] - 1] = False
+        x0, y0 = xs[:-1][keep], ys[:-1][keep]
+        dx, dy = (xs[1:] - xs[:-1])[keep], (ys[1:] - ys[:-1])[keep]
+
+        mapped = {name: self.screen.map_rgb(rgb) for name, rgb in HarnessITUtils.COLORS.items()}
+        colors = [mapped[w.get_color()] for w in geometry.wires]
+        seg_colors = np.repeat(np.array(colors, dtype=np.int64), counts - 1)
+
+        # The pixels are written directly, so the clip area has to be applied here.
+        clip = self.screen.get_clip()
+        left, top, right, bottom = clip.left, clip.top, clip.right, clip.bottom
+        on_screen = ~(((x0 < left) & (x0 + dx < left)) | ((x0 >= right) & (x0 + dx >= right)) |
+                      ((y0 < top) & (y0 + dy < top)) | ((y0 >= bottom) & (y0 + dy >= bottom)))
+        x0, y0, dx, dy, seg_colors = x0[on_screen], y0[on_screen], dx[on_screen], dy[on_screen], seg_colors[on_screen]
+        if len(x0) == 0:
+            return True
+
+        steps = np.maximum(np.abs(dx), np.abs(dy)).astype(np.int32) + 1
+        if steps.sum() > SPLAT_MAX_STEPS * len(steps):
+            return False
+        # Sample positions are built with np.repeat, which is much cheaper than gathering the
+        # segment values through an index array.
+        inv = 1.0 / np.maximum(steps - 1, 1)
+        index = np.arange(steps.sum(), dtype=np.int32) - np.repeat(np.cumsum(steps, dtype=np.int32) - steps, steps)
+        px = (np.repeat(x0.astype(np.float32), steps) + np.repeat((dx * inv).astype(np.float32), steps) * index).astype(np.int32)
+        py = (np.repeat(y0.astype(np.float32), steps) + np.repeat((dy * inv).astype(np.float32), steps) * index).astype(np.int32)
+        inside = (px >= left) & (px < right) & (py >= top) & (py < bottom)
+
+        pixels = pygame.surfarray.pixels2d(self.screen)
+        pixels[px[inside], py[inside]] = np.repeat(seg_colors, steps)[inside]
+        del pixels
+        return True
 
     def update(self):
         """
@@ -177,3 +806,39 @@ class DrawFrame():
         Resizes the drawing frame.
         """
         self.frame.config(width =self.parent.winfo_width() - 25, height = self.parent.winfo_height() - 25)
+
+
+class OffscreenDrawFrame(DrawFrame):
+    """
+    A drawing frame that renders into an offscreen surface instead of a window.
+
+    Connector images still need a display mode to be converted, so without a window the SDL dummy
+    video driver should be used.
+    """
+    def __init__(self, size, app=None):
+        """
+        Initializes the OffscreenDrawFrame.
+
+        Args:
+            size (tuple): The (width, height) of the surface to render into.
+            app (optional): The app or RenderOptions to read the display options from. Defaults to RenderOptions().
+        """
+        self.app = app or RenderOptions()
+        self.parent = None
+        self.frame = None
+        self.screen = pygame.Surface(size, 0, 32)
+        self._init_view()
+
+    def update(self):
+        """
+        Updates the harness components.
+        """
+        for c in self.connectors:
+            c.update()
+
+    def resize(self, size=None):
+        """
+        Resizes the offscreen surface.
+        """
+        if size:
+            self.screen = pygame.Surface(size, 0, 32)
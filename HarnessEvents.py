@@ -0,0 +1,116 @@
+"""
+This module defines the events the harness model sends when it changes.
+
+The model, the undo actions and the editor send events to the shared `bus` as they change the
+harness: objects created, deleted, moved or flipped, properties changed, or the whole harness
+replaced. Views subscribe to the bus and update only what changed, instead of walking the whole
+harness to find out.
+
+Changes made inside a `bus.transaction()` block are delivered together when the outermost block
+ends, so an operation on many objects, such as a paste, reaches each subscriber as one batch.
+
+Like `HarnessModel`, this module has no pygame or Tk dependency.
+"""
+
+from contextlib import contextmanager
+
+# Event kinds.
+CREATED = "created"
+DELETED = "deleted"
+MOVED = "moved"
+FLIPPED = "flipped"
+CHANGED = "changed"
+# The whole harness was replaced, as by opening a file; the event has no object.
+RESET = "reset"
+
+
+class Event():
+    """
+    A change to one object of the harness.
+    """
+    __slots__ = ("kind", "obj", "data")
+
+    def __init__(self, kind, obj=None, **data):
+        """
+        Initializes the Event.
+
+        Args:
+            kind (str): The kind of change, such as CREATED.
+            obj (optional): The connector, wire or node that changed.
+            **data: Details, such as the name of a changed property.
+        """
+        self.kind = kind
+        self.obj = obj
+        self.data = data
+
+    def __repr__(self):
+        return "Event(%r, %r, %r)" % (self.kind, self.obj, self.data)
+
+
+class EventBus():
+    """
+    Delivers model events to subscribers, in batches.
+    """
+    def __init__(self):
+        """
+        Initializes the EventBus.
+        """
+        self._subscribers = []
+        self._depth = 0
+        self._pending = []
+
+    def subscribe(self, callback, kinds=None):
+        """
+        Subscribes a function to events.
+
+        Args:
+            callback (function): Called with a list of events each time a batch is delivered.
+            kinds (iterable, optional): The kinds of events to receive. Defaults to all.
+        """
+        self._subscribers.append((callback, frozenset(kinds) if kinds else None))
+
+    def unsubscribe(self, callback):
+        """
+        Unsubscribes a function.
+        """
+        self._subscribers = [(c, k) for c, k in self._subscribers if c != callback]
+
+    def emit(self, kind, obj=None, **data):
+        """
+        Sends an event, at once or, inside a transaction, when the transaction ends.
+        """
+        if not self._subscribers:
+            return
+        event = Event(kind, obj, **data)
+        if self._depth:
+            self._pending.append(event)
+        else:
+            self._deliver([event])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Collects the events sent inside a `with` block and delivers them as one batch when the
+        outermost block ends.
+        """
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth and self._pending:
+                events = self._pending
+                self._pending = []
+                self._deliver(events)
+
+    def _deliver(self, events):
+        """
+        Hands a batch of events to each subscriber.
+        """
+        for callback, kinds in list(self._subscribers):
+            batch = events if kinds is None else [e for e in events if e.kind in kinds]
+            if batch:
+                callback(batch)
+
+
+bus = EventBus()
@@ -0,0 +1,93 @@
+"""
+This module reads and writes harness files.
+
+Harness files are JSON documents with a list of connectors and a list of wires. Wires refer to
+connectors by their index in the connector list.
+"""
+
+import json
+
+import HarnessModel
+
+# Objects created between calls of a progress callback.
+PROGRESS_STEP = 500
+
+
+def harness_to_dict(connectors, wires):
+    """
+    Returns a dictionary representation of a harness.
+
+    Args:
+        connectors (list): The connectors of the harness.
+        wires (list): The wires of the harness.
+    """
+    return {
+        "connectors": [c.to_dict() for c in connectors],
+        "wires": [w.to_dict(connectors) for w in wires],
+    }
+
+
+def harness_from_dict(data, connector_class=HarnessModel.Connector, progress=None):
+    """
+    Creates the connectors and wires of a harness from a dictionary representation.
+
+    Args:
+        data (dict): The dictionary representation.
+        connector_class (type, optional): The connector class to create, such as the editor's
+            `HarnessComponents.Connector`. Defaults to `HarnessModel.Connector`.
+        progress (function, optional): Called with (done, total) objects every PROGRESS_STEP
+            objects. It may raise an exception to stop loading.
+
+    Returns:
+        tuple: A tuple of (connectors, wires).
+    """
+    if progress is None:
+        connectors = [connector_class.from_dict(c_data) for c_data in data["connectors"]]
+        wires = [HarnessModel.Wire.from_dict(w_data, connectors) for w_data in data["wires"]]
+        return connectors, wires
+
+    total = len(data["connectors"]) + len(data["wires"])
+    connectors = []
+    for c_data in data["connectors"]:
+        if len(connectors) % PROGRESS_STEP == 0:
+            progress(len(connectors), total)
+        connectors.append(connector_class.from_dict(c_data))
+    wires = []
+    for w_data in data["wires"]:
+        if len(wires) % PROGRESS_STEP == 0:
+            progress(len(connectors) + len(wires), total)
+        wires.append(HarnessModel.Wire.from_dict(w_data, connectors))
+    progress(total, total)
+    return connectors, wires
+
+
+def write_harness_data(filepath, data):
+    """
+    Writes the dictionary representation of a harness to a JSON file.
+    """
+    with open(filepath, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def save_harness(filepath, connectors, wires):
+    """
+    Saves a harness to a JSON file.
+    """
+    write_harness_data(filepath, harness_to_dict(connectors, wires))
+
+
+def load_harness(filepath, connector_class=HarnessModel.Connector, progress=None):
+    """
+    Loads a harness from a JSON file.
+
+    Args:
+        filepath (str): The JSON file.
+        connector_class (type, optional): The connector class to create. Defaults to `HarnessModel.Connector`.
+        progress (function, optional): A progress callback; see `harness_from_dict`.
+
+    Returns:
+        tuple: A tuple of (connectors, wires).
+    """
+    with open(filepath, "r") as f:
+        harness_data = json.load(f)
+    return harness_from_dict(harness_data, connector_class, progress)
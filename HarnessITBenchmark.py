@@ -0,0 +1,374 @@
+"""
+Benchmarks for HarnessIT.
+
+Builds reproducible synthetic harnesses and times the renderer, drawing into an offscreen frame
+with the SDL dummy video driver, and the editor's other hot paths: hit testing, saving and opening,
+flipping connectors, pasting and undoing large selections and building the cut list. Results are
+reported as JSON for tracking regressions between versions.
+
+Example:
+    python HarnessITBenchmark.py --segments 50000 --connectors 2000 --wires 5000 -o results.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import HarnessComponents
+import HarnessCutSheet
+import HarnessDrawFrame
+import HarnessEvents
+import HarnessFile
+import HarnessITUtils
+import HarnessITwindow
+import HarnessLayout
+import HarnessNets
+import HarnessRender
+import HarnessRouter
+import HarnessSelection
+import HarnessWireLength
+from UndoManager import UndoManager, PasteAction
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+LIBRARY_FILE = "resources/library/Connectors.csv"
+
+
+def load_library(filepath=LIBRARY_FILE):
+    """
+    Returns the rows of the connector library that have an image and a number of positions.
+    """
+    with open(filepath, "r") as f:
+        return [row for row in csv.DictReader(f) if row.get("ImageLocation") and row.get("Positions")]
+
+
+def _spread(spread, names):
+    """
+    Returns the choices and weights for a spread of gauges or colors.
+
+    Args:
+        spread: None for all names equally, a list of names, or a dict of weights by name.
+        names: All valid names.
+
+    Returns:
+        tuple: A tuple of (choices, weights), with weights None for equal weights.
+    """
+    if spread is None:
+        return list(names), None
+    if isinstance(spread, dict):
+        return list(spread), list(spread.values())
+    return list(spread), None
+
+
+def generate_harness(connectors=1000, wires=2000, nodes_per_wire=8, gauges=None, colors=None, seed=0,
+                     library=None, spacing=150):
+    """
+    Generates a reproducible synthetic harness.
+
+    Connectors are laid out on a square grid, each one a random part from the connector library.
+    Wires join random pins of two random connectors through intermediate nodes scattered around the
+    straight line between them, and their lengths are computed from the geometry.
+
+    Args:
+        connectors (int, optional): The number of connectors, at least 2. Defaults to 1000.
+        wires (int, optional): The number of wires. Defaults to 2000.
+        nodes_per_wire (int, optional): Intermediate nodes per wire. Defaults to 8.
+        gauges (optional): The gauges to use, as a list or a dict of weights. Defaults to all, equally.
+        colors (optional): The colors to use, as a list or a dict of weights. Defaults to all, equally.
+        seed (int, optional): The random seed. Defaults to 0.
+        library (list, optional): Library rows with "ImageLocation" and "Positions". Defaults to
+            the rows of `Connectors.csv`.
+        spacing (int, optional): World units between connectors. Defaults to 150.
+
+    Returns:
+        tuple: A tuple of (connectors, wires).
+    """
+    rng = random.Random(seed)
+    library = library or load_library()
+    connector_count = max(2, connectors)
+    side = int(connector_count ** 0.5) + 1
+    connector_list = []
+    for i in range(connector_count):
+        part = rng.choice(library)
+        connector_list.append(HarnessComponents.Connector(
+            part["ImageLocation"], (spacing * (i % side), spacing * (i // side)), name="J%d" % i,
+            partnumber=part.get("MFR_Part_Number", ""), connections=part["Positions"]))
+
+    gauge_choices, gauge_weights = _spread(gauges, HarnessITUtils.GAUGE)
+    color_choices, color_weights = _spread(colors, HarnessITUtils.COLORS)
+    wire_list = []
+    for i in range(wires):
+        start, end = rng.sample(connector_list, 2)
+        w = HarnessComponents.Wire(name="W%d" % i, color=rng.choices(color_choices, color_weights)[0],
+                                   gauge=rng.choices(gauge_choices, gauge_weights)[0])
+        a = rng.choice(start.nodes)
+        b = rng.choice(end.nodes)
+        w.add_node(a)
+        for k in range(1, nodes_per_wire + 1):
+            t = k / (nodes_per_wire + 1)
+            pos = (a.x + (b.x - a.x) * t + rng.randint(-20, 20), a.y + (b.y - a.y) * t + rng.randint(-20, 20))
+            w.add_node(HarnessComponents.Node(pos, w, 0, 0))
+        w.add_node(b)
+        wire_list.append(w)
+    HarnessWireLength.LengthEngine().update_all(wire_list)
+    return connector_list, wire_list
+
+
+def build_harness(segments, segments_per_wire=10, seed=0):
+    """
+    Builds a synthetic harness of four-pin connectors with about `segments` wire segments, for the
+    render benchmarks.
+
+    Returns:
+        tuple: A tuple of (connectors, wires).
+    """
+    wire_count = max(1, segments // segments_per_wire)
+    library = [{"ImageLocation": "resources/library/images/fourpin.png", "Positions": 4}]
+    return generate_harness(wire_count // 2, wire_count, segments_per_wire - 1, seed=seed, library=library)
+
+
+def _draw_wires_per_segment(frame):
+    """
+    Draws the wires one segment at a time, the way the renderer did before batching, for comparison.
+    """
+    for w in frame.wires:
+        color = HarnessITUtils.COLORS[w.get_color()]
+        gauge = HarnessITUtils.GAUGE[w.get_gauge()]
+        for i in range(len(w.nodes) - 1):
+            start_pos = frame.world_to_screen(w.nodes[i].rect.centerx, w.nodes[i].rect.centery)
+            end_pos = frame.world_to_screen(w.nodes[i+1].rect.centerx, w.nodes[i+1].rect.centery)
+            pygame.draw.line(frame.screen, color, start_pos, end_pos, gauge)
+
+
+def time_call(func, frames):
+    """
+    Returns the mean and best time of a call in milliseconds.
+    """
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"mean_ms": sum(times) / len(times), "min_ms": min(times)}
+
+
+def time_steps(steps, frames):
+    """
+    Runs a sequence of steps a number of times and returns the mean and best time of each step.
+
+    Args:
+        steps (list): Tuples of (name, function), run in order each time.
+        frames (int): The number of times to run the sequence.
+
+    Returns:
+        dict: The timings in milliseconds by step name.
+    """
+    times = {name: [] for name, _ in steps}
+    for _ in range(frames):
+        for name, func in steps:
+            start = time.perf_counter()
+            func()
+            times[name].append((time.perf_counter() - start) * 1000)
+    return {name: {"mean_ms": sum(t) / len(t), "min_ms": min(t)} for name, t in times.items()}
+
+
+class BenchApp():
+    """
+    The parts of the main window the editor's methods use, around an offscreen frame.
+    """
+    def __init__(self, frame):
+        """
+        Initializes the BenchApp.
+        """
+        self.HDF = frame
+        self.HarnessComponents = HarnessComponents
+        self.undo_manager = UndoManager()
+        self.state = "selecting"
+
+
+def bench_suite(connectors=1000, wires=2000, nodes_per_wire=8, frames=5, size=(1280, 800), seed=0):
+    """
+    Times the editor's hot paths on a generated harness.
+
+    Returns:
+        dict: The harness size and the timings in milliseconds.
+    """
+    HarnessRender.init_headless()
+    connector_list, wire_list = generate_harness(connectors, wires, nodes_per_wire, seed=seed)
+    frame = HarnessDrawFrame.OffscreenDrawFrame(size)
+    frame.connectors.extend(connector_list)
+    frame.wires.extend(wire_list)
+    app = BenchApp(frame)
+    window = HarnessITwindow.HarnessITWindow
+    results = {"connectors": len(connector_list), "wires": len(wire_list),
+               "segments": sum(len(w.nodes) - 1 for w in wire_list)}
+
+    frame.draw()
+    results["draw"] = time_call(frame.draw, frames)
+    left, top, right, bottom = HarnessRender.harness_extent(connector_list, wire_list)
+    frame.zoom_level = min(size[0] / (right - left + 1), size[1] / (bottom - top + 1))
+    frame.view_offset = [left, top]
+    frame.draw()
+    results["draw_whole_harness"] = dict(time_call(frame.draw, frames), tier=frame.lod_tier())
+    frame.zoom_level = 1.0
+    frame.view_offset = [0, 0]
+
+    # Random points, mostly misses: the worst case, since every object is tested.
+    rng = random.Random(seed)
+    points = [(rng.randrange(size[0]), rng.randrange(size[1])) for _ in range(100)]
+    results["hit_test_100"] = time_call(lambda: [window._hit_test(app, x, y) for x, y in points], frames)
+
+    directory = tempfile.mkdtemp()
+    try:
+        filepath = os.path.join(directory, "bench.json")
+        results["save_harness"] = time_call(lambda: HarnessFile.save_harness(filepath, connector_list, wire_list), frames)
+        results["file_bytes"] = os.path.getsize(filepath)
+        results["open_harness"] = time_call(lambda: HarnessFile.load_harness(filepath, HarnessComponents.Connector), frames)
+    finally:
+        shutil.rmtree(directory)
+
+    flipped = rng.sample(connector_list, min(10, len(connector_list)))
+    results["flip_10"] = time_call(lambda: [c.flip(app) for c in flipped], frames)
+
+    # Select everything with a band, then drag it: one group move and one length update per
+    # mouse event.
+    results["band_select_all"] = time_call(lambda: frame.spatial.query(left, top, right, bottom), frames)
+    group = HarnessSelection.GroupMove(list(connector_list) + list(wire_list), wire_list)
+    engine = HarnessWireLength.LengthEngine()
+    offsets = iter(range(1, frames + 1))
+
+    def drag():
+        step = next(offsets)
+        group.move(step, step)
+        engine.update_all(group.wires)
+
+    results["group_move_all"] = dict(time_call(drag, frames), objects=len(group.connectors) + len(group.nodes))
+    group.move(0, 0)
+    engine.update_all(group.wires)
+
+    # Copy everything, then paste it and undo and redo the paste.
+    frame.selected = list(connector_list) + [w.nodes[1] for w in wire_list if len(w.nodes) > 2]
+    clipboard = window.copy_selection(app)
+    frame.selected = []
+
+    def paste():
+        app.undo_manager.register(PasteAction(app, window.paste_selection(app, clipboard)))
+
+    results.update(time_steps([("paste_all", paste), ("undo_paste", app.undo_manager.undo),
+                               ("redo_paste", app.undo_manager.redo), ("undo_paste_again", app.undo_manager.undo)],
+                              frames))
+
+    # Route wires between their end pins around the connectors, without marking the routes taken.
+    router = HarnessRouter.Router(connector_list)
+    routed = wire_list[:100]
+    results["route_100"] = time_call(lambda: [router.route(w.nodes[0], w.nodes[-1]) for w in routed], frames)
+
+    # Find a layout for every connector, without applying it.
+    results["layout_all"] = time_call(lambda: HarnessLayout.layout_connectors(connector_list, wire_list), frames)
+
+    # Build the nets, then check continuity between random pins and add and remove a wire.
+    nets = HarnessNets.Connectivity(frame)
+    results["build_nets"] = dict(time_call(nets.rebuild, frames), pins=sum(c.connections for c in connector_list))
+    pins = [rng.choice(c.nodes) for c in rng.choices(connector_list, k=1000)]
+    results["continuity_1000"] = time_call(lambda: [nets.connected(a, b) for a, b in zip(pins, pins[1:])], frames)
+    wire = wire_list[0]
+    results["nets_remove_add_wire"] = time_call(
+        lambda: (nets.on_events([HarnessEvents.Event(HarnessEvents.DELETED, wire)]),
+                 nets.on_events([HarnessEvents.Event(HarnessEvents.CREATED, wire)])), frames)
+
+    results["cut_sheet_rows"] = time_call(lambda: HarnessCutSheet.cut_sheet_rows(wire_list), frames)
+    results["schedule_cut_order"] = time_call(lambda: HarnessCutSheet.schedule_cut_order(wire_list), frames)
+    return results
+
+
+def bench_render(segments, frames=10, size=(1280, 800), zoom=0.1, zooms=(1.0, 0.5, 0.2, 0.1)):
+    """
+    Times full frames and the wire pass alone, batched and per segment, and full frames at
+    several zoom levels to show the level-of-detail tiers, and frames while panning.
+    """
+    HarnessRender.init_headless()
+    connectors, wires = build_harness(segments)
+    frame = HarnessDrawFrame.OffscreenDrawFrame(size)
+    frame.connectors.extend(connectors)
+    frame.wires.extend(wires)
+    frame.zoom_level = zoom
+    frame.draw()
+
+    by_zoom = {}
+    for z in zooms:
+        frame.zoom_level = z
+        frame.draw()
+        by_zoom[str(z)] = dict(time_call(frame.draw, frames), tier=frame.lod_tier())
+    frame.zoom_level = zoom
+
+    def pan():
+        frame.pan(8, 5)
+        frame.refresh()
+
+    frame.refresh()
+    return {
+        "segments": sum(len(w.nodes) - 1 for w in wires),
+        "wires": len(wires),
+        "connectors": len(connectors),
+        "frame": time_call(frame.draw, frames),
+        "wires_batched": time_call(frame._draw_wires, frames),
+        "wires_per_segment": time_call(lambda: _draw_wires_per_segment(frame), frames),
+        "frame_by_zoom": by_zoom,
+        "pan_frame": time_call(pan, frames),
+    }
+
+
+def main(argv=None):
+    """
+    Runs the benchmarks and prints the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark HarnessIT.")
+    parser.add_argument("--only", choices=["render", "suite"], help="run only the render benchmarks or the suite")
+    parser.add_argument("--segments", type=int, default=50000, help="wire segments for the render benchmarks")
+    parser.add_argument("--frames", type=int, default=10, help="frames to time")
+    parser.add_argument("--zoom", type=float, default=0.1, help="zoom level")
+    parser.add_argument("--connectors", type=int, default=1000, help="connectors for the suite")
+    parser.add_argument("--wires", type=int, default=2000, help="wires for the suite")
+    parser.add_argument("--nodes-per-wire", type=int, default=8, help="intermediate nodes per wire for the suite")
+    parser.add_argument("--repeat", type=int, default=5, help="times to repeat each suite benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the generated harnesses")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    # Library paths are relative to the application directory.
+    os.chdir(APP_DIR)
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pygame": pygame.version.ver,
+            "numpy": getattr(HarnessDrawFrame.np, "__version__", None),
+        },
+        "arguments": vars(args),
+    }
+    if args.only != "suite":
+        results["render"] = bench_render(args.segments, args.frames, zoom=args.zoom)
+    if args.only != "render":
+        results["suite"] = bench_suite(args.connectors, args.wires, args.nodes_per_wire, args.repeat, seed=args.seed)
+    text = json.dumps(results, indent=4)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
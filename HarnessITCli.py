@@ -0,0 +1,224 @@
+"""
+A headless command-line interface for batch exports of harness files.
+
+Loads harness JSON files with the GUI-free `HarnessModel`, without pygame, Tk or a display, and writes a cut sheet and a bill of materials
+for each one. Real-size SVG drawings and, headless with `HarnessRender`, PNG images can also be written. Directories are searched for `*.json` files and the files are processed in parallel
+with a process pool.
+
+Example:
+    python HarnessITCli.py harnesses/ -o exports/ --jobs 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Endings of the JSON files the exports write, which are skipped when searching directories.
+OUTPUT_SUFFIXES = ("_bom.json",)
+
+
+def _init_worker():
+    """
+    Prepares a worker process.
+
+    Library image paths are relative to the application directory, so workers run from there to
+    read connector sizes from the images.
+    """
+    os.chdir(APP_DIR)
+
+
+def find_harness_files(paths, exclude=()):
+    """
+    Expands a list of files and directories into a sorted list of harness files.
+
+    Directories are searched for `*.json` files, leaving out the bills of materials the exports
+    write and the files in `exclude`, so a directory exported into can be exported again.
+
+    Args:
+        paths (list): Harness files and directories.
+        exclude (iterable, optional): Files to leave out of directories, such as the report. Defaults to ().
+    """
+    exclude = {os.path.abspath(f) for f in exclude}
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                lower = name.lower()
+                filepath = os.path.join(path, name)
+                if (lower.endswith(".json") and not lower.endswith(OUTPUT_SUFFIXES)
+                        and os.path.abspath(filepath) not in exclude):
+                    files.append(filepath)
+        else:
+            files.append(path)
+    return [os.path.abspath(f) for f in files]
+
+
+def export_file(filepath, output_dir, cut_sheet=True, bom=True, bom_format="csv", recompute_lengths=False,
+                scale=1.0, unit="mm", optimize_order=False, spool_length=None, spool_mode="greedy",
+                spool_time=1.0, kerf=0, png_scale=None, svg=False, svg_page=None, svg_landscape=False):
+    """
+    Loads one harness file and writes its exports.
+
+    Returns:
+        dict: A report with the input file, the files written, timings in seconds and the error, if any.
+    """
+    import HarnessFile
+    import HarnessCutSheet
+    import HarnessBOM
+    import HarnessWireLength
+    import HarnessSpool
+    import HarnessSVG
+
+    report = {"file": filepath, "outputs": [], "error": None}
+    start = time.perf_counter()
+    try:
+        if png_scale:
+            # Drawing needs the connector images, and with them pygame.
+            import HarnessRender
+            HarnessRender.init_headless()
+            import HarnessComponents
+            connectors, wires = HarnessFile.load_harness(filepath, HarnessComponents.Connector)
+        else:
+            connectors, wires = HarnessFile.load_harness(filepath)
+        report["load_seconds"] = time.perf_counter() - start
+        report["connectors"] = len(connectors)
+        report["wires"] = len(wires)
+
+        if recompute_lengths:
+            HarnessWireLength.LengthEngine(scale, unit).update_all(wires)
+
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        out_dir = output_dir or os.path.dirname(filepath)
+        if cut_sheet:
+            ordered = wires
+            if optimize_order:
+                ordered = HarnessCutSheet.schedule_cut_order(wires)
+                report["changeovers"] = [HarnessCutSheet.count_changeovers(wires)[0],
+                                         HarnessCutSheet.count_changeovers(ordered)[0]]
+            out = os.path.join(out_dir, stem + "_cutsheet.csv")
+            HarnessCutSheet.write_cut_sheet(out, ordered)
+            report["outputs"].append(out)
+        if bom:
+            bill = HarnessBOM.BillOfMaterials(connectors, wires)
+            if bom_format in ("csv", "both"):
+                out = os.path.join(out_dir, stem + "_bom.csv")
+                bill.to_csv(out)
+                report["outputs"].append(out)
+            if bom_format in ("json", "both"):
+                out = os.path.join(out_dir, stem + "_bom.json")
+                bill.to_json(out)
+                report["outputs"].append(out)
+        if spool_length:
+            plan = HarnessSpool.plan_spools(wires, spool_length, kerf=kerf, mode=spool_mode, time_budget=spool_time)
+            out = os.path.join(out_dir, stem + "_spools.csv")
+            plan.write_csv(out)
+            report["outputs"].append(out)
+            report["spools"] = len(plan.spools)
+            report["scrap"] = plan.scrap()
+            report["oversize"] = [w.name for w in plan.oversize]
+        if svg or svg_page:
+            units_per_mm = scale / HarnessWireLength.UNITS[unit]
+            out = os.path.join(out_dir, stem + ".svg")
+            if svg_page:
+                report["outputs"].extend(HarnessSVG.write_svg_pages(
+                    out, connectors, wires, HarnessSVG.PAGE_SIZES[svg_page], units_per_mm, landscape=svg_landscape))
+            else:
+                HarnessSVG.write_svg(out, connectors, wires, units_per_mm)
+                report["outputs"].append(out)
+        if png_scale:
+            out = os.path.join(out_dir, stem + ".png")
+            report["image_size"] = HarnessRender.render_png(out, connectors, wires, png_scale)
+            report["outputs"].append(out)
+    except Exception as e:
+        report["error"] = "%s: %s" % (type(e).__name__, e)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def run(files, output_dir=None, jobs=None, **options):
+    """
+    Exports a list of harness files with a process pool.
+
+    Yields:
+        dict: One report per file, in completion order.
+    """
+    if output_dir:
+        output_dir = os.path.abspath(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        futures = [pool.submit(export_file, f, output_dir, **options) for f in files]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    """
+    Runs the command-line interface.
+
+    Returns:
+        int: The exit status, 1 if any file failed.
+    """
+    import HarnessSVG
+
+    parser = argparse.ArgumentParser(description="Batch export cut sheets and BOMs from harness files.")
+    parser.add_argument("paths", nargs="+", help="harness JSON files or directories containing them")
+    parser.add_argument("-o", "--output-dir", help="directory for the exports (defaults to next to each input)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--no-cut-sheet", action="store_true", help="do not write cut sheets")
+    parser.add_argument("--no-bom", action="store_true", help="do not write bills of materials")
+    parser.add_argument("--optimize-order", action="store_true", help="order cut sheets to minimize reel changeovers")
+    parser.add_argument("--bom-format", choices=["csv", "json", "both"], default="csv", help="BOM file format")
+    parser.add_argument("--spool-length", type=float, help="also write a spool cutting plan for this spool length")
+    parser.add_argument("--spool-mode", choices=["greedy", "improve"], default="greedy", help="spool planning mode")
+    parser.add_argument("--spool-time", type=float, default=1.0, help="seconds the improve mode may run per file")
+    parser.add_argument("--kerf", type=float, default=0, help="length lost with every cut")
+    parser.add_argument("--recompute-lengths", action="store_true", help="recompute wire lengths from geometry")
+    parser.add_argument("--scale", type=float, default=1.0, help="world units per length unit")
+    parser.add_argument("--unit", choices=["mm", "in"], default="mm", help="length unit")
+    parser.add_argument("--png-scale", type=float, help="also render a PNG image at this many pixels per world unit")
+    parser.add_argument("--svg", action="store_true", help="also write a real-size SVG drawing, scaled by --scale and --unit")
+    parser.add_argument("--svg-page", choices=sorted(HarnessSVG.PAGE_SIZES), help="split the SVG drawing over pages of this size")
+    parser.add_argument("--svg-landscape", action="store_true", help="turn the SVG pages sideways")
+    parser.add_argument("--report", help="write a JSON report of all files to this path")
+    args = parser.parse_args(argv)
+
+    files = find_harness_files(args.paths, exclude=[args.report] if args.report else ())
+    if not files:
+        print("no harness files found", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    reports = []
+    for report in run(files, args.output_dir, args.jobs,
+                      cut_sheet=not args.no_cut_sheet, bom=not args.no_bom, bom_format=args.bom_format,
+                      recompute_lengths=args.recompute_lengths, scale=args.scale, unit=args.unit,
+                      optimize_order=args.optimize_order, spool_length=args.spool_length,
+                      spool_mode=args.spool_mode, spool_time=args.spool_time, kerf=args.kerf,
+                      png_scale=args.png_scale, svg=args.svg, svg_page=args.svg_page,
+                      svg_landscape=args.svg_landscape):
+        reports.append(report)
+        if report["error"]:
+            print("FAIL %s (%.3fs): %s" % (report["file"], report["seconds"], report["error"]), file=sys.stderr)
+        else:
+            line = "ok   %s (%.3fs, %d wires)" % (report["file"], report["seconds"], report["wires"])
+            if "changeovers" in report:
+                line += ", changeovers %d -> %d" % tuple(report["changeovers"])
+            if "spools" in report:
+                line += ", %d spools" % report["spools"]
+            print(line)
+
+    failed = sum(1 for r in reports if r["error"])
+    print("%d files, %d failed, %.3fs" % (len(reports), failed, time.perf_counter() - start))
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(reports, f, indent=4)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,12 @@ This module provides utility functions and constants for the HarnessIT applicati
 """
 
 import pygame
+from collections import OrderedDict
 from enum import Enum,auto
+from HarnessModel import COLORS, GAUGE
 
-
-COLORS = {"RED":(255,0,0),"WHITE":(255,255,255),"BLUE":(0,0,255),"GREEN":(0,255,0)}
-GAUGE = {"32":1,"30":1,"28":2,"26":2,"24":3,"22":3,"20":3,
-         "18":4,"16":4,"14":5,"12":6,"10":7,"8":8,
-         "6":9,"4":10,"2":11,"1":12,"1/0":13,"2/0":14,"3/0":15,"4/0":16}
+OUTLINE_CACHE_SIZE = 256
+_outline_cache = OrderedDict()
 
 
 def loadImage(filename, alpha=0):
@@ -40,7 +39,27 @@ def loadImage(filename, alpha=0):
     except:
         print("couldn't load image " + filename)
 
-def outline_image(image, surface,pos,size = 1,color = (255,255,255)):
+def outline_surface(image, size=1, color=(255,255,255)):
+    """
+    Builds the outline of an image.
+
+    Args:
+        image (pygame.Surface): The image to outline.
+        size (int, optional): The size of the outline. Defaults to 1.
+        color (tuple, optional): The color of the outline. Defaults to (255,255,255).
+
+    Returns:
+        pygame.Surface: The outline, `size` pixels larger than the image on every side, with
+        transparent pixels elsewhere.
+    """
+    mask = pygame.mask.from_surface(image)
+    width, height = mask.get_size()
+    outline = pygame.mask.Mask((width + 2 * size, height + 2 * size))
+    for offset in ((2 * size, size), (0, size), (size, 2 * size), (size, 0)):
+        outline.draw(mask, offset)
+    return outline.to_surface(setcolor=color, unsetcolor=(0, 0, 0, 0))
+
+def outline_image(image, surface,pos,size = 1,color = (255,255,255), key=None):
     """
     Draws an outline around an image.
 
@@ -50,14 +69,22 @@ def outline_image(image, surface,pos,size = 1,color = (255,255,255)):
         pos (tuple): The position of the image.
         size (int, optional): The size of the outline. Defaults to 1.
         color (tuple, optional): The color of the outline. Defaults to (255,255,255).
+        key (optional): A hashable value that identifies the image, such as its file, direction
+            and scaled size. When given, the outline is cached under it and reused. Defaults to None.
     """
-    mask = pygame.mask.from_surface(image)
-    outline = mask.to_surface(setcolor=color)
-    outline.set_colorkey((0,0,0))
-    surface.blit(outline,add_pos(pos,(size,0)))
-    surface.blit(outline, add_pos(pos, (-size, 0)))
-    surface.blit(outline, add_pos(pos, (0,size)))
-    surface.blit(outline, add_pos(pos, (0,-size)))
+    if key is None:
+        outline = outline_surface(image, size, color)
+    else:
+        cache_key = (key, size, tuple(color))
+        outline = _outline_cache.get(cache_key)
+        if outline is None:
+            outline = outline_surface(image, size, color)
+            _outline_cache[cache_key] = outline
+            if len(_outline_cache) > OUTLINE_CACHE_SIZE:
+                _outline_cache.popitem(last=False)
+        else:
+            _outline_cache.move_to_end(cache_key)
+    surface.blit(outline, add_pos(pos, (-size, -size)))
 
 def add_pos(pos1, pos2):
     """
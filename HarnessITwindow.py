@@ -6,18 +6,42 @@ event handling, and overall application state.
 """
 
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import filedialog, simpledialog
 import tkinter.ttk as ttk
 import pygame
 import HarnessDrawFrame
+import HarnessMiniMap
+import HarnessProfiler
+import HarnessReplay
+import HarnessRender
 import HarnessITRibbon
 import HarnessComponentProperties
 import HarnessComponents
 import HarnessConnectorLibrary
+import HarnessWireLength
+import HarnessFile
+import HarnessJobs
+import HarnessCutSheet
+import HarnessLayout
+import HarnessMemory
+import HarnessNets
+import HarnessRouter
+import HarnessSelection
+import HarnessBOM
+import HarnessSpool
+import HarnessSVG
 import csv
-import json
-from UndoManager import UndoManager, MoveAction, CreateAction, DeleteAction, FlipAction, CopyAction, PasteAction
+from UndoManager import UndoManager, MoveAction, CreateAction, DeleteAction, FlipAction, CopyAction, PasteAction, \
+    GroupMoveAction, GroupFlipAction, GroupDeleteAction, RouteAction, \
+    LayoutAction
 from ContextMenuManager import ContextMenuManager
+from HarnessProfiler import profiler
+from HarnessEvents import bus, CREATED, DELETED, MOVED, CHANGED, RESET
+
+# Screen pixels the view pans per mouse wheel step.
+SCROLL_STEP = 40
+# The Shift bit of a Tk event's modifier state.
+SHIFT_MASK = 0x0001
 
 
 class HarnessITWindow():
@@ -41,6 +65,13 @@ class HarnessITWindow():
         self.undo_manager = UndoManager()
         self.HarnessComponents = HarnessComponents
         self.clipboard = None
+        self.jobs = HarnessJobs.JobManager()
+        self._job_status = ""
+        self._cutlist_job = None
+        # The cut list's label widgets by wire, and whether wires were added or removed since it
+        # was built.
+        self._cutlist_labels = {}
+        self._cutlist_stale = False
         self.context_menu_manager = ContextMenuManager(self)
 
         self.grid_visible = tk.BooleanVar(value=True)
@@ -49,6 +80,15 @@ class HarnessITWindow():
         self.view_wire_names = tk.BooleanVar(value=False)
         self.view_connector_names = tk.BooleanVar(value=False)
         self.view_pin_numbers = tk.BooleanVar(value=True)
+        self.view_minimap = tk.BooleanVar(value=True)
+        self.view_hud = tk.BooleanVar(value=False)
+        self.profile_session = tk.BooleanVar(value=False)
+        self.record_input = tk.BooleanVar(value=False)
+        self.auto_lengths = tk.BooleanVar(value=True)
+        self.auto_route = tk.BooleanVar(value=True)
+        self.optimize_cut_order = tk.BooleanVar(value=False)
+        self.spool_length = 100000
+        self.length_engine = HarnessWireLength.LengthEngine()
 
 
         with open('resources/library/Connectors.csv', 'r') as file:
@@ -64,6 +104,12 @@ class HarnessITWindow():
         self.filemenu.add_command(label="Save", command=self.save_harness, accelerator="Ctrl+S")
         self.filemenu.add_separator()
         self.filemenu.add_command(label="Export Cut Sheet...", command=self.export_cut_sheet)
+        self.filemenu.add_command(label="Export BOM...", command=self.export_bom)
+        self.filemenu.add_command(label="Export Spool Plan...", command=self.export_spool_plan)
+        self.filemenu.add_command(label="Export Image...", command=self.export_image)
+        self.filemenu.add_command(label="Export SVG...", command=self.export_svg)
+        self.filemenu.add_command(label="Export Formboard Pages...", command=self.export_svg_pages)
+        self.filemenu.add_checkbutton(label="Optimize Cut Order", onvalue=True, offvalue=False, variable=self.optimize_cut_order)
         self.menubar.add_cascade(label="File", menu=self.filemenu)
 
         self.editmenu = tk.Menu(self.menubar, tearoff=0)
@@ -72,6 +118,17 @@ class HarnessITWindow():
         self.editmenu.add_separator()
         self.editmenu.add_command(label="Copy", command=self.copy, accelerator="Ctrl+C")
         self.editmenu.add_command(label="Paste", command=self.paste, accelerator="Ctrl+V")
+        self.editmenu.add_separator()
+        self.editmenu.add_checkbutton(label="Auto Wire Lengths", onvalue=True, offvalue=False, variable=self.auto_lengths, command=self.recompute_lengths)
+        self.editmenu.add_command(label="Recompute Wire Lengths", command=self.recompute_lengths)
+        self.editmenu.add_command(label="Length Scale...", command=self.set_length_scale)
+        self.editmenu.add_separator()
+        self.editmenu.add_checkbutton(label="Auto Route New Wires", onvalue=True, offvalue=False, variable=self.auto_route)
+        self.editmenu.add_command(label="Route Selected Wires", command=self.route_selected_wires)
+        self.editmenu.add_command(label="Route All Wires", command=self.route_all_wires)
+        self.editmenu.add_command(label="Auto Layout Connectors", command=self.auto_layout)
+        self.editmenu.add_separator()
+        self.editmenu.add_command(label="Select Unconnected Pins", command=self.select_unconnected_pins)
         self.menubar.add_cascade(label="Edit", menu=self.editmenu)
 
         self.viewmenu = tk.Menu(self.menubar, tearoff=0)
@@ -81,11 +138,18 @@ class HarnessITWindow():
         self.viewmenu.add_checkbutton(label="Show Wire Names", onvalue=True, offvalue=False, variable=self.view_wire_names)
         self.viewmenu.add_checkbutton(label="Show Connector Names", onvalue=True, offvalue=False, variable=self.view_connector_names)
         self.viewmenu.add_checkbutton(label="Show Pin Numbers", onvalue=True, offvalue=False, variable=self.view_pin_numbers)
+        self.viewmenu.add_separator()
+        self.viewmenu.add_checkbutton(label="Show Mini-map", onvalue=True, offvalue=False, variable=self.view_minimap)
+        self.viewmenu.add_separator()
+        self.viewmenu.add_checkbutton(label="Show Performance HUD", onvalue=True, offvalue=False, variable=self.view_hud)
+        self.viewmenu.add_checkbutton(label="Record Profile", onvalue=True, offvalue=False, variable=self.profile_session, command=self.toggle_profile_session)
+        self.viewmenu.add_checkbutton(label="Record Input", onvalue=True, offvalue=False, variable=self.record_input, command=self.toggle_input_recording)
         self.menubar.add_cascade(label="View", menu=self.viewmenu)
 
         self.windowmenu = tk.Menu(self.menubar, tearoff=0)
         self.windowmenu.add_command(label="Connector Library", command=self.openLibrary)
         self.windowmenu.add_command(label="Cut List", command=self.generate_cutlist)
+        self.windowmenu.add_command(label="Memory Report", command=self.show_memory_report)
         self.menubar.add_cascade(label="Window", menu=self.windowmenu)
 
 
@@ -100,6 +164,8 @@ class HarnessITWindow():
         self.tabControl.add(self.CutListEditTab, text = "Cut list")
 
         self.HDF = HarnessDrawFrame.DrawFrame(self.HarnessEditTab,self)
+        self.HDF.minimap = HarnessMiniMap.MiniMap(self.HDF, visible=self.view_minimap)
+        self.HDF.hud = HarnessProfiler.ProfilerHUD(self.HDF, visible=self.view_hud)
         self.sideFrame = tk.Frame(self.HarnessEditTab)
         self.ConnPropFrame = HarnessComponentProperties.ConnectorProperies(self.HarnessEditTab,self)
         self.WirePropFrame = HarnessComponentProperties.WireProperies(self.HarnessEditTab,self)
@@ -127,10 +193,23 @@ class HarnessITWindow():
         self._dragging = False
         self._drag_action_data = None
         self._drag_offset = (0, 0)
+        self._drag_group = None
+        self._band_start = None
+        self._band_base = []
+        self._pan_last = None
+        self._minimap_dragging = False
+        self._memory_baseline = None
 
         self.root.bind('<Configure>', self.resize)
+        self.tabControl.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        bus.subscribe(self._on_model_events)
+        self.connectivity = HarnessNets.Connectivity(self.HDF)
+        bus.subscribe(self.connectivity.on_events, kinds=HarnessNets.EVENT_KINDS)
+        self.bom = HarnessBOM.BillOfMaterials(frame=self.HDF)
+        bus.subscribe(self.bom.on_events, kinds=HarnessBOM.EVENT_KINDS)
         
         self.running = False
+        self.recorder = HarnessReplay.Recorder(self)
         self._bind_input()
         self._set_mode("selecting")
 
@@ -138,34 +217,42 @@ class HarnessITWindow():
     def _bind_input(self):
         """
         Binds all user input events to their respective handlers.
+
+        Editor events go through the recorder, which writes them down while input is recorded.
         """
+        record = self.recorder.wrap
+
         # Mouse on the drawing frame
-        self.HDF.frame.bind("<Button-1>", self._on_left_click)
-        self.HDF.frame.bind("<B1-Motion>", self._on_drag)
-        self.HDF.frame.bind("<ButtonRelease-1>", self._on_left_release)
-        self.HDF.frame.bind("<Button-3>", self._on_right_click)
-        self.HDF.frame.bind("<Control-MouseWheel>", self.HDF.zoom)
+        self.HDF.frame.bind("<Button-1>", record("_on_left_click"))
+        self.HDF.frame.bind("<B1-Motion>", record("_on_drag"))
+        self.HDF.frame.bind("<ButtonRelease-1>", record("_on_left_release"))
+        self.HDF.frame.bind("<Button-3>", record("_on_right_click"))
+        self.HDF.frame.bind("<Control-MouseWheel>", record("HDF.zoom"))
+        self.HDF.frame.bind("<Button-2>", record("_on_pan_start"))
+        self.HDF.frame.bind("<B2-Motion>", record("_on_pan_drag"))
+        self.HDF.frame.bind("<MouseWheel>", record("_on_scroll"))
+        self.HDF.frame.bind("<Shift-MouseWheel>", record("_on_scroll"))
 
 
         # Keyboard shortcuts (single keys)
-        self.root.bind_all("<Escape>", self._cancel_mode)
-        self.root.bind_all("<Delete>", self._delete_selection)
+        self.root.bind_all("<Escape>", record("_cancel_mode"))
+        self.root.bind_all("<Delete>", record("_delete_selection"))
         #self.root.bind_all("<BackSpace>", self._delete_selection)
 
-        self.root.bind_all("<Control-a>", self.select_all)
-        self.root.bind_all("a", self.add_mode)
-        self.root.bind_all("w", self.wire_mode)
-        self.root.bind_all("s", self.select_mode)
-        self.root.bind_all("f", self.flip)
-        self.root.bind_all("m", self.move_mode)
+        self.root.bind_all("<Control-a>", record("select_all"))
+        self.root.bind_all("a", record("add_mode"))
+        self.root.bind_all("w", record("wire_mode"))
+        self.root.bind_all("s", record("select_mode"))
+        self.root.bind_all("f", record("flip"))
+        self.root.bind_all("m", record("move_mode"))
 
         self.root.bind_all("<Control-l>", self.openLibrary)
-        self.root.bind_all("<Control-z>", self.undo)
-        self.root.bind_all("<Control-Shift-Z>", self.redo)
+        self.root.bind_all("<Control-z>", record("undo"))
+        self.root.bind_all("<Control-Shift-Z>", record("redo"))
         self.root.bind_all("<Control-s>", self.save_harness)
         self.root.bind_all("<Control-o>", self.open_harness)
-        self.root.bind_all("<Control-c>", self.copy)
-        self.root.bind_all("<Control-v>", self.paste)
+        self.root.bind_all("<Control-c>", record("copy"))
+        self.root.bind_all("<Control-v>", record("paste"))
 
 
     def _set_status(self, text):
@@ -185,10 +272,11 @@ class HarnessITWindow():
             mode (str): The mode to set.
         """
         self.state = mode
+        self.recorder.record_mode(mode)
         if mode == "selecting":
             self.root.config(cursor="arrow")
             self._set_status(
-                "Select: click to select • drag to move • Delete removes • W=Wire • A=Add • F=Flip • Esc=Cancel")
+                "Select: click or drag a box to select • Shift adds • drag to move • Delete removes • W=Wire • A=Add • F=Flip • Esc=Cancel")
         elif mode == "wire":
             self.root.config(cursor="spider")
             self._set_status("Wire: click 2 pins to connect • right-click or Esc cancels • S=Select")
@@ -204,11 +292,30 @@ class HarnessITWindow():
 
     def _cancel_mode(self, event=None):
         """
-        Cancels the current mode and returns to the default 'selecting' mode.
+        Cancels the current mode and returns to the default 'selecting' mode. When no mode is
+        active and nothing is being dragged, cancels the running jobs instead, so leaving a mode
+        never cancels a save.
         """
+        idle = self.state == "selecting" and not self.wirenodes and not self._dragging and self._band_start is None
         self.wirenodes.clear()
         self._dragging = False
+        self._drag_group = None
+        self._band_start = None
+        self.HDF.band = None
         self._set_mode("selecting")
+        if idle:
+            self.cancel_jobs()
+
+    def cancel_jobs(self, *args):
+        """
+        Cancels the running background jobs. Jobs that have started and cannot be stopped, such as
+        a save being written, finish and report their result.
+        """
+        running = self.jobs.cancel_all()
+        if running:
+            names = ", ".join(job.name for job in running)
+            self._set_status(f"Cannot cancel {names}; " + ("it finishes" if len(running) == 1 else "they finish") +
+                             " in the background")
 
     def _select_connector(self, obj):
         """
@@ -243,6 +350,7 @@ class HarnessITWindow():
         self.HDF.selected.append(node)
         self.properties.load(node.parent)
 
+    @profiler.timed("hit_test")
     def _hit_test(self, x, y):
         """
         Checks if a point collides with any object on the canvas.
@@ -259,7 +367,8 @@ class HarnessITWindow():
         # Check selected first for moving
         if self.state == "moving":
             for obj in self.HDF.selected:
-                if obj.rect.collidepoint(world_x, world_y):
+                # Selected wires are moved by their nodes.
+                if hasattr(obj, "rect") and obj.rect.collidepoint(world_x, world_y):
                     return ("selected", obj)
 
         for obj in reversed(self.HDF.connectors):
@@ -284,6 +393,11 @@ class HarnessITWindow():
         """
         self.context_menu_manager.hide_menu()
         x, y = event.x, event.y
+        if self.HDF.minimap.contains(x, y):
+            self.HDF.minimap.jump(x, y)
+            self._minimap_dragging = True
+            return
+
         world_x, world_y = self.HDF.screen_to_world(x, y)
 
         if self.grid_snap.get():
@@ -298,37 +412,104 @@ class HarnessITWindow():
             return
 
         kind, obj = self._hit_test(x, y)
+        shift = event.state & SHIFT_MASK
 
         if self.state == "moving":
             if kind == "selected":
-                self._dragging = True
-                self._drag_offset = (obj.rect.centerx - world_x, obj.rect.centery - world_y)
-                self._drag_action_data = (obj, obj.rect.center)
+                self._start_drag(obj, world_x, world_y)
             return
 
-        if kind == "connector":
-            if obj not in self.HDF.selected:
+        if kind in ("connector", "wire_node") and shift:
+            self._toggle_selected(obj)
+        elif kind == "connector":
+            if not self._is_selected(obj):
                 self._select_connector(obj)
-            self._dragging = True
-            self._drag_offset = (obj.rect.centerx - world_x, obj.rect.centery - world_y)
-            self._drag_action_data = (obj, obj.rect.center)
+            self._start_drag(obj, world_x, world_y)
         elif kind == "wire_node":
-            if obj not in self.HDF.selected:
+            if not self._is_selected(obj):
                 self._select_wire_node(obj)
-            self._dragging = True
-            self._drag_offset = (obj.rect.centerx - world_x, obj.rect.centery - world_y)
-            self._drag_action_data = (obj, obj.rect.center)
+            self._start_drag(obj, world_x, world_y)
         elif kind == "pin_node" and self.state == "wire":
              self.add_wire(event)
         else:
-            self.HDF.selected.clear()
+            # Drag out a band to select what it encloses; Shift adds to the selection.
+            if not shift:
+                self.HDF.selected.clear()
             self.properties.frame.grid_forget()
+            self._band_base = list(self.HDF.selected)
+            self._band_start = self.HDF.screen_to_world(x, y)
+
+    def _is_selected(self, obj):
+        """
+        Returns whether an object is selected, itself or, for a wire node, by its wire.
+        """
+        selected = self.HDF.selected
+        return obj in selected or (isinstance(obj, HarnessComponents.Node) and obj.parent in selected)
+
+    def _toggle_selected(self, obj):
+        """
+        Adds an object to the selection, or removes it if it is selected.
+        """
+        if obj in self.HDF.selected:
+            self.HDF.selected.remove(obj)
+        else:
+            self.HDF.selected.append(obj)
+        self.properties.frame.grid_forget()
+
+    def _start_drag(self, obj, world_x, world_y):
+        """
+        Starts dragging the selection by one of its objects.
+
+        Args:
+            obj: The connector or node under the pointer, which follows it.
+            world_x (int): The pointer's x-coordinate, in world coordinates.
+            world_y (int): The pointer's y-coordinate.
+        """
+        self._dragging = True
+        self._drag_offset = (obj.rect.centerx - world_x, obj.rect.centery - world_y)
+        self._drag_action_data = (obj, obj.rect.center)
+        # Built on the first motion, so a click that does not drag costs nothing.
+        self._drag_group = None
+
+    def _update_band(self, event):
+        """
+        Selects what the rubber band encloses as it is dragged out.
+        """
+        x0, y0 = self._band_start
+        x1, y1 = self.HDF.screen_to_world(event.x, event.y)
+        band = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        self.HDF.band = band
+        found = self.HDF.spatial.query(*band)
+        if self._band_base:
+            base = set(self._band_base)
+            found = self._band_base + [obj for obj in found if obj not in base]
+        self.HDF.selected[:] = found
+
+    def _end_band(self):
+        """
+        Finishes a rubber-band selection, showing the properties of a lone selected object.
+        """
+        self._band_start = None
+        self._band_base = []
+        self.HDF.band = None
+        if len(self.HDF.selected) == 1:
+            obj = self.HDF.selected[0]
+            if isinstance(obj, HarnessComponents.Connector):
+                self._select_connector(obj)
+            elif isinstance(obj, HarnessComponents.Node):
+                self._select_wire_node(obj)
 
 
     def _on_drag(self, event):
         """
         Handles drag events on the drawing canvas.
         """
+        if self._minimap_dragging:
+            self.HDF.minimap.jump(event.x, event.y)
+            return
+        if self._band_start is not None:
+            self._update_band(event)
+            return
         if self.state not in ["selecting", "moving"]:
             return
         if not self._dragging:
@@ -336,11 +517,6 @@ class HarnessITWindow():
         if not self.HDF.selected:
             return
 
-        sel = self.HDF.selected[0]
-        # Check if sel is a valid object with a rect attribute
-        if not hasattr(sel, 'rect'):
-            return
-
         world_x, world_y = self.HDF.screen_to_world(event.x, event.y)
         dx, dy = self._drag_offset
         
@@ -350,20 +526,54 @@ class HarnessITWindow():
         if self.grid_snap.get():
             new_x, new_y = self.HDF.snap_to_grid(new_x, new_y)
 
-        sel.rect.center = (new_x, new_y)
+        # The whole selection moves with the object under the pointer, in one model update.
+        if self._drag_group is None:
+            self._drag_group = HarnessSelection.GroupMove(self.HDF.selected, self.HDF.wires)
+        start = self._drag_action_data[1]
+        with bus.transaction():
+            if self._drag_group.move(new_x - start[0], new_y - start[1]):
+                self._update_group_lengths(self._drag_group.wires)
+                for obj in self._drag_group.objects():
+                    bus.emit(MOVED, obj)
+
+    def _on_pan_start(self, event):
+        """
+        Starts panning the view with the middle mouse button.
+        """
+        self._pan_last = (event.x, event.y)
+
+    def _on_pan_drag(self, event):
+        """
+        Pans the view while the middle mouse button is dragged.
+        """
+        if self._pan_last is None:
+            return
+        self.HDF.pan(event.x - self._pan_last[0], event.y - self._pan_last[1])
+        self._pan_last = (event.x, event.y)
+
+    def _on_scroll(self, event):
+        """
+        Pans the view with the mouse wheel, sideways when Shift is held.
+        """
+        step = SCROLL_STEP if event.delta > 0 else -SCROLL_STEP
+        if event.state & SHIFT_MASK:
+            self.HDF.pan(step, 0)
+        else:
+            self.HDF.pan(0, step)
 
     def _on_left_release(self, event):
         """
         Handles left-click release events on the drawing canvas.
         """
-        if self._dragging and self._drag_action_data:
-            obj, old_pos = self._drag_action_data
-            new_pos = obj.rect.center
-            if old_pos != new_pos:
-                action = MoveAction(obj, old_pos, new_pos)
-                self.undo_manager.register(action)
+        if self._band_start is not None:
+            self._end_band()
+        if self._dragging and self._drag_group is not None and self._drag_group.offset != (0, 0):
+            action = GroupMoveAction(self._drag_group)
+            self.undo_manager.register(action)
         self._dragging = False
         self._drag_action_data = None
+        self._drag_group = None
+        self._minimap_dragging = False
 
 
     def _on_right_click(self, event):
@@ -375,13 +585,21 @@ class HarnessITWindow():
 
     def _delete_selection(self, event=None):
         """
-        Deletes the currently selected object.
+        Deletes the currently selected objects.
         """
         if not self.HDF.selected:
             return
+        if len(self.HDF.selected) == 1:
+            self.delete_object(self.HDF.selected[0])
+            return
 
-        sel = self.HDF.selected[0]
-        self.delete_object(sel)
+        connectors, wires, _ = HarnessSelection.selection_parts(self.HDF.selected)
+        action = GroupDeleteAction(self, connectors + wires)
+        with bus.transaction():
+            action.redo()
+        self.undo_manager.register(action)
+        self.HDF.selected.clear()
+        self.properties.frame.grid_forget()
 
     def delete_object(self, obj):
         """
@@ -393,13 +611,16 @@ class HarnessITWindow():
         if isinstance(obj, HarnessComponents.Connector):
             if obj in self.HDF.connectors:
                 self.HDF.connectors.remove(obj)
+                bus.emit(DELETED, obj)
         elif isinstance(obj, HarnessComponents.Wire):
             if obj in self.HDF.wires:
                 self.HDF.wires.remove(obj)
+                bus.emit(DELETED, obj)
         elif isinstance(obj, HarnessComponents.Node):
             parent = getattr(obj, "parent", None)
             if parent and parent in self.HDF.wires:
                 self.HDF.wires.remove(parent)
+                bus.emit(DELETED, parent)
 
         if obj in self.HDF.selected:
             self.HDF.selected.remove(obj)
@@ -409,10 +630,83 @@ class HarnessITWindow():
         Flips a specific connector.
         """
         if isinstance(obj, HarnessComponents.Connector):
-            obj.flip(self)
+            with bus.transaction():
+                obj.flip(self)
+                self._update_lengths(obj)
             action = FlipAction(self, obj)
             self.undo_manager.register(action)
 
+    def flip_objects(self, objects):
+        """
+        Flips the connectors among some objects, walking the wires once for all of them.
+        """
+        connectors = HarnessSelection.selection_parts(objects)[0]
+        if len(connectors) == 1:
+            self.flip_object(connectors[0])
+        elif connectors:
+            with bus.transaction():
+                HarnessComponents.flip_connectors(connectors, self.HDF.wires)
+                self._update_group_lengths(HarnessSelection.attached_wires(self.HDF.wires, connectors))
+            action = GroupFlipAction(self, connectors)
+            self.undo_manager.register(action)
+
+    def _update_lengths(self, obj):
+        """
+        Recomputes the wire segment lengths touched by a change to an object.
+
+        Args:
+            obj: The connector, wire node or wire that changed.
+        """
+        if not self.auto_lengths.get():
+            return
+        if isinstance(obj, HarnessComponents.Connector):
+            obj.update()
+            self.length_engine.update_connector(obj, self.HDF.wires)
+        elif isinstance(obj, HarnessComponents.Node) and isinstance(obj.parent, HarnessComponents.Wire):
+            self.length_engine.update_node(obj)
+        elif isinstance(obj, HarnessComponents.Wire):
+            self.length_engine.update_wire(obj)
+
+    def _update_group_lengths(self, wires):
+        """
+        Recomputes the segment lengths of the wires attached to a group of moved objects, in one
+        vectorized pass.
+        """
+        if self.auto_lengths.get():
+            self.length_engine.update_all(wires)
+
+    def recompute_lengths(self, *args):
+        """
+        Recomputes the segment lengths of every wire from the current geometry.
+        """
+        if not self.auto_lengths.get():
+            return
+        for c in self.HDF.connectors:
+            c.update()
+        self.length_engine.update_all(self.HDF.wires)
+        self.bom.invalidate()
+
+    def set_length_scale(self, *args):
+        """
+        Asks for the length unit and the number of world units per unit used to compute wire lengths.
+        """
+        unit = simpledialog.askstring("Length Scale", "Length unit (" + ", ".join(HarnessWireLength.UNITS) + "):",
+                                      initialvalue=self.length_engine.unit)
+        if not unit:
+            return
+        unit = unit.strip().lower()
+        if unit not in HarnessWireLength.UNITS:
+            self._set_status(f"Unknown length unit {unit}")
+            return
+        initial = self.length_engine.units_per_length
+        if unit != self.length_engine.unit:
+            initial *= HarnessWireLength.UNITS[unit] / HarnessWireLength.UNITS[self.length_engine.unit]
+        scale = simpledialog.askfloat("Length Scale", f"World units per {unit}:",
+                                      initialvalue=initial, minvalue=0.001)
+        if scale:
+            self.length_engine.set_scale(scale, unit)
+            self.recompute_lengths()
+
     def add_node_to_wire(self, wire, x, y):
         """
         Adds a new node to a wire at the given position.
@@ -437,6 +731,9 @@ class HarnessITWindow():
             node = HarnessComponents.Node((world_x, world_y), wire, 0, 0)
             wire.nodes.insert(insert_index, node)
             wire.lengths.insert(insert_index - 1, 0)
+            if self.auto_lengths.get():
+                self.length_engine.update_segments(wire, (insert_index - 1, insert_index))
+            bus.emit(CHANGED, wire, property="nodes")
             self.properties.load(wire)
 
 
@@ -455,6 +752,7 @@ class HarnessITWindow():
         """
         connector = HarnessComponents.Connector(self.curConAdd["ImageLocation"],(x,y),connections=self.curConAdd["Positions"])
         self.HDF.connectors.append(connector)
+        bus.emit(CREATED, connector)
         action = CreateAction(self, connector)
         self.undo_manager.register(action)
         self._set_mode("selecting")
@@ -472,6 +770,7 @@ class HarnessITWindow():
         """
         Sets the current connector to be added from the library.
         """
+        self.recorder.record("set_current", part=concard)
         for i in self.library:
             if concard == i["ID"]:
                 self.curConAdd = i
@@ -500,39 +799,125 @@ class HarnessITWindow():
         """
         self.HDF.selected.clear()
         self.HDF.selected.extend(self.HDF.connectors)
-        # Optionally add wires if you want them selected too
-        # self.HDF.selected.extend(self.HDF.wires)
+        self.HDF.selected.extend(self.HDF.wires)
+        self.properties.frame.grid_forget()
 
     def generate_cutlist(self,*args):
         """
         Generates and displays the cut list for the current harness.
         """
         self.tabControl.select(self.tabControl.index(1))
+        if self._cutlist_job is not None:
+            self._cutlist_job.cancel()
         
         for i in self.CutListEditTab.winfo_children():
             i.destroy()
+        self._cutlist_labels = {}
+        self._cutlist_stale = False
+
+        wires = list(self.cut_order())
+        self._cutlist_job = self.jobs.submit_steps("Building cut list", self._cutlist_steps(wires),
+                                                   on_done=self._cutlist_done, on_error=self._job_failed)
 
-        headers = ["From Connector", "From Pin", "Wire Name", "Length", "Color", "To Pin", "To Connector"]
-        for col, header in enumerate(headers):
+    def _cutlist_steps(self, wires):
+        """
+        Creates the cut list widgets one row at a time, yielding the progress after each row.
+        """
+        for col, header in enumerate(HarnessCutSheet.HEADERS):
             ttk.Label(self.CutListEditTab, text=header, font=('Helvetica', 10, 'bold')).grid(row=0, column=col, padx=5, pady=5)
 
-        row = 1
-        for w in self.HDF.wires:
-            from_connector = w.nodes[0].get_name()
-            from_pin = w.nodes[0].get_display_pin()
-            to_connector = w.nodes[-1].get_name()
-            to_pin = w.nodes[-1].get_display_pin()
+        for row, wire in enumerate(wires, start=1):
+            labels = []
+            for col, value in enumerate(HarnessCutSheet.cut_sheet_row(wire)):
+                label = ttk.Label(self.CutListEditTab, text=value)
+                label.grid(row=row, column=col)
+                labels.append(label)
+            self._cutlist_labels[wire] = labels
+            yield row, len(wires)
+        return len(wires)
+
+    def show_memory_report(self, *args):
+        """
+        Shows where the memory of the session goes.
 
-            ttk.Label(self.CutListEditTab, text=from_connector).grid(row=row, column=0)
-            ttk.Label(self.CutListEditTab, text=from_pin).grid(row=row, column=1)
-            ttk.Label(self.CutListEditTab, text=w.name).grid(row=row, column=2)
-            ttk.Label(self.CutListEditTab, text=w.get_total_length()).grid(row=row, column=3)
-            ttk.Label(self.CutListEditTab, text=w.get_color()).grid(row=row, column=4)
-            ttk.Label(self.CutListEditTab, text=to_pin).grid(row=row, column=5)
-            ttk.Label(self.CutListEditTab, text=to_connector).grid(row=row, column=6)
+        The first report starts tracing allocations. Each report keeps its snapshot, so the next
+        one also shows what grew since, such as objects leaked by repeated edits.
+        """
+        HarnessMemory.start()
+        widgets = {"cut list": self.CutListEditTab, "window": self.root}
+        report = HarnessMemory.memory_report(self.HDF, self.undo_manager, widgets, baseline=self._memory_baseline)
+        self._memory_baseline = report.get("snapshot")
 
+        top = tk.Toplevel(self.root)
+        top.title("Memory Report")
+        text = tk.Text(top, width=90, height=40, font=("Courier", 10), wrap="none")
+        text.insert("1.0", HarnessMemory.format_report(report))
+        text.config(state="disabled")
+        text.pack(expand=True, fill="both")
 
-            row +=1
+    def _on_tab_changed(self, event=None):
+        """
+        Rebuilds the cut list when its tab is shown after wires were added or removed.
+        """
+        if self._cutlist_stale and self.tabControl.index("current") == 1:
+            self.generate_cutlist()
+
+    def _on_model_events(self, events):
+        """
+        Updates the views after the harness changed.
+
+        The drawing frame is repainted. Rows of the cut list are updated in place for wires that
+        changed or whose connectors moved or flipped; the cut order is kept. When wires were added
+        or removed, the cut list is rebuilt, at once if it is shown or else when its tab is shown.
+        """
+        self.HDF.invalidate()
+        if not self._cutlist_labels:
+            return
+        if any(e.kind in (CREATED, DELETED, RESET) for e in events):
+            self._cutlist_stale = True
+            self._on_tab_changed()
+            return
+
+        wires = set()
+        connectors = set()
+        for e in events:
+            obj = e.obj
+            if isinstance(obj, HarnessComponents.Node):
+                obj = obj.parent
+            if isinstance(obj, HarnessComponents.Wire):
+                wires.add(obj)
+            elif isinstance(obj, HarnessComponents.Connector):
+                connectors.add(obj)
+        if connectors:
+            wires.update(w for w in self._cutlist_labels
+                         if w.nodes and (w.nodes[0].parent in connectors or w.nodes[-1].parent in connectors))
+        for wire in wires:
+            labels = self._cutlist_labels.get(wire)
+            if labels:
+                for label, value in zip(labels, HarnessCutSheet.cut_sheet_row(wire)):
+                    label.config(text=value)
+
+    def _cutlist_done(self, count):
+        """
+        Reports a finished cut list.
+        """
+        self._cutlist_job = None
+        self._set_status(f"Cut list: {count} wires")
+
+    def cut_order(self):
+        """
+        Returns the wires in the order they should be cut.
+
+        When "Optimize Cut Order" is enabled, the wires are scheduled to minimize reel changeovers
+        and the changeovers before and after are shown in the status bar.
+        """
+        if not self.optimize_cut_order.get():
+            return self.HDF.wires
+        ordered = HarnessCutSheet.schedule_cut_order(self.HDF.wires)
+        before = HarnessCutSheet.count_changeovers(self.HDF.wires)[0]
+        after = HarnessCutSheet.count_changeovers(ordered)[0]
+        self._set_status(f"Cut order: {before} -> {after} reel changeovers")
+        return ordered
 
     def wire_mode(self,*args):
         """
@@ -553,30 +938,160 @@ class HarnessITWindow():
                 if len(self.wirenodes) == 2:
                     w = HarnessComponents.Wire()
                     w.add_node(self.wirenodes[0])
-                    
-                    # Add two intermediate nodes
-                    start_pos = self.wirenodes[0].rect.center
-                    end_pos = self.wirenodes[1].rect.center
-                    
-                    x_dist = (end_pos[0] - start_pos[0]) / 3
-                    y_dist = (end_pos[1] - start_pos[1]) / 3
-
-                    pos1 = (start_pos[0] + x_dist, start_pos[1] + y_dist)
-                    pos2 = (start_pos[0] + 2 * x_dist, start_pos[1] + 2 * y_dist)
-
-                    node1 = HarnessComponents.Node(pos1, w, 0, 0)
-                    node2 = HarnessComponents.Node(pos2, w, 0, 0)
-
-                    w.add_node(node1)
-                    w.add_node(node2)
+
+                    points = None
+                    if self.auto_route.get():
+                        points = self._router().route(self.wirenodes[0], self.wirenodes[1])
+                    if points is None:
+                        # Add two intermediate nodes
+                        start_pos = self.wirenodes[0].rect.center
+                        end_pos = self.wirenodes[1].rect.center
+
+                        x_dist = (end_pos[0] - start_pos[0]) / 3
+                        y_dist = (end_pos[1] - start_pos[1]) / 3
+
+                        points = [(start_pos[0] + x_dist, start_pos[1] + y_dist),
+                                  (start_pos[0] + 2 * x_dist, start_pos[1] + 2 * y_dist)]
+
+                    for pos in points:
+                        w.add_node(HarnessComponents.Node(pos, w, 0, 0))
                     w.add_node(self.wirenodes[1])
+                    self.length_engine.apply_service_loops(w)
+                    self._update_lengths(w)
 
                     self.HDF.wires.append(w)
+                    bus.emit(CREATED, w)
                     action = CreateAction(self, w)
                     self.undo_manager.register(action)
                     self.wirenodes.clear()
                     self._set_mode("selecting")
 
+    def _router(self):
+        """
+        Returns a router for the current harness and grid.
+        """
+        return HarnessRouter.Router(self.HDF.connectors, self.grid_size)
+
+    def route_wires(self, wires):
+        """
+        Routes wires around the connectors, as one undoable step.
+        """
+        router = self._router()
+        routes = []
+        for wire in wires:
+            points = router.route_wire(wire)
+            if points is not None:
+                routes.append((wire, points))
+        self._apply_routes(routes, len(wires))
+
+    def route_selected_wires(self, *args):
+        """
+        Routes the selected wires.
+        """
+        self.route_wires(HarnessSelection.selection_parts(self.HDF.selected)[1])
+
+    def route_all_wires(self, *args):
+        """
+        Routes every wire in the background, a few at a time, as one undoable step.
+        """
+        wires = list(self.HDF.wires)
+        self.jobs.submit_steps("Routing wires", self._route_steps(wires),
+                               on_done=lambda routes: self._apply_routes(routes, len(wires)),
+                               on_error=self._job_failed)
+
+    def _route_steps(self, wires):
+        """
+        Finds routes for wires, one per step. The harness is changed only when all are found.
+
+        Returns:
+            list: Tuples of (wire, points) for the wires a route was found for.
+        """
+        router = self._router()
+        routes = []
+        for i, wire in enumerate(wires):
+            points = router.route_wire(wire)
+            if points is not None:
+                routes.append((wire, points))
+            yield (i + 1, len(wires))
+        return routes
+
+    def _apply_routes(self, routes, count):
+        """
+        Replaces the bend nodes of wires with their routes and registers the change for undo.
+
+        Args:
+            routes (list): Tuples of (wire, points).
+            count (int): The number of wires routing was tried for, for the status bar.
+        """
+        # Wires deleted while the routes were found are left alone.
+        present = set(self.HDF.wires)
+        routes = [(wire, points) for wire, points in routes if wire in present]
+        if routes:
+            changes = []
+            with bus.transaction():
+                for wire, points in routes:
+                    changes.append((wire, list(wire.nodes), list(wire.lengths)))
+                    HarnessRouter.apply_route(wire, points)
+                    bus.emit(CHANGED, wire, property="nodes")
+                self._update_group_lengths([wire for wire, _ in routes])
+            self.undo_manager.register(RouteAction(changes))
+        self._set_status(f"Routed {len(routes)} of {count} wires")
+
+    def auto_layout(self, *args):
+        """
+        Places the selected connectors, or all of them if fewer than two are selected, so the wires
+        between them are short, as one undoable step. The other connectors stay where they are.
+        """
+        connectors = HarnessSelection.selection_parts(self.HDF.selected)[0]
+        if len(connectors) < 2:
+            connectors = list(self.HDF.connectors)
+        if len(connectors) < 2:
+            return
+        placed = set(connectors)
+        others = [c for c in self.HDF.connectors if c not in placed]
+        try:
+            centers = HarnessLayout.layout_connectors(connectors, self.HDF.wires, self.grid_size,
+                                                      snap=self.HDF.snap_to_grid, obstacles=others)
+        except RuntimeError as e:
+            self._set_status(f"Failed: {e}")
+            return
+
+        wires = HarnessSelection.attached_wires(self.HDF.wires, connectors)
+        old_centers = [c.rect.center for c in connectors]
+        nodes = [n for w in wires for n in w.nodes if n.parent is w]
+        old_points = [(n.x, n.y) for n in nodes]
+        with bus.transaction():
+            HarnessLayout.apply_layout(connectors, centers, wires)
+            for obj in connectors + wires:
+                bus.emit(MOVED, obj)
+            self._update_group_lengths(wires)
+        self.undo_manager.register(LayoutAction(connectors, old_centers, nodes, old_points, wires))
+        self._set_status(f"Laid out {len(connectors)} connectors")
+
+    def select_net(self, node):
+        """
+        Selects the wires of the net a pin or a wire's node is in, and shows its size.
+        """
+        if isinstance(node.parent, HarnessComponents.Wire):
+            node = node.parent.nodes[0]
+        pins = self.connectivity.net(node)
+        wires = self.connectivity.net_wires(node)
+        self.HDF.selected[:] = wires
+        self.properties.frame.grid_forget()
+        self.HDF.invalidate()
+        self._set_status(f"{HarnessNets.pin_label(HarnessNets.pin_key(node))}: net of {len(pins)} pins and {len(wires)} wires")
+
+    def select_unconnected_pins(self, *args):
+        """
+        Selects the connectors that have pins without a wire, and shows how many pins.
+        """
+        pins = self.connectivity.isolated_pins()
+        connectors = list(dict.fromkeys(connector for connector, _ in pins))
+        self.HDF.selected[:] = connectors
+        self.properties.frame.grid_forget()
+        self.HDF.invalidate()
+        self._set_status(f"{len(pins)} unconnected pins on {len(connectors)} connectors")
+
     def move_mode(self, *args):
         """
         Enters 'moving' mode, allowing the user to move selected objects.
@@ -585,29 +1100,48 @@ class HarnessITWindow():
         
     def flip(self,*args):
         """
-        Flips the currently selected connector.
+        Flips the currently selected connectors.
         """
-        if len(self.HDF.selected) > 0:
-            sel = self.HDF.selected[0]
-            self.flip_object(sel)
+        self.flip_objects(self.HDF.selected)
 
     def resize(self,*args):
         """
         Resizes the drawing canvas.
         """
         self.HDF.resize()
+        self.HDF.invalidate()
 
     def undo(self, event=None):
         """
         Undoes the last action.
         """
-        self.undo_manager.undo()
+        # Deliver the changes after the lengths are up to date.
+        with bus.transaction():
+            action = self.undo_manager.undo()
+            self._update_lengths_after(action)
 
     def redo(self, event=None):
         """
         Redoes the last undone action.
         """
-        self.undo_manager.redo()
+        with bus.transaction():
+            action = self.undo_manager.redo()
+            self._update_lengths_after(action)
+
+    def _update_lengths_after(self, action):
+        """
+        Recomputes wire lengths after an action was undone or redone.
+        """
+        if isinstance(action, MoveAction):
+            self._update_lengths(action.obj)
+        elif isinstance(action, FlipAction):
+            self._update_lengths(action.obj)
+        elif isinstance(action, GroupMoveAction):
+            self._update_group_lengths(action.group.wires)
+        elif isinstance(action, GroupFlipAction):
+            self._update_group_lengths(HarnessSelection.attached_wires(self.HDF.wires, action.connectors))
+        elif isinstance(action, LayoutAction):
+            self._update_group_lengths(action.wires)
 
     def copy(self, event=None):
         """
@@ -628,6 +1162,8 @@ class HarnessITWindow():
             return
 
         pasted_objects = self.paste_selection(self.clipboard)
+        if self.auto_lengths.get():
+            self.length_engine.update_all([obj for obj in pasted_objects if isinstance(obj, HarnessComponents.Wire)])
         action = PasteAction(self, pasted_objects)
         self.undo_manager.register(action)
 
@@ -643,17 +1179,11 @@ class HarnessITWindow():
             "wires": [],
         }
 
-        selected_connectors = [obj for obj in self.HDF.selected if isinstance(obj, HarnessComponents.Connector)]
+        selected_connectors, selected_wires, _ = HarnessSelection.selection_parts(self.HDF.selected)
         
         for c in selected_connectors:
             clipboard_data["connectors"].append(c.to_dict())
 
-        selected_wires = []
-        for obj in self.HDF.selected:
-            if isinstance(obj, HarnessComponents.Node) and isinstance(obj.parent, HarnessComponents.Wire):
-                if obj.parent not in selected_wires:
-                    selected_wires.append(obj.parent)
-        
         for w in selected_wires:
             clipboard_data["wires"].append(w.to_dict(self.HDF.connectors))
 
@@ -666,17 +1196,20 @@ class HarnessITWindow():
         pasted_objects = []
         new_connectors = []
         
-        for c_data in clipboard_data["connectors"]:
-            c_data["pos"] = (c_data["pos"][0] + 20, c_data["pos"][1] + 20)
-            connector = HarnessComponents.Connector.from_dict(c_data)
-            self.HDF.connectors.append(connector)
-            new_connectors.append(connector)
-            pasted_objects.append(connector)
-
-        for w_data in clipboard_data["wires"]:
-            wire = HarnessComponents.Wire.from_dict(w_data, self.HDF.connectors)
-            self.HDF.wires.append(wire)
-            pasted_objects.append(wire)
+        with bus.transaction():
+            for c_data in clipboard_data["connectors"]:
+                c_data["pos"] = (c_data["pos"][0] + 20, c_data["pos"][1] + 20)
+                connector = HarnessComponents.Connector.from_dict(c_data)
+                self.HDF.connectors.append(connector)
+                new_connectors.append(connector)
+                pasted_objects.append(connector)
+                bus.emit(CREATED, connector)
+
+            for w_data in clipboard_data["wires"]:
+                wire = HarnessComponents.Wire.from_dict(w_data, self.HDF.connectors)
+                self.HDF.wires.append(wire)
+                pasted_objects.append(wire)
+                bus.emit(CREATED, wire)
             
         return pasted_objects
 
@@ -688,6 +1221,7 @@ class HarnessITWindow():
         self.HDF.connectors.clear()
         self.HDF.wires.clear()
         self.undo_manager.clear()
+        bus.emit(RESET)
 
     def save_harness(self, event=None):
         """
@@ -700,13 +1234,13 @@ class HarnessITWindow():
         if not filepath:
             return
 
-        harness_data = {
-            "connectors": [c.to_dict() for c in self.HDF.connectors],
-            "wires": [w.to_dict(self.HDF.connectors) for w in self.HDF.wires],
-        }
-
-        with open(filepath, "w") as f:
-            json.dump(harness_data, f, indent=4)
+        # Take a copy of the harness here; encoding and writing it, which is mostly I/O, runs on a
+        # worker thread.
+        with profiler.timer("save"):
+            data = HarnessFile.harness_to_dict(self.HDF.connectors, self.HDF.wires)
+        self.jobs.submit("Saving harness", HarnessFile.write_harness_data, filepath, data,
+                         on_done=lambda result: self._set_status(f"Saved {filepath}"),
+                         on_error=self._job_failed)
 
     def open_harness(self, event=None):
         """
@@ -718,18 +1252,32 @@ class HarnessITWindow():
         if not filepath:
             return
 
-        with open(filepath, "r") as f:
-            harness_data = json.load(f)
+        self.jobs.submit("Opening harness", HarnessFile.load_harness, filepath, HarnessComponents.Connector,
+                         progress=True, on_done=lambda harness: self._open_loaded(filepath, harness),
+                         on_error=self._job_failed)
 
-        self.new_harness()
-        
-        for c_data in harness_data["connectors"]:
-            connector = HarnessComponents.Connector.from_dict(c_data)
-            self.HDF.connectors.append(connector)
+    def _open_loaded(self, filepath, harness):
+        """
+        Replaces the harness with one loaded in the background.
+        """
+        connectors, wires = harness
+        with profiler.timer("open"), bus.transaction():
+            self.new_harness()
+            self.HDF.connectors.extend(connectors)
+            self.HDF.wires.extend(wires)
+            # Keep the lengths stored in the file; only a file without any is measured.
+            if not HarnessWireLength.has_lengths(wires):
+                self.recompute_lengths()
+        self._set_status(f"Opened {filepath}")
 
-        for w_data in harness_data["wires"]:
-            wire = HarnessComponents.Wire.from_dict(w_data, self.HDF.connectors)
-            self.HDF.wires.append(wire)
+    def _job_failed(self, error):
+        """
+        Reports a background job that was cancelled or failed.
+        """
+        if isinstance(error, HarnessJobs.JobCancelled):
+            self._set_status(f"Cancelled: {error}")
+        else:
+            self._set_status(f"Failed: {type(error).__name__}: {error}")
 
     def export_cut_sheet(self, event=None):
         """
@@ -742,17 +1290,159 @@ class HarnessITWindow():
         if not filepath:
             return
 
-        with open(filepath, "w", newline="") as f:
-            writer = csv.writer(f)
-            headers = ["From Connector", "From Pin", "Wire Name", "Length", "Color", "To Pin", "To Connector"]
-            writer.writerow(headers)
+        rows = HarnessCutSheet.cut_sheet_rows(self.cut_order())
+        self.jobs.submit("Exporting cut sheet", HarnessCutSheet.write_cut_sheet_rows, filepath, rows,
+                         on_done=lambda result: self._set_status(f"Exported cut sheet to {filepath}"),
+                         on_error=self._job_failed)
+
+    def export_bom(self, event=None):
+        """
+        Exports the bill of materials to a CSV or JSON file.
+        """
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if not filepath:
+            return
+
+        self.bom.write(filepath)
+
+    def export_spool_plan(self, event=None):
+        """
+        Plans the spools needed to cut the wires and exports the plan to a CSV file.
+        """
+        spool_length = simpledialog.askfloat("Spool Plan", f"Spool length ({self.length_engine.unit}):",
+                                             initialvalue=self.spool_length, minvalue=1)
+        if not spool_length:
+            return
+        self.spool_length = spool_length
+
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+        )
+        if not filepath:
+            return
+
+        # The improvement pass takes up to its whole time budget, so it runs in the background on a
+        # copy of the wire list.
+        self.jobs.submit("Planning spools", HarnessSpool.write_spool_plan, filepath, list(self.HDF.wires),
+                         spool_length, mode="improve", time_budget=1.0, progress=True,
+                         on_done=self._spool_plan_written, on_error=self._job_failed)
+
+    def _spool_plan_written(self, plan):
+        """
+        Reports a spool plan written in the background.
+        """
+        status = f"Spool plan: {len(plan.spools)} spools, scrap {round(plan.scrap(), 1)} ({plan.utilization():.1%} used)"
+        if plan.oversize:
+            status += f", {len(plan.oversize)} wires longer than a spool"
+        self._set_status(status)
+
+
+    def export_image(self, event=None):
+        """
+        Renders the whole harness to a PNG image.
+        """
+        scale = simpledialog.askfloat("Export Image", "Pixels per world unit:", initialvalue=1.0, minvalue=0.01)
+        if not scale:
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG images", "*.png"), ("All files", "*.*")],
+        )
+        if not filepath:
+            return
+
+        options = HarnessDrawFrame.RenderOptions(
+            grid_visible=False, wire_names=self.view_wire_names.get(),
+            connector_names=self.view_connector_names.get(), pin_numbers=self.view_pin_numbers.get(), state="normal")
+        width, height = HarnessRender.render_png(filepath, self.HDF.connectors, self.HDF.wires, scale, options=options)
+        self._set_status(f"Exported {width}x{height} image to {filepath}")
+
+
+    def _svg_options(self):
+        """
+        Returns the SVG drawing options that match the view settings.
+        """
+        return {"pin_numbers": self.view_pin_numbers.get(), "connector_names": self.view_connector_names.get(),
+                "wire_names": self.view_wire_names.get()}
+
+    def _units_per_mm(self):
+        """
+        Returns the number of world units per millimeter from the length scale.
+        """
+        return self.length_engine.units_per_length / HarnessWireLength.UNITS[self.length_engine.unit]
+
+    def export_svg(self, event=None):
+        """
+        Exports the harness to a real-size SVG drawing.
+        """
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".svg",
+            filetypes=[("SVG files", "*.svg"), ("All files", "*.*")],
+        )
+        if not filepath:
+            return
+
+        HarnessSVG.write_svg(filepath, self.HDF.connectors, self.HDF.wires, self._units_per_mm(), **self._svg_options())
+
+    def export_svg_pages(self, event=None):
+        """
+        Exports the harness to a real-size SVG drawing split over pages, one file per page.
+        """
+        page = simpledialog.askstring("Formboard Pages", "Page size (" + ", ".join(HarnessSVG.PAGE_SIZES) + "):",
+                                      initialvalue="A3")
+        if not page:
+            return
+        if page not in HarnessSVG.PAGE_SIZES:
+            self._set_status(f"Unknown page size {page}")
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".svg",
+            filetypes=[("SVG files", "*.svg"), ("All files", "*.*")],
+        )
+        if not filepath:
+            return
+
+        files = HarnessSVG.write_svg_pages(filepath, self.HDF.connectors, self.HDF.wires, HarnessSVG.PAGE_SIZES[page],
+                                           self._units_per_mm(), **self._svg_options())
+        self._set_status(f"Exported {len(files)} {page} pages")
+
+    def toggle_input_recording(self, *args):
+        """
+        Starts or stops recording the editor input, saving the session to a file when it stops.
+
+        Sessions can be replayed headlessly with `HarnessReplay.py` to measure the latency of each
+        kind of event.
+        """
+        if self.record_input.get():
+            self.recorder.start()
+            self._set_status("Recording input")
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Input sessions", "*.json"), ("All files", "*.*")],
+        )
+        session = self.recorder.stop(filepath or None)
+        count = len(session["events"]) if session else 0
+        self._set_status(f"Saved {count} input events to {filepath}" if filepath else "Discarded input recording")
 
-            for w in self.HDF.wires:
-                from_connector = w.nodes[0].get_name()
-                from_pin = w.nodes[0].get_display_pin()
-                to_connector = w.nodes[-1].get_name()
-                to_pin = w.nodes[-1].get_display_pin()
-                writer.writerow([from_connector, from_pin, w.name, w.get_total_length(), w.get_color(), to_pin, to_connector])
+    def toggle_profile_session(self, *args):
+        """
+        Starts or stops recording a cProfile session, saving it to a .pstats file when it stops.
+        """
+        if self.profile_session.get():
+            profiler.start_session()
+            self._set_status("Recording profile")
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".pstats",
+            filetypes=[("Profile statistics", "*.pstats"), ("All files", "*.*")],
+        )
+        profiler.stop_session(filepath or None)
+        self._set_status(f"Saved profile to {filepath}" if filepath else "Discarded profile")
 
 
     def Run(self):
@@ -760,10 +1450,40 @@ class HarnessITWindow():
         Starts the main application loop.
         """
         self.running = True
-        while self.running:
-            self.HDF.draw()
-            self.HDF.update()
-            self.root.update()
+        try:
+            while self.running:
+                self._poll_jobs()
+                self.HDF.refresh()
+                with profiler.timer("display"):
+                    self.HDF.update()
+                with profiler.timer("tk"):
+                    self.root.update()
+                profiler.end_frame()
+        finally:
+            self.jobs.shutdown()
+
+    def _poll_jobs(self):
+        """
+        Delivers the results of finished background jobs and shows the progress of running ones.
+        """
+        with profiler.timer("jobs"):
+            if self.jobs.poll():
+                self.HDF.invalidate()
+        status = self.jobs.status()
+        if status != self._job_status:
+            # Keep the last message of a finished job, set by its callback.
+            if status:
+                self._set_status(status)
+            self._job_status = status
+
+
+def main():
+    """
+    Creates the main window and runs the application.
+    """
+    myApp = HarnessITWindow()
+    myApp.Run()
+
 
-myApp = HarnessITWindow()
-myApp.Run()
+if __name__ == "__main__":
+    main()
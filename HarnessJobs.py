@@ -0,0 +1,297 @@
+"""
+This module runs long operations in the background, so the window keeps responding.
+
+Jobs run on a thread pool for file I/O, on a process pool for CPU-heavy work such as encoding a
+large harness, or on the UI thread itself in small steps for work that must touch Tk widgets. The
+window's main loop calls `JobManager.poll`, which runs the steps and hands the results of finished
+jobs to their callbacks on the UI thread, so only the callbacks change the model or the widgets.
+
+Step jobs, and thread jobs that report progress, can be cancelled while they run. Other jobs,
+such as saving a file, can be cancelled only until they start; after that they run to the
+end and their result is delivered, so a file being written is never reported as cancelled.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+THREAD_WORKERS = 4
+# Seconds of step jobs run per poll, so the UI keeps drawing.
+STEP_BUDGET = 0.02
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job when it has been cancelled.
+    """
+
+
+class Job():
+    """
+    A running operation, its progress and its result.
+    """
+    def __init__(self, name, on_done=None, on_error=None):
+        """
+        Initializes the Job.
+
+        Args:
+            name (str): A name to show while the job runs, such as "Saving harness".
+            on_done (function, optional): Called with the result on the UI thread.
+            on_error (function, optional): Called with the exception on the UI thread.
+        """
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.done = 0
+        self.total = 0
+        self.message = None
+        self.future = None
+        self.steps = None
+        # Whether the job checks for cancellation as it runs.
+        self.checks = False
+        self._cancelled = threading.Event()
+
+    def progress(self, done, total=None, message=None):
+        """
+        Reports progress from inside the job, and stops the job if it has been cancelled.
+
+        Args:
+            done (int): The units of work done.
+            total (int, optional): The units of work in all, if known.
+            message (str, optional): What the job is doing now.
+
+        Raises:
+            JobCancelled: If the job has been cancelled.
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.check()
+
+    def check(self):
+        """
+        Raises JobCancelled if the job has been cancelled.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled(self.name)
+
+    def cancel(self):
+        """
+        Asks the job to stop, if it can.
+
+        Returns:
+            bool: Whether the job will stop. A job that has finished its work, or that does not
+            check for cancellation and has already started, runs to the end.
+        """
+        if self.future is not None and self.future.done():
+            return self._cancelled.is_set()
+        if self.future is not None and self.future.cancel():
+            self._cancelled.set()
+        elif self.checks or self.steps is not None:
+            self._cancelled.set()
+        return self._cancelled.is_set()
+
+    def cancellable(self):
+        """
+        Returns whether the job can still be cancelled.
+        """
+        if self.steps is not None:
+            return True
+        if self.future.done():
+            return False
+        return self.checks or not self.future.running()
+
+    def cancelled(self):
+        """
+        Returns whether the job has been cancelled.
+        """
+        return self._cancelled.is_set()
+
+    def status(self):
+        """
+        Returns a line describing the job's progress.
+        """
+        text = self.message or self.name
+        if self.total:
+            text += " %d%%" % (100 * self.done // self.total)
+        return text + "..."
+
+
+class JobManager():
+    """
+    Runs jobs on worker pools and on the UI thread, and delivers their results on the UI thread.
+    """
+    def __init__(self, threads=THREAD_WORKERS, processes=None, step_budget=STEP_BUDGET):
+        """
+        Initializes the JobManager. The pools are started the first time they are needed.
+
+        Args:
+            threads (int, optional): Threads for I/O jobs. Defaults to THREAD_WORKERS.
+            processes (int, optional): Processes for CPU-heavy jobs. Defaults to one per CPU.
+            step_budget (float, optional): Seconds of step jobs run per poll. Defaults to STEP_BUDGET.
+        """
+        self.threads = threads
+        self.processes = processes
+        self.step_budget = step_budget
+        self.jobs = []
+        self._thread_pool = None
+        self._process_pool = None
+
+    def submit(self, name, func, *args, on_done=None, on_error=None, progress=False, **kwargs):
+        """
+        Runs a function on the thread pool.
+
+        Args:
+            name (str): A name to show while the job runs.
+            func (function): The function to run.
+            *args: Arguments for the function.
+            on_done (function, optional): Called with the result on the UI thread.
+            on_error (function, optional): Called with the exception on the UI thread.
+            progress (bool, optional): Whether to pass the job's `progress` method to the function
+                as its `progress` keyword argument. Defaults to False.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Job: The job.
+        """
+        job = Job(name, on_done, on_error)
+        if progress:
+            kwargs["progress"] = job.progress
+            job.checks = True
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="HarnessJob")
+        job.future = self._thread_pool.submit(func, *args, **kwargs)
+        self.jobs.append(job)
+        return job
+
+    def submit_process(self, name, func, *args, on_done=None, on_error=None):
+        """
+        Runs a function in the process pool. The function and its arguments must be picklable.
+
+        Returns:
+            Job: The job.
+        """
+        job = Job(name, on_done, on_error)
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        job.future = self._process_pool.submit(func, *args)
+        self.jobs.append(job)
+        return job
+
+    def submit_steps(self, name, steps, on_done=None, on_error=None):
+        """
+        Runs a generator on the UI thread a little at a time, for work that must touch Tk widgets.
+
+        The generator may yield (done, total) to report progress. Its return value is the result.
+
+        Returns:
+            Job: The job.
+        """
+        job = Job(name, on_done, on_error)
+        job.steps = steps
+        self.jobs.append(job)
+        return job
+
+    def busy(self):
+        """
+        Returns whether any job is running.
+        """
+        return bool(self.jobs)
+
+    def status(self):
+        """
+        Returns a line describing the running jobs, or an empty string.
+        """
+        if not self.jobs:
+            return ""
+        text = "; ".join(job.status() for job in self.jobs)
+        if any(job.cancellable() for job in self.jobs):
+            text += " (Esc to cancel)"
+        return text
+
+    def cancel_all(self):
+        """
+        Asks every running job to stop.
+
+        Returns:
+            list: The jobs that have started and cannot be stopped; they run to the end.
+        """
+        return [job for job in self.jobs if not job.cancel()]
+
+    def _run_steps(self, job, deadline):
+        """
+        Runs a step job until it finishes or the deadline passes.
+
+        Returns:
+            tuple: A tuple of (finished, result, error).
+        """
+        try:
+            while time.perf_counter() < deadline:
+                job.check()
+                step = next(job.steps)
+                if step is not None:
+                    job.progress(*step)
+        except StopIteration as stop:
+            return True, stop.value, None
+        except Exception as e:
+            job.steps.close()
+            return True, None, e
+        return False, None, None
+
+    def poll(self):
+        """
+        Runs step jobs for a while and delivers the results of finished jobs. Call it from the UI
+        thread, once per frame.
+
+        Returns:
+            bool: True if a job finished.
+        """
+        if not self.jobs:
+            return False
+        finished = False
+        deadline = time.perf_counter() + self.step_budget
+        for job in list(self.jobs):
+            if job.steps is not None:
+                done, result, error = self._run_steps(job, deadline)
+                if not done:
+                    continue
+            elif job.future.done():
+                error = None
+                result = None
+                if job.future.cancelled():
+                    error = JobCancelled(job.name)
+                elif job.future.exception() is not None:
+                    error = job.future.exception()
+                else:
+                    result = job.future.result()
+                    if job.cancelled():
+                        error = JobCancelled(job.name)
+            else:
+                continue
+
+            self.jobs.remove(job)
+            finished = True
+            if error is None:
+                if job.on_done is not None:
+                    job.on_done(result)
+            elif job.on_error is not None:
+                job.on_error(error)
+        return finished
+
+    def shutdown(self):
+        """
+        Cancels the running jobs and stops the pools.
+        """
+        self.cancel_all()
+        for job in self.jobs:
+            if job.steps is not None:
+                job.steps.close()
+        self.jobs = []
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
@@ -0,0 +1,380 @@
+"""
+This module places connectors automatically, so the wires between them are short and cross little.
+
+The harness is treated as a graph: the connectors are its vertices and each pair of connectors
+joined by wires is an edge, weighted by the number of wires. The layout is force-directed: the
+wires pull the connectors they join together, every connector pushes every other one away and a
+weak pull towards the middle keeps unconnected parts from drifting off. Connected groups gather
+and unrelated ones spread apart, which keeps the wires short and few of them crossing.
+
+To stay quick on thousands of connectors the layout is multilevel. The graph is coarsened by
+merging the pairs of connectors joined by the most wires, level by level, until a few dozen
+clusters remain. The clusters are laid out first; then each level is spread back into its parts
+and refined with a few more iterations. An iteration is a handful of NumPy operations: the pulls
+are summed over the edges, and on large levels the pushes are spread over a grid of cells and
+summed with FFTs, so an iteration over ten thousand connectors takes a few milliseconds.
+
+Last, the connectors are snapped to the grid, each to the free spot nearest to where the forces
+left it, keeping a grid step between connectors for the wires.
+
+Like `HarnessModel`, this module has no pygame or Tk dependency. It needs NumPy.
+"""
+
+import math
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# The distance between connected connectors the forces aim for, as a multiple of the mean size
+# of a connector with a grid step around it.
+SPACING = 1.2
+# The strength of the pull towards the middle, relative to a wire's.
+GRAVITY = 0.3
+# Coarsening stops at this many clusters, or when a level would merge fewer than a fifth of them.
+COARSEST = 32
+MIN_SHRINK = 0.8
+# Iterations on the coarsest level and on each level after it.
+COARSE_ITERATIONS = 200
+REFINE_ITERATIONS = 25
+# Up to this many clusters the pushes are computed between every pair.
+EXACT_LIMIT = 128
+# Clusters per cell of the grid that approximates the pushes on larger levels, and the most cells
+# along a side of it.
+CELL_OCCUPANCY = 2
+MAX_CELLS = 128
+
+
+def connector_graph(connectors, wires):
+    """
+    Returns the edges of the graph of connectors and the wires between them.
+
+    Wires with an end off the connectors, or with both ends on the same connector, are left out.
+
+    Args:
+        connectors (list): The connectors.
+        wires (list): The wires of the harness.
+
+    Returns:
+        dict: The number of wires by (index, index) pair of connectors, the lower index first.
+    """
+    index = {c: i for i, c in enumerate(connectors)}
+    edges = {}
+    for wire in wires:
+        if len(wire.nodes) < 2:
+            continue
+        a = index.get(wire.nodes[0].parent)
+        b = index.get(wire.nodes[-1].parent)
+        if a is None or b is None or a == b:
+            continue
+        key = (a, b) if a < b else (b, a)
+        edges[key] = edges.get(key, 0) + 1
+    return edges
+
+
+def _coarsen(count, edges):
+    """
+    Merges the vertices of a graph in pairs, the pairs joined by the heaviest edges first. A
+    vertex left without a partner, such as one of many joined only to the same vertex, then joins
+    the pair of its heaviest neighbor, if that pair has no third vertex yet.
+
+    Returns:
+        tuple: A tuple of (the merged vertex of each vertex, the number of merged vertices).
+    """
+    parent = [-1] * count
+    merged = 0
+    heaviest = sorted(edges.items(), key=lambda item: -item[1])
+    for (a, b), _ in heaviest:
+        if parent[a] < 0 and parent[b] < 0:
+            parent[a] = parent[b] = merged
+            merged += 1
+    members = [2] * merged
+    for (a, b), _ in heaviest:
+        if parent[a] < 0 and parent[b] >= 0:
+            a, b = b, a
+        if parent[a] >= 0 and parent[b] < 0 and members[parent[a]] < 3:
+            parent[b] = parent[a]
+            members[parent[a]] += 1
+    for i in range(count):
+        if parent[i] < 0:
+            parent[i] = merged
+            merged += 1
+    return parent, merged
+
+
+def _contract(edges, parent):
+    """
+    Returns the edges between the merged vertices, with the weights of the edges they replace.
+    """
+    merged = {}
+    for (a, b), weight in edges.items():
+        a = parent[a]
+        b = parent[b]
+        if a == b:
+            continue
+        key = (a, b) if a < b else (b, a)
+        merged[key] = merged.get(key, 0) + weight
+    return merged
+
+
+def _repulsion(pos, mass):
+    """
+    Returns the push on each vertex from all the others, for a unit ideal distance: the mass of
+    each pair over their distance, along the line between them.
+    """
+    count = len(pos)
+    if count <= EXACT_LIMIT:
+        dx = pos[:, 0, None] - pos[None, :, 0]
+        dy = pos[:, 1, None] - pos[None, :, 1]
+        d2 = dx * dx + dy * dy
+        np.fill_diagonal(d2, np.inf)
+        weight = mass[None, :] / np.maximum(d2, 1e-9)
+        return mass[:, None] * np.stack(((dx * weight).sum(axis=1), (dy * weight).sum(axis=1)), axis=1)
+
+    # The other cells push with their whole mass from their centers. The push of every cell on
+    # every other is a convolution of the cells' masses, done with FFTs.
+    side = min(MAX_CELLS, max(2, int(math.sqrt(count / CELL_OCCUPANCY))))
+    lo = pos.min(axis=0)
+    size = (pos.max(axis=0) - lo) / side + 1e-9
+    cell = np.minimum(((pos - lo) / size).astype(np.int64), side - 1)
+    index = cell[:, 0] * side + cell[:, 1]
+    cell_mass = np.bincount(index, mass, side * side)
+    offsets = np.arange(2 * side) - np.where(np.arange(2 * side) < side, 0, 2 * side)
+    ox = offsets[:, None] * size[0]
+    oy = offsets[None, :] * size[1]
+    d2 = ox * ox + oy * oy
+    d2[0, 0] = np.inf
+    grid = np.fft.rfft2(cell_mass.reshape(side, side), (2 * side, 2 * side))
+    shape = (2 * side, 2 * side)
+    fx = np.fft.irfft2(grid * np.fft.rfft2(ox / d2), shape)[:side, :side].ravel()
+    fy = np.fft.irfft2(grid * np.fft.rfft2(oy / d2), shape)[:side, :side].ravel()
+    force = np.stack((fx[index], fy[index]), axis=1)
+
+    # A vertex's own cell pushes it as the center of mass of the cell's other vertices.
+    cx = np.bincount(index, mass * pos[:, 0], side * side)
+    cy = np.bincount(index, mass * pos[:, 1], side * side)
+    rest = cell_mass[index] - mass
+    alone = rest <= 0
+    rest[alone] = 1
+    away = pos - np.stack((cx[index] - mass * pos[:, 0], cy[index] - mass * pos[:, 1]), axis=1) / rest[:, None]
+    near = np.where(alone, 0, rest / np.maximum((away ** 2).sum(axis=1), 1e-9))
+    force += away * near[:, None]
+    return mass[:, None] * force
+
+
+def _relax(pos, mass, edges, iterations, temperature):
+    """
+    Moves the vertices of one level under the forces, for a unit ideal distance.
+
+    Each vertex moves along the force on it, by at most the temperature, which falls to nothing
+    over the iterations.
+    """
+    count = len(pos)
+    if edges:
+        pairs = np.array(list(edges), dtype=np.int64)
+        u = pairs[:, 0]
+        v = pairs[:, 1]
+        weight = np.array(list(edges.values()), dtype=float)
+    for step in range(iterations):
+        force = _repulsion(pos, mass)
+        force -= GRAVITY * mass[:, None] * (pos - (pos * mass[:, None]).sum(axis=0) / mass.sum())
+        if edges:
+            delta = pos[u] - pos[v]
+            pull = delta * (weight * np.sqrt((delta ** 2).sum(axis=1)))[:, None]
+            for axis in (0, 1):
+                force[:, axis] -= np.bincount(u, pull[:, axis], count)
+                force[:, axis] += np.bincount(v, pull[:, axis], count)
+        move = force / mass[:, None]
+        length = np.maximum(np.sqrt((move ** 2).sum(axis=1)), 1e-9)
+        limit = temperature * (1 - step / iterations)
+        pos += move * (np.minimum(length, limit) / length)[:, None]
+    return pos
+
+
+def layout_positions(count, edges, seed=0):
+    """
+    Lays out a graph with multilevel force-directed placement.
+
+    Args:
+        count (int): The number of vertices.
+        edges (dict): The edge weights by (vertex, vertex) pair, as from `connector_graph`.
+        seed (int, optional): The random seed of the starting layout. Defaults to 0.
+
+    Returns:
+        numpy.ndarray: A (count, 2) array of positions, for an ideal distance of 1 between
+        connected vertices.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    if np is None:
+        raise RuntimeError("automatic layout needs NumPy")
+    rng = np.random.default_rng(seed)
+    levels = []
+    masses = [np.ones(count)]
+    level_edges = [edges]
+    while count > COARSEST:
+        parent, merged = _coarsen(count, level_edges[-1])
+        if merged > MIN_SHRINK * count:
+            break
+        parent = np.array(parent, dtype=np.int64)
+        levels.append(parent)
+        level_edges.append(_contract(level_edges[-1], parent.tolist()))
+        masses.append(np.bincount(parent, masses[-1], merged))
+        count = merged
+
+    side = math.sqrt(masses[-1].sum())
+    pos = rng.uniform(0, side, (count, 2))
+    pos = _relax(pos, masses[-1], level_edges[-1], COARSE_ITERATIONS, side / 4)
+    for parent, mass, edges in zip(reversed(levels), reversed(masses[:-1]), reversed(level_edges[:-1])):
+        # The parts of a cluster start around it, a little apart.
+        pos = pos[parent] + rng.uniform(-0.25, 0.25, (len(parent), 2))
+        pos = _relax(pos, mass, edges, REFINE_ITERATIONS, 1.0)
+    return pos
+
+
+def _footprint(center, size, grid_size):
+    """
+    Returns the grid points a connector centered at a point covers, with a grid step around it,
+    as (first column, last column, first row, last row).
+    """
+    g = grid_size
+    half_w = size[0] / 2 + g
+    half_h = size[1] / 2 + g
+    return (math.ceil((center[0] - half_w) / g), math.floor((center[0] + half_w) / g),
+            math.ceil((center[1] - half_h) / g), math.floor((center[1] + half_h) / g))
+
+
+def _legalize(targets, sizes, grid_size, snap, obstacles=()):
+    """
+    Places each connector on the grid at the free spot nearest to its target, the ones nearest
+    the middle first.
+
+    Args:
+        targets (list): The (x, y) center each connector should go to.
+        sizes (list): The (width, height) of each connector.
+        grid_size (int): The spacing of the grid.
+        snap (function): Snaps a point to the grid.
+        obstacles (list, optional): The rects of connectors that stay where they are.
+
+    Returns:
+        list: The (x, y) center of each connector.
+    """
+    g = grid_size
+    taken = set()
+    for rect in obstacles:
+        i0, i1, j0, j1 = _footprint(rect.center, rect.size, g)
+        taken.update((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    def free(i0, i1, j0, j1):
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                if (i, j) in taken:
+                    return False
+        return True
+
+    mx = sum(x for x, _ in targets) / len(targets)
+    my = sum(y for _, y in targets) / len(targets)
+    order = sorted(range(len(targets)), key=lambda i: (targets[i][0] - mx) ** 2 + (targets[i][1] - my) ** 2)
+    centers = [None] * len(targets)
+    radius = 0
+    spots = [(0, 0)]
+    for k in order:
+        x, y = snap(*targets[k])
+        i0, i1, j0, j1 = _footprint((x, y), sizes[k], g)
+        while centers[k] is None:
+            # The grid steps to try moving by, nearest first.
+            for dx, dy in spots:
+                if free(i0 + dx, i1 + dx, j0 + dy, j1 + dy):
+                    taken.update((i, j) for i in range(i0 + dx, i1 + dx + 1) for j in range(j0 + dy, j1 + dy + 1))
+                    centers[k] = (x + dx * g, y + dy * g)
+                    break
+            else:
+                radius = radius * 2 + 4
+                spots = sorted(((dx, dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)),
+                               key=lambda d: d[0] * d[0] + d[1] * d[1])
+    return centers
+
+
+def layout_connectors(connectors, wires, grid_size=25, snap=None, obstacles=(), seed=0):
+    """
+    Finds positions for connectors that keep the wires between them short and uncrossed.
+
+    The layout is centered where the connectors are now.
+
+    Args:
+        connectors (list): The connectors to place.
+        wires (list): The wires of the harness.
+        grid_size (int, optional): The spacing of the grid. Defaults to 25.
+        snap (function, optional): Snaps a point to the grid, such as `DrawFrame.snap_to_grid`.
+            Defaults to rounding to `grid_size`.
+        obstacles (list, optional): Connectors that stay where they are, for the placed ones to
+            keep clear of.
+        seed (int, optional): The random seed of the starting layout. Defaults to 0.
+
+    Returns:
+        list: The new (x, y) center of each connector.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    if not connectors:
+        return []
+    if snap is None:
+        def snap(x, y):
+            return round(x / grid_size) * grid_size, round(y / grid_size) * grid_size
+    sizes = [c.rect.size for c in connectors]
+    pos = layout_positions(len(connectors), connector_graph(connectors, wires), seed)
+    scale = SPACING * sum(math.sqrt((w + 2 * grid_size) * (h + 2 * grid_size)) for w, h in sizes) / len(sizes)
+    pos = pos * scale
+    centers = np.array([c.rect.center for c in connectors], dtype=float)
+    pos += centers.mean(axis=0) - pos.mean(axis=0)
+    return _legalize(pos.tolist(), sizes, grid_size, snap, [c.rect for c in obstacles])
+
+
+def apply_layout(connectors, centers, wires):
+    """
+    Moves connectors to new centers, and the bend nodes of the wires on them along with them.
+
+    A bend node moves by a blend of how far the two ends of its wire moved, weighted by how far
+    along the wire it is, so the wire keeps its shape as it stretches.
+
+    Args:
+        connectors (list): The connectors to move.
+        centers (list): The new (x, y) center of each connector.
+        wires (list): The wires of the harness.
+
+    Returns:
+        list: The wires with a moved end.
+    """
+    moving = set(connectors)
+    moved = []
+    for wire in wires:
+        nodes = wire.nodes
+        if len(nodes) < 2 or (nodes[0].parent not in moving and nodes[-1].parent not in moving):
+            continue
+        along = [0.0]
+        for a, b in zip(nodes, nodes[1:]):
+            along.append(along[-1] + math.hypot(b.x - a.x, b.y - a.y))
+        moved.append((wire, along))
+
+    offsets = {}
+    for c, center in zip(connectors, centers):
+        x, y = c.rect.x, c.rect.y
+        c.rect.center = center
+        c.update()
+        offsets[c] = (c.rect.x - x, c.rect.y - y)
+
+    for wire, along in moved:
+        nodes = wire.nodes
+        start = offsets.get(nodes[0].parent, (0, 0))
+        end = offsets.get(nodes[-1].parent, (0, 0))
+        total = along[-1] or 1.0
+        for node, distance in zip(nodes, along):
+            if node.parent is not wire:
+                continue
+            t = distance / total
+            node.x = round(node.x + start[0] + (end[0] - start[0]) * t)
+            node.y = round(node.y + start[1] + (end[1] - start[1]) * t)
+    return [wire for wire, _ in moved]
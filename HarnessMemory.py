@@ -0,0 +1,331 @@
+"""
+This module reports where the memory of a HarnessIT session goes.
+
+Python allocations are measured with `tracemalloc` snapshots and grouped by the module that made
+them. Pixel data of pygame surfaces and Tk widgets live outside Python's allocator and are not
+seen by `tracemalloc`, so the surfaces in the image caches are sized from their dimensions and the
+widgets are counted. Objects are counted per class of the harness model, and the objects held only
+by the undo and redo stacks are found by walking the stacks, since that is where deleted objects
+stay alive.
+
+Example:
+    python HarnessMemory.py harness.json
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stack frames kept per allocation; the innermost one decides the category.
+TRACE_FRAMES = 1
+# Lines shown in a comparison of two snapshots.
+TOP_LINES = 10
+# Modules whose allocations are grouped under a category, by file name.
+CATEGORIES = {
+    "HarnessModel.py": "harness objects",
+    "HarnessComponents.py": "harness objects",
+    "UndoManager.py": "undo history",
+    "HarnessFile.py": "serialization",
+    "HarnessDrawFrame.py": "drawing",
+    "HarnessITUtils.py": "drawing",
+    "HarnessMiniMap.py": "drawing",
+    "HarnessCutSheet.py": "cut list",
+    "HarnessConnectorLibrary.py": "library",
+}
+# Packages whose allocations are grouped under a category, by directory name.
+PACKAGE_CATEGORIES = {"tkinter": "widgets", "json": "serialization", "pygame": "drawing", "numpy": "drawing"}
+# Modules whose classes are counted.
+MODEL_MODULES = ("HarnessModel", "HarnessComponents", "UndoManager")
+
+
+def category(filename):
+    """
+    Returns the category of an allocation made in a file.
+    """
+    name = os.path.basename(filename)
+    if filename.startswith("<frozen"):
+        # Code objects and module data made while importing.
+        return "modules"
+    if name in CATEGORIES:
+        return CATEGORIES[name]
+    parts = filename.replace("\\", "/").split("/")
+    for package, label in PACKAGE_CATEGORIES.items():
+        if package in parts:
+            return label
+    return "other"
+
+
+def start(frames=TRACE_FRAMES):
+    """
+    Starts tracing allocations, if they are not traced already.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def take_snapshot():
+    """
+    Takes a snapshot of the traced allocations, without the tracing module's own.
+    """
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def by_category(snapshot):
+    """
+    Returns the traced bytes of a snapshot by category.
+
+    Returns:
+        dict: Bytes by category, largest first.
+    """
+    sizes = {}
+    for stat in snapshot.statistics("filename"):
+        label = category(stat.traceback[0].filename)
+        sizes[label] = sizes.get(label, 0) + stat.size
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+
+def compare(old, new, limit=TOP_LINES):
+    """
+    Returns the source lines whose allocations grew most between two snapshots.
+
+    Returns:
+        list: Tuples of (location, bytes added, blocks added), largest first.
+    """
+    rows = []
+    for stat in new.compare_to(old, "lineno")[:limit]:
+        frame = stat.traceback[0]
+        rows.append(("%s:%d" % (os.path.basename(frame.filename), frame.lineno), stat.size_diff, stat.count_diff))
+    return rows
+
+
+def object_counts():
+    """
+    Returns the number of live instances of each class of the harness model and the undo manager.
+
+    Returns:
+        dict: Counts by class name, such as "HarnessModel.Node".
+    """
+    counts = {}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__module__ in MODEL_MODULES:
+            name = "%s.%s" % (cls.__module__, cls.__name__)
+            counts[name] = counts.get(name, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def surface_bytes(surface):
+    """
+    Returns the bytes of pixel data of a pygame surface, or 0 for a subsurface, which shares its
+    parent's.
+    """
+    if surface is None or surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def image_memory(frame=None):
+    """
+    Returns the number and pixel bytes of the surfaces in each image cache.
+
+    Args:
+        frame (DrawFrame, optional): The drawing frame whose caches and screen to include.
+
+    Returns:
+        dict: Tuples of (surfaces, bytes) by cache name.
+    """
+    import HarnessComponents
+    import HarnessITUtils
+
+    caches = {
+        "connector images": list(HarnessComponents._images.values()),
+        "outline images": list(HarnessITUtils._outline_cache.values()),
+    }
+    if frame is not None:
+        caches["scaled images"] = list(frame._image_cache.values())
+        atlases = list(frame._atlases.values())
+        caches["image atlases"] = ([atlas.surface for atlas in atlases]
+                                   + [atlas._view[1] for atlas in atlases if atlas._view is not None])
+        caches["screen"] = [frame.screen]
+        if getattr(frame, "minimap", None) is not None:
+            caches["mini-map"] = [frame.minimap.view.screen]
+    return {name: (len(surfaces), sum(surface_bytes(s) for s in surfaces)) for name, surfaces in caches.items()}
+
+
+def widget_count(widget):
+    """
+    Returns the number of Tk widgets under a widget, the widget included.
+    """
+    return 1 + sum(widget_count(child) for child in widget.winfo_children())
+
+
+def undo_only_objects(undo_manager, connectors, wires):
+    """
+    Finds the harness objects kept alive by the undo and redo stacks that are not in the harness.
+
+    Args:
+        undo_manager (UndoManager): The undo manager.
+        connectors (list): The connectors in the harness.
+        wires (list): The wires in the harness.
+
+    Returns:
+        dict: Counts by class name of the objects reachable from the stacks only.
+    """
+    import HarnessModel
+
+    live = set()
+    for c in connectors:
+        live.add(id(c))
+        live.update(id(n) for n in c.nodes)
+    for w in wires:
+        live.add(id(w))
+        live.update(id(n) for n in w.nodes)
+
+    model_classes = (HarnessModel.Node, HarnessModel.Connector, HarnessModel.Wire)
+    counts = {}
+    seen = set()
+    pending = list(undo_manager.undo_stack) + list(undo_manager.redo_stack)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, model_classes) and id(obj) not in live:
+            name = type(obj).__name__
+            counts[name] = counts.get(name, 0) + 1
+        # Actions also refer to the app, which is not followed, or everything would be reachable.
+        if isinstance(obj, (list, tuple, dict, set)) or type(obj).__module__ in MODEL_MODULES:
+            pending.extend(gc.get_referents(obj))
+    return counts
+
+
+def memory_report(frame=None, undo_manager=None, widgets=None, baseline=None):
+    """
+    Builds a report of a session's memory.
+
+    Args:
+        frame (DrawFrame, optional): The drawing frame with the harness and the image caches.
+        undo_manager (UndoManager, optional): The undo manager whose stacks to walk.
+        widgets (dict, optional): Tk widgets by name whose descendants to count, such as the cut
+            list tab.
+        baseline (optional): A snapshot from `take_snapshot` to compare with, to find growth.
+
+    Returns:
+        dict: The report. It has "snapshot", which can be the baseline of the next report.
+    """
+    report = {"objects": object_counts(), "images": image_memory(frame)}
+    if frame is not None:
+        report["harness"] = {"connectors": len(frame.connectors), "wires": len(frame.wires),
+                             "nodes": sum(len(w.nodes) for w in frame.wires)}
+    if undo_manager is not None:
+        report["undo"] = {"undo actions": len(undo_manager.undo_stack),
+                          "redo actions": len(undo_manager.redo_stack),
+                          "held only by undo": undo_only_objects(
+                              undo_manager, frame.connectors if frame else [], frame.wires if frame else [])}
+    if widgets:
+        report["widgets"] = {name: widget_count(widget) for name, widget in widgets.items()}
+    if tracemalloc.is_tracing():
+        snapshot = take_snapshot()
+        report["snapshot"] = snapshot
+        report["traced"] = by_category(snapshot)
+        report["traced_peak"] = tracemalloc.get_traced_memory()[1]
+        if baseline is not None:
+            report["growth"] = compare(baseline, snapshot)
+    return report
+
+
+def _size(size):
+    """
+    Returns a byte count in readable units.
+    """
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return "%.1f %s" % (size, unit)
+        size /= 1024
+    return "%.1f GB" % size
+
+
+def format_report(report):
+    """
+    Returns a memory report as text.
+    """
+    lines = []
+    if "harness" in report:
+        lines.append("Harness: %(connectors)d connectors, %(wires)d wires, %(nodes)d wire nodes" % report["harness"])
+    if "traced" in report:
+        lines.append("")
+        lines.append("Python allocations (peak %s):" % _size(report["traced_peak"]))
+        for name, size in report["traced"].items():
+            lines.append("  %-20s %12s" % (name, _size(size)))
+    lines.append("")
+    lines.append("Surfaces (not traced):")
+    for name, (count, size) in report["images"].items():
+        lines.append("  %-20s %6d %12s" % (name, count, _size(size)))
+    if "widgets" in report:
+        lines.append("")
+        lines.append("Tk widgets (not traced):")
+        for name, count in report["widgets"].items():
+            lines.append("  %-20s %6d" % (name, count))
+    lines.append("")
+    lines.append("Objects:")
+    for name, count in report["objects"].items():
+        lines.append("  %-30s %8d" % (name, count))
+    if "undo" in report:
+        undo = report["undo"]
+        lines.append("")
+        lines.append("Undo: %d actions, %d redo actions" % (undo["undo actions"], undo["redo actions"]))
+        held = undo["held only by undo"]
+        lines.append("  held only by undo: " + (", ".join("%d %s" % (n, name) for name, n in held.items()) or "nothing"))
+    if "growth" in report:
+        lines.append("")
+        lines.append("Growth since the last report:")
+        for location, size, count in report["growth"]:
+            lines.append("  %-30s %12s %8d blocks" % (location, _size(size), count))
+    elif "traced" not in report:
+        lines.append("")
+        lines.append("Allocations are not traced; start tracing to see them by category.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Loads harness files and prints the memory they use.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Report the memory used by harness files.")
+    parser.add_argument("paths", nargs="+", help="harness JSON files")
+    parser.add_argument("--no-draw", action="store_true", help="do not draw the harness, which fills the image caches")
+    args = parser.parse_args(argv)
+
+    files = [os.path.abspath(p) for p in args.paths]
+    # Library image paths are relative to the application directory.
+    os.chdir(APP_DIR)
+    start()
+    import HarnessRender
+    HarnessRender.init_headless()
+    import HarnessComponents
+    import HarnessDrawFrame
+    import HarnessFile
+
+    baseline = take_snapshot()
+    frame = HarnessDrawFrame.OffscreenDrawFrame((1280, 800))
+    for filepath in files:
+        connectors, wires = HarnessFile.load_harness(filepath, HarnessComponents.Connector)
+        frame.connectors.extend(connectors)
+        frame.wires.extend(wires)
+    if not args.no_draw:
+        frame.draw()
+    report = memory_report(frame, baseline=baseline)
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+This module defines the mini-map, an overview of the whole harness drawn in a corner of the
+drawing frame.
+
+The overview is rendered at the far level of detail into a small cached surface. It is only
+rendered again after the harness changed, and then at most once per `MINIMAP_INTERVAL` seconds, so
+drawing it on top of a frame costs one blit and a rectangle.
+"""
+
+import time
+
+import pygame
+
+import HarnessDrawFrame
+import HarnessRender
+from HarnessProfiler import profiler
+
+MINIMAP_SIZE = (200, 150)
+# Screen pixels between the mini-map and the corner of the drawing frame.
+MINIMAP_MARGIN = 10
+# Seconds between renders of the overview while the harness keeps changing.
+MINIMAP_INTERVAL = 0.5
+# Fraction of the harness extent left empty around it.
+MINIMAP_PADDING = 0.05
+
+
+class MiniMap():
+    """
+    An overview of the whole harness with the visible area of a drawing frame marked on it.
+    """
+    def __init__(self, frame, size=MINIMAP_SIZE, visible=None, interval=MINIMAP_INTERVAL):
+        """
+        Initializes the MiniMap.
+
+        Args:
+            frame (DrawFrame): The drawing frame the mini-map belongs to.
+            size (tuple, optional): The (width, height) of the mini-map. Defaults to MINIMAP_SIZE.
+            visible (optional): A setting with get(), such as a tk.BooleanVar, that tells whether the
+                mini-map is shown. Defaults to shown.
+            interval (float, optional): Seconds between renders. Defaults to MINIMAP_INTERVAL.
+        """
+        self.frame = frame
+        self.size = size
+        self.visible = visible or HarnessDrawFrame.Setting(True)
+        self.interval = interval
+        self.view = HarnessDrawFrame.OffscreenDrawFrame(size, HarnessDrawFrame.RenderOptions(
+            grid_visible=False, pin_numbers=False))
+        self.view.screen.fill((60, 60, 60))
+        self._revision = None
+        self._stale = True
+        self._rendered_at = None
+
+    def rect(self):
+        """
+        Returns the screen rect of the mini-map, in the bottom-right corner of the frame.
+        """
+        width, height = self.frame.screen.get_size()
+        return pygame.Rect(width - self.size[0] - MINIMAP_MARGIN, height - self.size[1] - MINIMAP_MARGIN,
+                           self.size[0], self.size[1])
+
+    def contains(self, x, y):
+        """
+        Returns whether a screen point is on the mini-map.
+        """
+        return self.visible.get() and self.rect().collidepoint(x, y)
+
+    def mark_stale(self):
+        """
+        Marks the overview to be rendered again.
+        """
+        self._stale = True
+
+    @profiler.timed("minimap")
+    def render(self):
+        """
+        Renders the overview of the whole harness into the cached surface.
+        """
+        view = self.view
+        view.connectors = self.frame.connectors
+        view.wires = self.frame.wires
+        extent = HarnessRender.harness_extent(self.frame.connectors, self.frame.wires)
+        if extent is None:
+            view.zoom_level = 1.0
+            view.view_offset = [0, 0]
+            view.screen.fill((60, 60, 60))
+        else:
+            left, top, right, bottom = extent
+            pad_x = (right - left) * MINIMAP_PADDING + 1
+            pad_y = (bottom - top) * MINIMAP_PADDING + 1
+            world_width = right - left + 2 * pad_x
+            world_height = bottom - top + 2 * pad_y
+            view.zoom_level = min(self.size[0] / world_width, self.size[1] / world_height)
+            # Center the harness along the axis that has room to spare.
+            view.view_offset = [left - pad_x - (self.size[0] / view.zoom_level - world_width) / 2,
+                                top - pad_y - (self.size[1] / view.zoom_level - world_height) / 2]
+            view.draw()
+        self._stale = False
+        self._rendered_at = time.perf_counter()
+
+    def update(self):
+        """
+        Renders the overview again if the harness changed and the last render is old enough.
+
+        Returns:
+            bool: True if the overview was rendered.
+        """
+        revision = self.frame.model_revision()
+        if revision != self._revision:
+            self._revision = revision
+            self._stale = True
+        if not self._stale:
+            return False
+        if self._rendered_at is not None and time.perf_counter() - self._rendered_at < self.interval:
+            return False
+        self.render()
+        return True
+
+    def draw(self, screen):
+        """
+        Draws the cached overview and the frame's visible area onto a surface.
+        """
+        rect = self.rect()
+        screen.blit(self.view.screen, rect)
+
+        view = self.view
+        left, top, right, bottom = self.frame.view_rect()
+        x = rect.x + (left - view.view_offset[0]) * view.zoom_level
+        y = rect.y + (top - view.view_offset[1]) * view.zoom_level
+        viewport = pygame.Rect(int(x), int(y), max(int((right - left) * view.zoom_level), 2),
+                               max(int((bottom - top) * view.zoom_level), 2))
+        screen.set_clip(rect)
+        pygame.draw.rect(screen, (255, 255, 255), viewport, 1)
+        screen.set_clip(None)
+        pygame.draw.rect(screen, (30, 30, 30), rect, 1)
+
+    def jump(self, x, y):
+        """
+        Centers the frame's view on the world point under a screen point on the mini-map.
+        """
+        rect = self.rect()
+        view = self.view
+        world_x = (x - rect.x) / view.zoom_level + view.view_offset[0]
+        world_y = (y - rect.y) / view.zoom_level + view.view_offset[1]
+        width, height = self.frame.screen.get_size()
+        self.frame.view_offset = [world_x - width / (2 * self.frame.zoom_level),
+                                  world_y - height / (2 * self.frame.zoom_level)]
+        self.frame.invalidate()
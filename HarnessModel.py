@@ -0,0 +1,610 @@
+"""
+This module defines the harness model: nodes, connectors, wires and the geometry they use.
+
+The model has no pygame or Tk dependency, so scripts and batch tools can load and process harnesses
+without a display. Connector images are never decoded here; only their size is read, from the image
+file header. `HarnessComponents` adds the images the editor draws.
+"""
+
+import math
+import struct
+from array import array
+
+from HarnessEvents import bus, CHANGED, FLIPPED
+
+
+COLORS = {"RED":(255,0,0),"WHITE":(255,255,255),"BLUE":(0,0,255),"GREEN":(0,255,0)}
+GAUGE = {"32":1,"30":1,"28":2,"26":2,"24":3,"22":3,"20":3,
+         "18":4,"16":4,"14":5,"12":6,"10":7,"8":8,
+         "6":9,"4":10,"2":11,"1":12,"1/0":13,"2/0":14,"3/0":15,"4/0":16}
+
+DEFAULT_IMAGE_SIZE = (64, 64)
+NODE_SIZE = 10
+
+_image_sizes = {}
+
+
+def image_size(filename):
+    """
+    Returns the (width, height) of an image without decoding it.
+
+    PNG sizes are read from the file header. Other formats are measured with pygame when it is
+    installed. Missing or unreadable images have `DEFAULT_IMAGE_SIZE`.
+
+    Args:
+        filename (str): The path to the image file.
+    """
+    size = _image_sizes.get(filename)
+    if size is not None:
+        return size
+    size = DEFAULT_IMAGE_SIZE
+    try:
+        with open(filename, "rb") as f:
+            header = f.read(24)
+        if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+            size = struct.unpack(">II", header[16:24])
+        else:
+            import pygame
+            size = pygame.image.load(filename).get_size()
+    except Exception:
+        print("couldn't read image size " + str(filename))
+    _image_sizes[filename] = size
+    return size
+
+
+def _round(value):
+    """
+    Rounds half away from zero, the way pygame rounds rect coordinates.
+    """
+    if value < 0:
+        return -int(math.floor(-value + 0.5))
+    return int(math.floor(value + 0.5))
+
+
+class Rect():
+    """
+    An integer rectangle with the parts of the `pygame.Rect` interface the model uses.
+    """
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, *args):
+        """
+        Initializes a Rect from (x, y, width, height) or ((x, y), (width, height)).
+        """
+        if len(args) == 2:
+            (x, y), (width, height) = args
+        else:
+            x, y, width, height = args
+        self.x = _round(x)
+        self.y = _round(y)
+        self.width = _round(width)
+        self.height = _round(height)
+
+    def __repr__(self):
+        return "<rect(%d, %d, %d, %d)>" % (self.x, self.y, self.width, self.height)
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.width, self.height)[index]
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.width, self.height))
+
+    def __eq__(self, other):
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def copy(self):
+        """
+        Returns a copy of the rect.
+        """
+        return Rect(self.x, self.y, self.width, self.height)
+
+    @property
+    def left(self):
+        return self.x
+
+    @left.setter
+    def left(self, value):
+        self.x = _round(value)
+
+    @property
+    def top(self):
+        return self.y
+
+    @top.setter
+    def top(self, value):
+        self.y = _round(value)
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @right.setter
+    def right(self, value):
+        self.x = _round(value) - self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @bottom.setter
+    def bottom(self, value):
+        self.y = _round(value) - self.height
+
+    @property
+    def centerx(self):
+        return self.x + self.width // 2
+
+    @centerx.setter
+    def centerx(self, value):
+        self.x = _round(value) - self.width // 2
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+    @centery.setter
+    def centery(self, value):
+        self.y = _round(value) - self.height // 2
+
+    @property
+    def center(self):
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+    @center.setter
+    def center(self, value):
+        self.x = _round(value[0]) - self.width // 2
+        self.y = _round(value[1]) - self.height // 2
+
+    @property
+    def topleft(self):
+        return (self.x, self.y)
+
+    @topleft.setter
+    def topleft(self, value):
+        self.x = _round(value[0])
+        self.y = _round(value[1])
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def collidepoint(self, x, y=None):
+        """
+        Returns True if a point is inside the rect.
+        """
+        if y is None:
+            x, y = x
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def colliderect(self, other):
+        """
+        Returns True if another rect overlaps this one.
+        """
+        ox, oy, ow, oh = other
+        return self.x < ox + ow and ox < self.x + self.width and self.y < oy + oh and oy < self.y + self.height
+
+
+class NodeRect(Rect):
+    """
+    A 10x10 rect view of a node's position.
+
+    Nodes store only their center; this view gives them the `rect` interface of the other
+    components without keeping a rect per node.
+    """
+    __slots__ = ("node",)
+
+    width = NODE_SIZE
+    height = NODE_SIZE
+
+    def __init__(self, node):
+        """
+        Initializes a NodeRect.
+
+        Args:
+            node (Node): The node whose position the rect views.
+        """
+        self.node = node
+
+    @property
+    def x(self):
+        return self.node.x - NODE_SIZE // 2
+
+    @x.setter
+    def x(self, value):
+        self.node.x = _round(value) + NODE_SIZE // 2
+
+    @property
+    def y(self):
+        return self.node.y - NODE_SIZE // 2
+
+    @y.setter
+    def y(self, value):
+        self.node.y = _round(value) + NODE_SIZE // 2
+
+    @property
+    def center(self):
+        return (self.node.x, self.node.y)
+
+    @center.setter
+    def center(self, value):
+        self.node.x = _round(value[0])
+        self.node.y = _round(value[1])
+
+
+class Node():
+    """
+    A node represents a connection point on a connector or a point on a wire.
+
+    Harnesses can have millions of nodes, so a node keeps only its center, parent, pin number and
+    offset in slots. `rect` is a lightweight view created on access.
+    """
+    __slots__ = ("x", "y", "parent", "pinnum", "offset")
+
+    def __init__(self, pos, parent, pinnum, offset):
+        """
+        Initializes a Node.
+
+        Args:
+            pos (tuple): The position of the node.
+            parent (Connector or Wire): The parent object of the node.
+            pinnum (int): The pin number of the node.
+            offset (int): The offset of the node from the parent's position.
+        """
+        self.x = _round(pos[0])
+        self.y = _round(pos[1])
+        self.parent = parent
+        self.pinnum = pinnum
+        self.offset = offset
+
+    @property
+    def rect(self):
+        """
+        The node's 10x10 rect, as a view on its position.
+        """
+        return NodeRect(self)
+
+    def get_display_pin(self):
+        """
+        Gets the display pin number, accounting for flipped connectors.
+        """
+        if isinstance(self.parent, Connector) and self.parent.direction == "left":
+            return self.parent.connections - self.pinnum
+        return self.pinnum + 1
+
+    def set_color(self, astr):
+        """
+        Sets the color of the parent wire.
+        """
+        self.parent.set_color(astr)
+
+    def get_color(self):
+        """
+        Gets the color of the parent wire.
+        """
+        return self.parent.get_color()
+
+    def set_gauge(self, astr):
+        """
+        Sets the gauge of the parent wire.
+        """
+        self.parent.set_gauge(astr)
+
+    def get_gauge(self):
+        """
+        Gets the gauge of the parent wire.
+        """
+        return self.parent.get_gauge()
+
+    def set_name(self, astr):
+        """
+        Sets the name of the parent object.
+        """
+        self.parent.set_name(astr)
+
+    def get_name(self):
+        """
+        Gets the name of the parent object.
+        """
+        return self.parent.get_name()
+
+    def to_dict(self):
+        """
+        Returns a dictionary representation of the node.
+        """
+        return {
+            "pos": (self.x, self.y),
+            "pinnum": self.pinnum,
+            "offset": self.offset,
+        }
+
+    @classmethod
+    def from_dict(cls, data, parent):
+        """
+        Creates a Node from a dictionary representation.
+        """
+        return cls(
+            pos=data["pos"],
+            parent=parent,
+            pinnum=data["pinnum"],
+            offset=data["offset"],
+        )
+
+
+class Connector():
+    """
+    A connector represents a physical connector in the harness.
+    """
+    def __init__(self, Image, pos, name="??", partnumber="", connections=1, direction="right"):
+        """
+        Initializes a Connector.
+
+        Args:
+            Image (str): The path to the image file for the connector.
+            pos (tuple): The position of the connector.
+            name (str, optional): The name of the connector. Defaults to "??".
+            partnumber (str, optional): The part number of the connector. Defaults to "".
+            connections (int, optional): The number of connections on the connector. Defaults to 1.
+            direction (str, optional): The direction the connector is facing. Defaults to "right".
+        """
+        self.imageFile = Image
+        self.rect = Rect((0, 0), image_size(self.imageFile))
+        self.rect.center = pos
+        self.name = name
+        self.partNumber = partnumber
+        self.connections = int(connections)
+        self.nodes = []
+        self.direction = direction
+        self.load_nodes()
+
+    def flip(self, app):
+        """
+        Flips the connector horizontally and updates wire connections.
+        """
+        flip_connectors([self], app.HDF.wires)
+
+
+    def load_nodes(self):
+        """
+        Creates the connection nodes for the connector.
+        """
+        self.nodes.clear()
+        increments = self.rect.height / self.connections
+        c = 0 - increments / 2
+        for i in range(self.connections):
+            c += increments
+            if self.direction == "right":
+                self.nodes.append(Node((self.rect.right, self.rect.top + c), self, i, c))
+            else:
+                self.nodes.append(Node((self.rect.left, self.rect.top + c), self, i, c))
+
+    def update(self):
+        """
+        Updates the position of the connector's nodes.
+        """
+        x = self.rect.right if self.direction == "right" else self.rect.left
+        top = self.rect.top
+        for n in self.nodes:
+            n.x = x
+            n.y = _round(top + n.offset)
+
+    def set_name(self, astr):
+        """
+        Sets the name of the connector.
+        """
+        self.name = astr
+        bus.emit(CHANGED, self, property="name")
+
+    def get_name(self):
+        """
+        Gets the name of the connector.
+        """
+        return self.name
+
+    def to_dict(self):
+        """
+        Returns a dictionary representation of the connector.
+        """
+        return {
+            "image": self.imageFile,
+            "pos": self.rect.center,
+            "name": self.name,
+            "partnumber": self.partNumber,
+            "connections": self.connections,
+            "direction": self.direction,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a Connector from a dictionary representation.
+        """
+        return cls(
+            Image=data["image"],
+            pos=data["pos"],
+            name=data["name"],
+            partnumber=data["partnumber"],
+            connections=data["connections"],
+            direction=data["direction"],
+        )
+
+
+def flip_connectors(connectors, wires):
+    """
+    Flips connectors horizontally and moves the wire ends on their pins to the mirrored pins.
+
+    The wires are walked once for all the connectors.
+
+    Args:
+        connectors (list): The connectors to flip.
+        wires (list): The wires of the harness.
+    """
+    mirrored = {}
+    for c in connectors:
+        c.direction = "right" if c.direction == "left" else "left"
+        old_nodes = c.nodes[:]
+        c.load_nodes()
+        for pin_index, node in enumerate(old_nodes):
+            mirrored[node] = c.nodes[c.connections - 1 - pin_index]
+
+    if mirrored:
+        for wire in wires:
+            nodes = wire.nodes
+            for i, node in enumerate(nodes):
+                new_node = mirrored.get(node)
+                if new_node is not None:
+                    nodes[i] = new_node
+    for c in connectors:
+        bus.emit(FLIPPED, c)
+
+
+class Wire():
+    """
+    A wire represents a connection between two or more nodes.
+
+    Segment lengths are kept in a compact `array` of doubles.
+    """
+    __slots__ = ("nodes", "_lengths", "service_loops", "name", "partnumber", "color", "gauge")
+
+    def __init__(self, name="??", partnumber="", color="WHITE", gauge="32"):
+        """
+        Initializes a Wire.
+
+        Args:
+            name (str, optional): The name of the wire. Defaults to "??".
+            partnumber (str, optional): The part number of the wire. Defaults to "".
+            color (str, optional): The color of the wire. Defaults to "WHITE".
+            gauge (str, optional): The gauge of the wire. Defaults to "32".
+        """
+        self.nodes = []
+        self._lengths = array("d")
+        self.service_loops = [0, 0]
+        self.name = name
+        self.partnumber = partnumber
+        self.color = color
+        self.gauge = gauge
+
+    @property
+    def lengths(self):
+        """
+        The lengths of the wire's segments; segment i joins node i and node i + 1.
+        """
+        return self._lengths
+
+    @lengths.setter
+    def lengths(self, values):
+        self._lengths = array("d", values)
+
+    def add_node(self, node):
+        """
+        Adds a node to the wire.
+        """
+        self.nodes.append(node)
+        if len(self.nodes) > 1:
+            self.lengths.append(0)
+
+    def get_total_length(self):
+        """
+        Returns the total length of the wire, including the service loops at both ends.
+        """
+        return sum(self.lengths) + sum(self.service_loops)
+
+    def set_color(self, astr):
+        """
+        Sets the color of the wire.
+        """
+        self.color = astr
+        bus.emit(CHANGED, self, property="color")
+
+    def get_color(self):
+        """
+        Gets the color of the wire.
+        """
+        return self.color
+
+    def set_gauge(self, astr):
+        """
+        Sets the gauge of the wire.
+        """
+        self.gauge = astr
+        bus.emit(CHANGED, self, property="gauge")
+
+    def get_gauge(self):
+        """
+        Gets the gauge of the wire.
+        """
+        return self.gauge
+
+    def set_name(self, astr):
+        """
+        Sets the name of the wire.
+        """
+        self.name = astr
+        bus.emit(CHANGED, self, property="name")
+
+    def get_name(self):
+        """
+        Gets the name of the wire.
+        """
+        return self.name
+
+    def to_dict(self, connectors):
+        """
+        Returns a dictionary representation of the wire.
+        """
+        node_data = []
+        for node in self.nodes:
+            if isinstance(node.parent, Connector):
+                node_data.append({
+                    "type": "connector",
+                    "parent_idx": connectors.index(node.parent),
+                    "pin": node.pinnum,
+                })
+            else:
+                node_data.append({
+                    "type": "intermediate",
+                    "pos": (node.x, node.y),
+                })
+
+        return {
+            "name": self.name,
+            "partnumber": self.partnumber,
+            "color": self.color,
+            "gauge": self.gauge,
+            "nodes": node_data,
+            "lengths": self.lengths.tolist(),
+            "service_loops": self.service_loops,
+        }
+
+    @classmethod
+    def from_dict(cls, data, connectors):
+        """
+        Creates a Wire from a dictionary representation.
+        """
+        wire = cls(
+            name=data["name"],
+            partnumber=data["partnumber"],
+            color=data["color"],
+            gauge=data["gauge"],
+        )
+        wire.service_loops = data.get("service_loops", [0, 0])
+
+        for node_data in data["nodes"]:
+            if node_data["type"] == "connector":
+                parent = connectors[node_data["parent_idx"]]
+                node = parent.nodes[node_data["pin"]]
+                wire.add_node(node)
+            else:
+                node = Node(node_data["pos"], wire, 0, 0)
+                wire.add_node(node)
+
+        # Set after the nodes, which add a zero length per segment.
+        wire.lengths = data["lengths"]
+        return wire
@@ -0,0 +1,339 @@
+"""
+This module finds the electrical nets of a harness: the sets of connector pins joined by wires.
+
+A pin is named by its connector and its pin number as shown on the canvas, so a pin keeps its
+name when the connector is flipped. The nets are kept in a union-find structure that stores the
+net of each pin directly, along with the pins of each net and the wires on each pin. Adding a
+wire merges two nets by relabelling the pins of the smaller one, so a pin is relabelled at most
+a logarithmic number of times. Whether two pins are connected is a comparison of their labels,
+which takes constant time however large the harness.
+
+Removing a wire searches from both of its ends at once, a pin from each side in turn. If the
+searches meet, the net is still whole, which is found quickly in a well-connected net; if one
+runs out first, the pins it reached have been cut off and only they are relabelled, so a split
+costs as much as the part cut off, not the whole net.
+
+`Connectivity` follows the model events of the bus. It is built on the first query and again on
+the first query after the harness is replaced.
+
+Like `HarnessModel`, this module has no pygame or Tk dependency.
+"""
+
+import itertools
+
+import HarnessModel
+from HarnessEvents import CREATED, DELETED, FLIPPED, CHANGED, RESET
+
+# The kinds of events that change the nets.
+EVENT_KINDS = (CREATED, DELETED, FLIPPED, CHANGED, RESET)
+
+
+def pin_key(node):
+    """
+    Returns the name of a connector pin node: a tuple of (connector, pin number). A wire node is
+    its own name.
+    """
+    if isinstance(node.parent, HarnessModel.Connector):
+        return (node.parent, node.get_display_pin())
+    return node
+
+
+def pin_label(pin):
+    """
+    Returns a pin's name for display, such as "J3 pin 4".
+    """
+    if isinstance(pin, tuple):
+        return "%s pin %d" % (pin[0].get_name(), pin[1])
+    return "node of %s" % pin.parent.get_name()
+
+
+class Connectivity():
+    """
+    Keeps the nets of a harness up to date and answers connectivity queries.
+
+    Pins may be given to the queries as connector pin nodes or as (connector, pin number) tuples.
+    """
+    def __init__(self, frame):
+        """
+        Initializes the Connectivity.
+
+        Args:
+            frame (DrawFrame): The drawing frame whose harness is followed.
+        """
+        self.frame = frame
+        # The net label of each pin, and the pins of each net of more than one pin.
+        self._net = {}
+        self._members = {}
+        self._wires = {}
+        self._ends = {}
+        self._connectors = set()
+        self._isolated = {}
+        self._labels = itertools.count()
+        self._stale = True
+
+    def on_events(self, events):
+        """
+        Updates the nets after the harness changed. Subscribe it to the bus with EVENT_KINDS.
+        """
+        if self._stale:
+            return
+        for e in events:
+            obj = e.obj
+            if e.kind == RESET:
+                self._stale = True
+                return
+            if isinstance(obj, HarnessModel.Connector):
+                if e.kind == CREATED:
+                    self._add_connector(obj)
+                elif e.kind == DELETED:
+                    self._remove_connector(obj)
+                elif e.kind == FLIPPED:
+                    for wire in self._connector_wires(obj):
+                        self._refresh_wire(wire)
+            elif isinstance(obj, HarnessModel.Wire):
+                if e.kind == CREATED:
+                    self._add_wire(obj)
+                elif e.kind == DELETED:
+                    self._remove_wire(obj)
+                elif e.kind == CHANGED and e.data.get("property") == "nodes":
+                    self._refresh_wire(obj)
+
+    def rebuild(self):
+        """
+        Builds the nets from the whole harness.
+        """
+        self._net = {}
+        self._members = {}
+        self._wires = {}
+        self._ends = {}
+        self._connectors = set()
+        self._isolated = {}
+        self._stale = False
+        for c in self.frame.connectors:
+            self._add_connector(c)
+        for wire in self.frame.wires:
+            self._add_wire(wire)
+
+    def _ensure(self):
+        """
+        Rebuilds the nets if the harness was replaced since they were built.
+        """
+        if self._stale:
+            self.rebuild()
+
+    def _key(self, pin):
+        """
+        Returns the name of a pin given as a node or a name.
+        """
+        if isinstance(pin, HarnessModel.Node):
+            return pin_key(pin)
+        return pin
+
+    def _union(self, a, b):
+        """
+        Merges the nets of two pins, relabelling the pins of the smaller one.
+        """
+        net = self._net
+        members = self._members
+        label_a = net[a]
+        label_b = net[b]
+        if label_a == label_b:
+            return
+        pins_a = members.get(label_a) or {a}
+        pins_b = members.get(label_b) or {b}
+        if len(pins_a) < len(pins_b):
+            label_a, label_b, pins_a, pins_b = label_b, label_a, pins_b, pins_a
+        members.pop(label_b, None)
+        for pin in pins_b:
+            net[pin] = label_a
+        pins_a.update(pins_b)
+        members[label_a] = pins_a
+
+    def _add_pin(self, pin):
+        """
+        Adds a pin as a net of its own, if it is new.
+        """
+        if pin not in self._net:
+            self._net[pin] = next(self._labels)
+            self._isolated[pin] = None
+
+    def _drop_pin(self, pin):
+        """
+        Removes a pin that is a net of its own.
+        """
+        self._members.pop(self._net.pop(pin), None)
+        self._isolated.pop(pin, None)
+
+    def _live(self, pin):
+        """
+        Returns whether a pin is on a connector of the harness.
+        """
+        return not isinstance(pin, tuple) or pin[0] in self._connectors
+
+    def _add_connector(self, connector):
+        """
+        Adds the pins of a connector.
+        """
+        self._connectors.add(connector)
+        for number in range(1, connector.connections + 1):
+            self._add_pin((connector, number))
+
+    def _remove_connector(self, connector):
+        """
+        Removes the pins of a connector. Pins with wires on them stay until the wires go.
+        """
+        self._connectors.discard(connector)
+        for number in range(1, connector.connections + 1):
+            pin = (connector, number)
+            if pin in self._net and pin not in self._wires:
+                self._drop_pin(pin)
+
+    def _connector_wires(self, connector):
+        """
+        Returns the wires with an end on one of a connector's pins.
+        """
+        wires = {}
+        for number in range(1, connector.connections + 1):
+            for wire in self._wires.get((connector, number), ()):
+                wires[wire] = None
+        return list(wires)
+
+    def _add_wire(self, wire):
+        """
+        Joins the nets of the pins at a wire's ends.
+        """
+        if len(wire.nodes) < 2 or wire in self._ends:
+            return
+        ends = (pin_key(wire.nodes[0]), pin_key(wire.nodes[-1]))
+        self._ends[wire] = ends
+        for pin in ends:
+            self._add_pin(pin)
+            self._wires.setdefault(pin, []).append(wire)
+            self._isolated.pop(pin, None)
+        self._union(*ends)
+
+    def _remove_wire(self, wire):
+        """
+        Removes a wire, and splits its net if the wire was the only path between its ends.
+        """
+        ends = self._ends.pop(wire, None)
+        if ends is None:
+            return
+        for pin in ends:
+            wires = self._wires.get(pin)
+            if wires is not None and wire in wires:
+                wires.remove(wire)
+                if not wires:
+                    del self._wires[pin]
+        cut = self._cut_off(*ends)
+        if cut:
+            label = next(self._labels)
+            self._members[self._net[ends[0]]] -= cut
+            self._members[label] = cut
+            for pin in cut:
+                self._net[pin] = label
+        for pin in ends:
+            if pin in self._net and pin not in self._wires:
+                if self._live(pin):
+                    self._isolated[pin] = None
+                else:
+                    self._drop_pin(pin)
+
+    def _refresh_wire(self, wire):
+        """
+        Moves a wire whose end nodes were replaced, if it now ends on other pins.
+        """
+        ends = self._ends.get(wire)
+        if len(wire.nodes) >= 2 and ends == (pin_key(wire.nodes[0]), pin_key(wire.nodes[-1])):
+            return
+        self._remove_wire(wire)
+        self._add_wire(wire)
+
+    def _cut_off(self, a, b):
+        """
+        Searches along the wires from two pins of a net at once, a pin from each side in turn.
+
+        Returns:
+            set: The pins reached from the side that ran out first, which are no longer connected
+            to the other, or None if the searches met.
+        """
+        if a == b:
+            return None
+        ends = self._ends
+        wires = self._wires
+        seen = ({a}, {b})
+        stacks = ([a], [b])
+        while True:
+            for side in (0, 1):
+                if not stacks[side]:
+                    return seen[side]
+                pin = stacks[side].pop()
+                mine = seen[side]
+                theirs = seen[1 - side]
+                for wire in wires.get(pin, ()):
+                    x, y = ends[wire]
+                    other = y if x == pin else x
+                    if other in theirs:
+                        return None
+                    if other not in mine:
+                        mine.add(other)
+                        stacks[side].append(other)
+
+    def net(self, pin):
+        """
+        Returns the pins connected to a pin, itself included.
+
+        Args:
+            pin: A connector pin node, or a (connector, pin number) tuple.
+
+        Returns:
+            list: The (connector, pin number) names of the pins in the net, or an empty list if
+            the pin is not in the harness.
+        """
+        self._ensure()
+        pin = self._key(pin)
+        if pin not in self._net:
+            return []
+        return list(self._members.get(self._net[pin], (pin,)))
+
+    def net_wires(self, pin):
+        """
+        Returns the wires of the net a pin is in.
+        """
+        wires = {}
+        for member in self.net(pin):
+            for wire in self._wires.get(member, ()):
+                wires[wire] = None
+        return list(wires)
+
+    def connected(self, a, b):
+        """
+        Returns whether there is continuity between two pins, through any number of wires.
+        """
+        self._ensure()
+        a = self._key(a)
+        b = self._key(b)
+        if a not in self._net or b not in self._net:
+            return a == b
+        return self._net[a] == self._net[b]
+
+    def is_isolated(self, pin):
+        """
+        Returns whether a pin has no wire on it.
+        """
+        self._ensure()
+        return self._key(pin) in self._isolated
+
+    def isolated_pins(self):
+        """
+        Returns the pins of the harness's connectors that have no wire on them.
+        """
+        self._ensure()
+        return list(self._isolated)
+
+    def nets(self):
+        """
+        Returns the nets of two or more pins, each as a list of pins.
+        """
+        self._ensure()
+        return [list(members) for members in self._members.values() if len(members) > 1]
@@ -0,0 +1,314 @@
+"""
+This module defines the instrumentation used to find where the editor spends its time.
+
+`profiler` is the shared Profiler. The hot paths are wrapped in its named timers and bump its
+counters. While it is disabled, a timer is one shared object that does nothing, so the
+instrumentation costs little more than a function call. The HUD enables it and draws the frame
+rate, the time per subsystem averaged over recent frames and the object counts on the drawing
+frame. Whole sessions can also be recorded with `cProfile` and saved as `.pstats` files.
+"""
+
+import cProfile
+import functools
+import time
+from collections import deque
+
+import pygame
+
+# Frames the HUD averages over.
+HISTORY_FRAMES = 60
+# Seconds between updates of the HUD text, so the numbers can be read.
+HUD_INTERVAL = 0.25
+# Screen pixels between the HUD and the corner of the drawing frame.
+HUD_MARGIN = 10
+
+
+class _NullTimer():
+    """
+    The timer handed out while profiling is disabled.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer():
+    """
+    Adds the time spent in a `with` block to a profiler.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler():
+    """
+    Named timers and counters, collected per frame.
+
+    Timers nest, and each one records the whole time spent in it, so a timer around drawing
+    includes the timers around the parts of the drawing.
+    """
+    def __init__(self, history=HISTORY_FRAMES):
+        """
+        Initializes the Profiler.
+
+        Args:
+            history (int, optional): The number of frames to keep. Defaults to HISTORY_FRAMES.
+        """
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self.times = {}
+        self.counts = {}
+        self.totals = {}
+        self._frame_start = None
+        self._session = None
+
+    def set_enabled(self, enabled):
+        """
+        Turns the timers and counters on or off and forgets what they collected.
+        """
+        self.enabled = bool(enabled)
+        self.frames.clear()
+        self.times = {}
+        self.counts = {}
+        self.totals = {}
+        self._frame_start = None
+
+    def timer(self, name):
+        """
+        Returns a context manager that times its block under a name.
+
+        Example:
+            with profiler.timer("save"):
+                HarnessFile.save_harness(filepath, connectors, wires)
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """
+        Returns a decorator that times every call of a function under a name.
+        """
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def add_time(self, name, seconds):
+        """
+        Adds time to a timer of the current frame and to its total.
+        """
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        total = self.totals.setdefault(name, [0, 0.0])
+        total[0] += 1
+        total[1] += seconds
+
+    def count(self, name, n=1):
+        """
+        Adds to a counter of the current frame.
+        """
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def end_frame(self):
+        """
+        Closes the current frame, keeping its duration, timers and counters, and starts the next.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frames.append((now - self._frame_start, self.times, self.counts))
+        self.times = {}
+        self.counts = {}
+        self._frame_start = now
+
+    def fps(self):
+        """
+        Returns the frame rate over the kept frames, or 0 before any frame.
+        """
+        seconds = sum(f[0] for f in self.frames)
+        return len(self.frames) / seconds if seconds > 0 else 0.0
+
+    def frame_ms(self):
+        """
+        Returns the mean frame time over the kept frames, in milliseconds.
+        """
+        if not self.frames:
+            return 0.0
+        return sum(f[0] for f in self.frames) * 1000 / len(self.frames)
+
+    def averages(self):
+        """
+        Returns the mean time per frame of each timer over the kept frames.
+
+        Returns:
+            dict: Milliseconds by timer name.
+        """
+        sums = {}
+        for _, times, _ in self.frames:
+            for name, seconds in times.items():
+                sums[name] = sums.get(name, 0.0) + seconds
+        return {name: seconds * 1000 / len(self.frames) for name, seconds in sums.items()}
+
+    def last_counts(self):
+        """
+        Returns the counters of the last full frame.
+        """
+        return self.frames[-1][2] if self.frames else {}
+
+    def report(self):
+        """
+        Returns the calls and total time of every timer since profiling was enabled, slowest first.
+
+        Returns:
+            list: Tuples of (name, calls, total milliseconds).
+        """
+        rows = [(name, calls, seconds * 1000) for name, (calls, seconds) in self.totals.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def session_active(self):
+        """
+        Returns whether a cProfile session is being recorded.
+        """
+        return self._session is not None
+
+    def start_session(self):
+        """
+        Starts recording every function call with cProfile.
+        """
+        if self._session is None:
+            self._session = cProfile.Profile()
+            self._session.enable()
+
+    def stop_session(self, filepath=None):
+        """
+        Stops recording the cProfile session.
+
+        Args:
+            filepath (str, optional): A `.pstats` file to save the statistics to, for `pstats` or a
+                viewer such as snakeviz. Defaults to None, which discards them.
+
+        Returns:
+            cProfile.Profile: The session, or None if none was being recorded.
+        """
+        session = self._session
+        if session is None:
+            return None
+        session.disable()
+        self._session = None
+        if filepath:
+            session.dump_stats(filepath)
+        return session
+
+
+profiler = Profiler()
+
+
+class ProfilerHUD():
+    """
+    A heads-up display of the profiler's numbers in the top-left corner of a drawing frame.
+
+    Showing it enables the profiler and hiding it disables it again.
+    """
+    def __init__(self, frame, profiler=profiler, visible=None, interval=HUD_INTERVAL):
+        """
+        Initializes the ProfilerHUD.
+
+        Args:
+            frame (DrawFrame): The drawing frame the HUD belongs to.
+            profiler (Profiler, optional): The profiler to show. Defaults to the shared profiler.
+            visible (optional): A setting with get(), such as a tk.BooleanVar, that tells whether the
+                HUD is shown. Defaults to hidden.
+            interval (float, optional): Seconds between updates of the text. Defaults to HUD_INTERVAL.
+        """
+        self.frame = frame
+        self.profiler = profiler
+        self.visible = visible
+        self.interval = interval
+        self.font = pygame.font.SysFont("monospace", 14)
+        self.surface = None
+        self._updated_at = None
+
+    def shown(self):
+        """
+        Returns whether the HUD is shown, enabling or disabling the profiler to match.
+        """
+        shown = self.visible is not None and bool(self.visible.get())
+        if shown != self.profiler.enabled:
+            self.profiler.set_enabled(shown)
+            self.surface = None
+        return shown
+
+    def lines(self):
+        """
+        Returns the lines of text to show.
+        """
+        profiler = self.profiler
+        frame = self.frame
+        lines = ["%5.1f FPS %7.2f ms" % (profiler.fps(), profiler.frame_ms())]
+        for name, ms in sorted(profiler.averages().items(), key=lambda item: item[1], reverse=True):
+            lines.append("%-14s %7.2f ms" % (name, ms))
+        lines.append("connectors %d  wires %d  nodes %d  selected %d" % (
+            len(frame.connectors), len(frame.wires), sum(len(w.nodes) for w in frame.wires), len(frame.selected)))
+        counts = profiler.last_counts()
+        if counts:
+            lines.append("  ".join("%s %d" % (name, n) for name, n in sorted(counts.items())))
+        return lines
+
+    def update(self):
+        """
+        Renders the text again if the last render is old enough.
+
+        Returns:
+            bool: True if the text was rendered.
+        """
+        now = time.perf_counter()
+        if self.surface is not None and now - self._updated_at < self.interval:
+            return False
+        texts = [self.font.render(line, True, (255, 255, 255)) for line in self.lines()]
+        line_height = self.font.get_linesize()
+        width = max(t.get_width() for t in texts) + 8
+        self.surface = pygame.Surface((width, line_height * len(texts) + 8), pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 160))
+        for i, text in enumerate(texts):
+            self.surface.blit(text, (4, 4 + i * line_height))
+        self._updated_at = now
+        return True
+
+    def rect(self):
+        """
+        Returns the screen rect of the HUD.
+        """
+        if self.surface is None:
+            return pygame.Rect(HUD_MARGIN, HUD_MARGIN, 0, 0)
+        return self.surface.get_rect(topleft=(HUD_MARGIN, HUD_MARGIN))
+
+    def draw(self, screen):
+        """
+        Draws the HUD onto a surface.
+        """
+        if self.surface is not None:
+            screen.blit(self.surface, self.rect())
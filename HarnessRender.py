@@ -0,0 +1,211 @@
+"""
+Headless rendering of harness diagrams to PNG images.
+
+The harness is drawn with the same `DrawFrame` code as the editor, into an offscreen surface, so
+no window is needed: without one, the SDL dummy video driver is used. Large drawings are rendered
+one tile at a time and written to the PNG one band of rows at a time, so memory use depends on the
+tile size and the image width, not on the image height.
+
+Example:
+    python HarnessRender.py harness.json -o harness.png --scale 0.5
+"""
+
+import argparse
+import os
+import struct
+import sys
+import zlib
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TILE_SIZE = 1024
+# World units of empty space drawn around the harness.
+RENDER_MARGIN = 50
+
+
+def init_headless():
+    """
+    Prepares pygame for drawing without a window.
+
+    Uses the SDL dummy video driver unless a video driver was already chosen, and sets a tiny display
+    mode, which pygame needs to convert the connector images.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+def harness_extent(connectors, wires):
+    """
+    Returns the world-space bounds of a harness.
+
+    Returns:
+        tuple: A tuple of (left, top, right, bottom), or None for an empty harness.
+    """
+    xs = []
+    ys = []
+    for c in connectors:
+        xs.extend((c.rect.left, c.rect.right))
+        ys.extend((c.rect.top, c.rect.bottom))
+    for w in wires:
+        for n in w.nodes:
+            xs.append(n.x)
+            ys.append(n.y)
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class PNGWriter():
+    """
+    Writes an RGB PNG image row by row, compressing as it goes.
+    """
+    def __init__(self, f, width, height):
+        """
+        Initializes the PNGWriter and writes the PNG header.
+
+        Args:
+            f: A binary file object to write to.
+            width (int): The image width in pixels.
+            height (int): The image height in pixels.
+        """
+        self.f = f
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self._compressor = zlib.compressobj(6)
+        f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        """
+        Writes one PNG chunk.
+        """
+        self.f.write(struct.pack(">I", len(data)))
+        self.f.write(kind)
+        self.f.write(data)
+        self.f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def write_rows(self, data):
+        """
+        Writes whole rows of pixels.
+
+        Args:
+            data (bytes): The RGB bytes of one or more rows, top to bottom.
+        """
+        stride = self.width * 3
+        rows = bytearray()
+        for start in range(0, len(data), stride):
+            rows.append(0)  # Filter type None.
+            rows += data[start:start + stride]
+        self.rows += len(data) // stride
+        compressed = self._compressor.compress(bytes(rows))
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+
+    def close(self):
+        """
+        Finishes the image.
+        """
+        if self.rows != self.height:
+            raise ValueError("PNG has %d rows, expected %d" % (self.rows, self.height))
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+
+
+def render_png(filepath, connectors, wires, scale=1.0, tile_size=TILE_SIZE, options=None, margin=RENDER_MARGIN):
+    """
+    Renders a whole harness to a PNG file, tile by tile.
+
+    Args:
+        filepath (str): The PNG file to write.
+        connectors (list): The connectors, with images, such as `HarnessComponents.Connector`.
+        wires (list): The wires.
+        scale (float, optional): Pixels per world unit. Defaults to 1.0.
+        tile_size (int, optional): The width and height of the tiles. Defaults to TILE_SIZE.
+        options (RenderOptions, optional): The display options. Defaults to pin numbers only, without
+            the grid or editing handles.
+        margin (float, optional): World units of empty space around the harness. Defaults to RENDER_MARGIN.
+
+    Returns:
+        tuple: The (width, height) of the image.
+    """
+    init_headless()
+    import pygame
+    import HarnessDrawFrame
+
+    extent = harness_extent(connectors, wires) or (0, 0, 0, 0)
+    left, top = extent[0] - margin, extent[1] - margin
+    width = max(1, int((extent[2] - extent[0] + 2 * margin) * scale))
+    height = max(1, int((extent[3] - extent[1] + 2 * margin) * scale))
+
+    options = options or HarnessDrawFrame.RenderOptions(grid_visible=False, state="normal")
+    frame = HarnessDrawFrame.OffscreenDrawFrame((tile_size, tile_size), options)
+    frame.connectors = connectors
+    frame.wires = wires
+    frame.zoom_level = scale
+    for c in connectors:
+        c.update()
+    geometry = HarnessDrawFrame.WireGeometry(wires)
+
+    with open(filepath, "wb") as f:
+        writer = PNGWriter(f, width, height)
+        for band_top in range(0, height, tile_size):
+            band_height = min(tile_size, height - band_top)
+            band = [bytearray() for _ in range(band_height)]
+            for tile_left in range(0, width, tile_size):
+                tile_width = min(tile_size, width - tile_left)
+                frame.view_offset = [left + tile_left / scale, top + band_top / scale]
+                frame.draw(geometry)
+                tile = frame.screen.subsurface((0, 0, tile_width, band_height))
+                data = pygame.image.tostring(tile, "RGB")
+                stride = tile_width * 3
+                for y in range(band_height):
+                    band[y] += data[y * stride:(y + 1) * stride]
+            writer.write_rows(b"".join(band))
+        writer.close()
+    return width, height
+
+
+def main(argv=None):
+    """
+    Renders harness files to PNG images.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Render harness files to PNG images without a window.")
+    parser.add_argument("path", help="harness JSON file")
+    parser.add_argument("-o", "--output", help="PNG file to write (defaults to next to the input)")
+    parser.add_argument("--scale", type=float, default=1.0, help="pixels per world unit")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help="tile width and height in pixels")
+    parser.add_argument("--wire-names", action="store_true", help="draw wire names")
+    parser.add_argument("--connector-names", action="store_true", help="draw connector names")
+    parser.add_argument("--no-pin-numbers", action="store_true", help="do not draw pin numbers")
+    parser.add_argument("--grid", action="store_true", help="draw the grid")
+    args = parser.parse_args(argv)
+
+    filepath = os.path.abspath(args.path)
+    output = os.path.abspath(args.output or os.path.splitext(filepath)[0] + ".png")
+    # Library image paths are relative to the application directory.
+    os.chdir(APP_DIR)
+    init_headless()
+    import HarnessComponents
+    import HarnessDrawFrame
+    import HarnessFile
+
+    connectors, wires = HarnessFile.load_harness(filepath, HarnessComponents.Connector)
+    options = HarnessDrawFrame.RenderOptions(grid_visible=args.grid, wire_names=args.wire_names,
+                                             connector_names=args.connector_names,
+                                             pin_numbers=not args.no_pin_numbers, state="normal")
+    width, height = render_png(output, connectors, wires, args.scale, args.tile_size, options)
+    print("%s (%dx%d)" % (output, width, height))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
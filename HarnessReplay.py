@@ -0,0 +1,403 @@
+"""
+Recording and replay of editor input sessions, for reproducing performance problems.
+
+A `Recorder` sits between the Tk bindings and the window's handlers and writes down the editor
+events: clicks, drags and releases with their world coordinates, panning, scrolling and zooming,
+the keyboard commands, the mode changes and the parts chosen in the library. A session file keeps
+the harness, the view, the mode and the part chosen for adding at the time recording started,
+followed by the events. The selection is not kept, so sessions start with nothing selected.
+
+A `ReplayApp` is a `HarnessITWindow` without Tk, drawing into an offscreen frame. Replaying a
+session calls the same handlers with the recorded events, as fast as they run, and reports the
+latency of each kind of event, including the repaint that follows it.
+
+Example:
+    python HarnessReplay.py session.json --repeat 3 -o latency.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SESSION_VERSION = 1
+# Handlers whose events are placed by their world coordinates when replayed.
+POINTER_HANDLERS = ("_on_left_click", "_on_drag", "_on_left_release", "_on_right_click")
+PERCENTILES = (50, 90, 99)
+
+
+def _resolve(app, name):
+    """
+    Returns the handler with a dotted name, such as "HDF.zoom", from the app.
+    """
+    obj = app
+    for part in name.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class Recorder():
+    """
+    Records the editor events of a window to a session.
+    """
+    def __init__(self, app):
+        """
+        Initializes the Recorder.
+
+        Args:
+            app (HarnessITWindow): The window whose events to record.
+        """
+        self.app = app
+        self.session = None
+        self._start = None
+        self._depth = 0
+
+    def recording(self):
+        """
+        Returns whether a session is being recorded.
+        """
+        return self.session is not None
+
+    def start(self):
+        """
+        Starts a new session from the current harness, view and mode.
+        """
+        import HarnessFile
+
+        frame = self.app.HDF
+        self.session = {
+            "version": SESSION_VERSION,
+            "harness": HarnessFile.harness_to_dict(frame.connectors, frame.wires),
+            "view": {"zoom": frame.zoom_level, "offset": list(frame.view_offset),
+                     "size": list(frame.screen.get_size())},
+            "mode": self.app.state,
+            "part": self.app.curConAdd.get("ID") if self.app.curConAdd else None,
+            "events": [],
+        }
+        self._start = time.perf_counter()
+
+    def stop(self, filepath=None):
+        """
+        Stops recording.
+
+        Args:
+            filepath (str, optional): The session file to write. Defaults to None, which discards it.
+
+        Returns:
+            dict: The session, or None if none was being recorded.
+        """
+        session = self.session
+        self.session = None
+        if session is not None and filepath:
+            with open(filepath, "w") as f:
+                json.dump(session, f)
+        return session
+
+    def record(self, handler, event=None, **fields):
+        """
+        Adds an event to the session, if one is being recorded.
+
+        Args:
+            handler (str): The name of the handler the event goes to.
+            event (optional): The Tk event, whose position, wheel delta, modifier state and key
+                are kept.
+            **fields: Other values to keep.
+        """
+        if self.session is None:
+            return
+        record = {"t": round(time.perf_counter() - self._start, 6), "handler": handler}
+        if event is not None:
+            for attr in ("x", "y", "delta", "state", "keysym"):
+                value = getattr(event, attr, None)
+                if isinstance(value, (int, float, str)):
+                    record[attr] = value
+            if "x" in record and "y" in record:
+                frame = self.app.HDF
+                record["world"] = [record["x"] / frame.zoom_level + frame.view_offset[0],
+                                   record["y"] / frame.zoom_level + frame.view_offset[1]]
+        record.update(fields)
+        self.session["events"].append(record)
+
+    def record_mode(self, mode):
+        """
+        Records a mode change that did not come from a recorded event, such as a ribbon button.
+        """
+        if self._depth == 0:
+            self.record("_set_mode", mode=mode)
+
+    def wrap(self, handler):
+        """
+        Returns an event callback that records the event and passes it on to a handler of the app.
+
+        Args:
+            handler (str): The handler's name, dotted for handlers of the app's parts, such as
+                "HDF.zoom".
+        """
+        def callback(event=None):
+            self.record(handler, event)
+            self._depth += 1
+            try:
+                return _resolve(self.app, handler)(event)
+            finally:
+                self._depth -= 1
+        return callback
+
+
+def load_session(filepath):
+    """
+    Loads a session file.
+    """
+    with open(filepath, "r") as f:
+        session = json.load(f)
+    if session.get("version") != SESSION_VERSION:
+        raise ValueError("unsupported session version %r" % session.get("version"))
+    return session
+
+
+class ReplayEvent():
+    """
+    An event with the attributes of a Tk event that the handlers read.
+    """
+    def __init__(self, x=0, y=0, delta=0, state=0, keysym=""):
+        """
+        Initializes the ReplayEvent.
+        """
+        self.x = x
+        self.y = y
+        self.delta = delta
+        self.state = state
+        self.keysym = keysym
+        self.x_root = x
+        self.y_root = y
+
+
+class _Null():
+    """
+    Stands in for the Tk widgets of the window: every attribute and call returns itself.
+    """
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __bool__(self):
+        return False
+
+
+def _replay_app_class():
+    """
+    Returns the ReplayApp class, which needs the window module and with it pygame and Tk.
+    """
+    import HarnessBOM
+    import HarnessDrawFrame
+    import HarnessITwindow
+    import HarnessJobs
+    import HarnessMiniMap
+    import HarnessNets
+    import HarnessWireLength
+    import HarnessComponents
+    from HarnessEvents import bus
+    from UndoManager import UndoManager
+
+    class ReplayApp(HarnessITwindow.HarnessITWindow):
+        """
+        A HarnessITWindow without Tk that draws into an offscreen frame.
+        """
+        def __init__(self, size=(1280, 800), library=None):
+            """
+            Initializes the ReplayApp with the window's settings at their defaults.
+
+            Args:
+                size (tuple, optional): The (width, height) of the drawing frame.
+                library (list, optional): The connector library rows. Defaults to Connectors.csv.
+            """
+            self.root = _Null()
+            self.state = "selecting"
+            self.undo_manager = UndoManager()
+            self.HarnessComponents = HarnessComponents
+            self.clipboard = None
+            self.jobs = HarnessJobs.JobManager()
+            self.context_menu_manager = _Null()
+            self.recorder = Recorder(self)
+
+            Setting = HarnessDrawFrame.Setting
+            self.grid_visible = Setting(True)
+            self.grid_snap = Setting(True)
+            self.grid_size = 25
+            self.view_wire_names = Setting(False)
+            self.view_connector_names = Setting(False)
+            self.view_pin_numbers = Setting(True)
+            self.view_minimap = Setting(True)
+            self.auto_lengths = Setting(True)
+            self.auto_route = Setting(True)
+            self.optimize_cut_order = Setting(False)
+            self.length_engine = HarnessWireLength.LengthEngine()
+            if library is None:
+                with open("resources/library/Connectors.csv", "r") as f:
+                    library = list(csv.DictReader(f))
+            self.library = library
+            self.curConAdd = {}
+
+            self.HDF = HarnessDrawFrame.OffscreenDrawFrame(size, self)
+            self.HDF.minimap = HarnessMiniMap.MiniMap(self.HDF, visible=self.view_minimap)
+            self.ConnPropFrame = self.WirePropFrame = self.properties = _Null()
+            self.tabControl = _Null()
+            self.status_var = Setting("")
+            self.libwin = None
+            self.wirenodes = []
+            self._dragging = False
+            self._drag_action_data = None
+            self._drag_offset = (0, 0)
+            self._drag_group = None
+            self._band_start = None
+            self._band_base = []
+            self._pan_last = None
+            self._minimap_dragging = False
+            self._memory_baseline = None
+            self._cutlist_labels = {}
+            self._cutlist_stale = False
+            bus.subscribe(self._on_model_events)
+            self.connectivity = HarnessNets.Connectivity(self.HDF)
+            bus.subscribe(self.connectivity.on_events, kinds=HarnessNets.EVENT_KINDS)
+            self.bom = HarnessBOM.BillOfMaterials(frame=self.HDF)
+            bus.subscribe(self.bom.on_events, kinds=HarnessBOM.EVENT_KINDS)
+
+        def close(self):
+            """
+            Stops listening to model events.
+            """
+            bus.unsubscribe(self._on_model_events)
+            bus.unsubscribe(self.connectivity.on_events)
+            bus.unsubscribe(self.bom.on_events)
+
+        def openLibrary(self, *args, callback=None):
+            """
+            Does nothing; the part to add comes from the session.
+            """
+
+    return ReplayApp
+
+
+def replay(session, app=None, draw=True):
+    """
+    Replays a session's events through the window's handlers as fast as they run.
+
+    Args:
+        session (dict): The session, as from `load_session`.
+        app (ReplayApp, optional): The app to replay into. Defaults to a new one the size of the
+            recorded view.
+        draw (bool, optional): Whether to repaint after every event, as the window does. Defaults
+            to True.
+
+    Returns:
+        dict: Latency statistics in milliseconds by handler name.
+    """
+    import HarnessComponents
+    import HarnessFile
+    import HarnessRender
+    import HarnessWireLength
+
+    HarnessRender.init_headless()
+    view = session["view"]
+    if app is None:
+        app = _replay_app_class()(tuple(view["size"]))
+        try:
+            return replay(session, app, draw)
+        finally:
+            app.close()
+    connectors, wires = HarnessFile.harness_from_dict(session["harness"], HarnessComponents.Connector)
+    app.new_harness()
+    app.HDF.connectors.extend(connectors)
+    app.HDF.wires.extend(wires)
+    if not HarnessWireLength.has_lengths(wires):
+        app.recompute_lengths()
+    app.HDF.zoom_level = view["zoom"]
+    app.HDF.view_offset = list(view["offset"])
+    if session.get("part"):
+        app.set_current(session["part"])
+    app._set_mode(session["mode"])
+    if draw:
+        app.HDF.invalidate()
+        app.HDF.refresh()
+
+    latencies = {}
+    for record in session["events"]:
+        handler = record["handler"]
+        if handler == "_set_mode":
+            func = app._set_mode
+            argument = record["mode"]
+        elif handler == "set_current":
+            func = app.set_current
+            argument = record["part"]
+        else:
+            func = _resolve(app, handler)
+            x, y = record.get("x", 0), record.get("y", 0)
+            if handler in POINTER_HANDLERS and "world" in record:
+                # Place the pointer by its world position, so the session also replays into a
+                # frame of another size.
+                frame = app.HDF
+                x = round((record["world"][0] - frame.view_offset[0]) * frame.zoom_level)
+                y = round((record["world"][1] - frame.view_offset[1]) * frame.zoom_level)
+            argument = ReplayEvent(x, y, record.get("delta", 0), record.get("state", 0), record.get("keysym", ""))
+        start = time.perf_counter()
+        func(argument)
+        if draw:
+            # The window repaints in full after any button release or key.
+            if handler in ("_on_left_release", "_on_right_click") or "keysym" in record:
+                app.HDF.invalidate()
+            app.HDF.refresh()
+        latencies.setdefault(handler, []).append((time.perf_counter() - start) * 1000)
+    return {handler: latency_stats(times) for handler, times in latencies.items()}
+
+
+def latency_stats(times):
+    """
+    Returns the count, mean, percentiles and maximum of a list of times.
+    """
+    ordered = sorted(times)
+    stats = {"count": len(ordered), "mean_ms": sum(ordered) / len(ordered)}
+    for p in PERCENTILES:
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        stats["p%d_ms" % p] = ordered[index]
+    stats["max_ms"] = ordered[-1]
+    return stats
+
+
+def main(argv=None):
+    """
+    Replays session files and prints the latency per kind of event.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Replay recorded HarnessIT input sessions headlessly.")
+    parser.add_argument("session", help="session file recorded with View > Record Input")
+    parser.add_argument("--repeat", type=int, default=1, help="times to replay the session")
+    parser.add_argument("--no-draw", action="store_true", help="do not repaint after each event")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    session = load_session(os.path.abspath(args.session))
+    output = os.path.abspath(args.output) if args.output else None
+    # Library image paths are relative to the application directory.
+    os.chdir(APP_DIR)
+    runs = [replay(session, draw=not args.no_draw) for _ in range(args.repeat)]
+
+    results = {"session": args.session, "events": len(session["events"]), "runs": runs}
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=4)
+    for handler, stats in sorted(runs[-1].items()):
+        print("%-20s %6d  mean %8.2f  p50 %8.2f  p90 %8.2f  p99 %8.2f  max %8.2f ms" % (
+            handler, stats["count"], stats["mean_ms"], stats["p50_ms"], stats["p90_ms"], stats["p99_ms"],
+            stats["max_ms"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
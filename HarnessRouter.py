@@ -0,0 +1,266 @@
+"""
+This module routes wires around connectors on the editor's grid.
+
+Routes run along the lattice of grid points. The points near a connector are blocked; a wire
+leaves its pin straight out of the side the connector faces, then an A* search finds a path of
+horizontal and vertical steps to the other pin. Each bend costs as much as several steps, so
+routes stay simple, and each wire already routed along a grid line makes it dearer, so wires
+routed in a batch spread out instead of piling onto the same lines.
+
+Each search has a time budget. When avoiding the other wires makes the search run out of it, the
+wire is searched again as if no other wire had been routed, which is quick; if that runs out too,
+the caller keeps the wire as it was.
+
+Like `HarnessModel`, this module has no pygame or Tk dependency.
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+import HarnessModel
+
+# The cost of a bend, in grid steps.
+BEND_PENALTY = 4
+# The extra cost of a step along a grid line another routed wire runs along. Crossing a wire is free.
+WIRE_PENALTY = 0.2
+# Grid steps the search may stray outside the box around a wire's two ends.
+SEARCH_MARGIN = 20
+# Seconds a search may take before it gives up.
+TIME_BUDGET = 0.02
+# The weight of the search's estimate of the remaining cost. Above 1 the search heads for the goal
+# more greedily; routes may cost up to this factor more than the cheapest, but on generated
+# harnesses the routes come out as short as with 1, found ten to twenty times faster.
+HEURISTIC_WEIGHT = 1.5
+# Expansions between checks of the time budget.
+CHECK_EVERY = 256
+
+# Steps along the lattice: right, down, left and up.
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+RIGHT = 0
+LEFT = 2
+
+
+def _simplify(points):
+    """
+    Returns a path without repeated points and without the points in the middle of straight runs.
+    """
+    path = []
+    for p in points:
+        if path and p == path[-1]:
+            continue
+        if len(path) >= 2:
+            (x0, y0), (x1, y1) = path[-2], path[-1]
+            if (x0 == x1 == p[0]) or (y0 == y1 == p[1]):
+                path[-1] = p
+                continue
+        path.append(p)
+    return path
+
+
+class Router():
+    """
+    Routes wires between connector pins along the grid, around the connectors.
+    """
+    def __init__(self, connectors, grid_size=25, bend_penalty=BEND_PENALTY, wire_penalty=WIRE_PENALTY,
+                 margin=SEARCH_MARGIN, time_budget=TIME_BUDGET, weight=HEURISTIC_WEIGHT):
+        """
+        Initializes the Router and indexes the grid points the connectors block.
+
+        Args:
+            connectors (list): The connectors to route around.
+            grid_size (int, optional): The spacing of the grid, in world units. Defaults to 25.
+            bend_penalty (float, optional): The cost of a bend. Defaults to BEND_PENALTY.
+            wire_penalty (float, optional): The cost of sharing a grid point with another routed
+                wire. Defaults to WIRE_PENALTY.
+            margin (int, optional): Grid steps the search may stray from the box around a wire's
+                ends. Defaults to SEARCH_MARGIN.
+            time_budget (float, optional): Seconds a search may take. Defaults to TIME_BUDGET.
+            weight (float, optional): The weight of the estimate of the remaining cost. Defaults to
+                HEURISTIC_WEIGHT.
+        """
+        self.grid_size = grid_size
+        self.bend_penalty = bend_penalty
+        self.wire_penalty = wire_penalty
+        self.margin = margin
+        self.time_budget = time_budget
+        self.weight = weight
+        # Points within half a grid step of a connector are blocked.
+        self.clearance = grid_size / 2
+        self.blocked = set()
+        for c in connectors:
+            i0, i1, j0, j1 = self._cells(c.rect)
+            self.blocked.update((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+        # The number of routed wires by (column, row, axis) of the steps they take, where the axis is
+        # 0 for horizontal steps and 1 for vertical ones.
+        self.occupancy = {}
+
+    def _cells(self, rect):
+        """
+        Returns the range of grid points a rect blocks, as (first column, last column, first row,
+        last row).
+        """
+        g = self.grid_size
+        c = self.clearance
+        return (math.floor((rect.left - c) / g) + 1, math.ceil((rect.right + c) / g) - 1,
+                math.floor((rect.top - c) / g) + 1, math.ceil((rect.bottom + c) / g) - 1)
+
+    def _exit(self, pin):
+        """
+        Returns the grid point a wire leaves a pin from, just clear of its connector, and the
+        direction it leaves in.
+        """
+        g = self.grid_size
+        connector = pin.parent
+        row = round(pin.y / g)
+        if not isinstance(connector, HarnessModel.Connector):
+            return (round(pin.x / g), row), None
+        i0, i1, _, _ = self._cells(connector.rect)
+        if connector.direction == "left":
+            return (i0 - 1, row), LEFT
+        return (i1 + 1, row), RIGHT
+
+    def route(self, start, end):
+        """
+        Finds a route between two pins.
+
+        Args:
+            start (Node): The pin the wire starts at.
+            end (Node): The pin the wire ends at.
+
+        Returns:
+            list: The (x, y) points of the wire between the pins, or None if no route was found
+            within the time budget.
+        """
+        return self._route(start, end)[0]
+
+    def _route(self, start, end):
+        """
+        Finds a route between two pins.
+
+        Returns:
+            tuple: A tuple of (points, grid points) of the route, or (None, None).
+        """
+        start_cell, start_dir = self._exit(start)
+        end_cell, end_dir = self._exit(end)
+        # The wire arrives at the end's exit point heading back towards the pin.
+        arrive_dir = None if end_dir is None else (end_dir + 2) % 4
+        cells = self._search(start_cell, start_dir, end_cell, arrive_dir, self.occupancy)
+        if cells is None and self.occupancy:
+            cells = self._search(start_cell, start_dir, end_cell, arrive_dir, None)
+        if cells is None:
+            return None, None
+        g = self.grid_size
+        points = [(start_cell[0] * g, start.y)] + [(i * g, j * g) for i, j in cells] + [(end_cell[0] * g, end.y)]
+        return _simplify([(start.x, start.y)] + points + [(end.x, end.y)])[1:-1], cells
+
+    def route_wire(self, wire):
+        """
+        Finds a route for a wire between its end pins and marks the grid points it uses, so that
+        later wires avoid them.
+
+        Returns:
+            list: The (x, y) points of the wire between its ends, or None if no route was found.
+        """
+        if len(wire.nodes) < 2:
+            return None
+        points, cells = self._route(wire.nodes[0], wire.nodes[-1])
+        if cells is not None:
+            occupancy = self.occupancy
+            for (i0, j0), (i1, j1) in zip(cells, cells[1:]):
+                key = (i1, j1, 0 if i1 != i0 else 1)
+                occupancy[key] = occupancy.get(key, 0) + 1
+        return points
+
+    def _estimate(self, i, j, goal):
+        """
+        Returns the weighted estimate of the cost from a grid point to the goal. Unweighted, it is a
+        lower bound: the steps, and a bend if the two are in neither the same row nor the same
+        column.
+        """
+        di = abs(goal[0] - i)
+        dj = abs(goal[1] - j)
+        return self.weight * (di + dj + (self.bend_penalty if di and dj else 0))
+
+    def _search(self, start, start_dir, goal, arrive_dir, occupancy):
+        """
+        Searches the grid with weighted A* from one point to another.
+
+        The search state is a grid point and the direction the path entered it in, so bends can be
+        charged for. Points blocked by connectors are skipped, except the two ends. Steps along
+        the lines in `occupancy`, if given, cost more.
+
+        Returns:
+            list: The grid points of the path, from start to goal, or None.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        blocked = self.blocked
+        bend = self.bend_penalty
+        wire_penalty = self.wire_penalty
+        gi, gj = goal
+        lo_i = min(start[0], gi) - self.margin
+        hi_i = max(start[0], gi) + self.margin
+        lo_j = min(start[1], gj) - self.margin
+        hi_j = max(start[1], gj) + self.margin
+
+        first = (start[0], start[1], start_dir)
+        best = {first: 0}
+        came_from = {first: None}
+        # Entries are (estimated total, -cost so far, push order, state). Among equal estimates the
+        # path that got furthest is taken first, which saves expanding the many equally good ones.
+        order = itertools.count()
+        heap = [(self._estimate(start[0], start[1], goal), 0, next(order), first)]
+        expanded = 0
+        while heap:
+            _, cost, _, state = heapq.heappop(heap)
+            cost = -cost
+            i, j, d = state
+            if (i, j) == goal:
+                path = []
+                while state is not None:
+                    path.append((state[0], state[1]))
+                    state = came_from[state]
+                path.reverse()
+                return path
+            if cost > best.get(state, cost):
+                continue
+            expanded += 1
+            if expanded % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                return None
+            for nd, (di, dj) in enumerate(DIRECTIONS):
+                if d is not None and nd == (d + 2) % 4:
+                    continue
+                ni = i + di
+                nj = j + dj
+                if ni < lo_i or ni > hi_i or nj < lo_j or nj > hi_j:
+                    continue
+                cell = (ni, nj)
+                if cell in blocked and cell != goal:
+                    continue
+                step = 1
+                if occupancy:
+                    step += wire_penalty * occupancy.get((ni, nj, nd % 2), 0)
+                if d is not None and nd != d:
+                    step += bend
+                if cell == goal and arrive_dir is not None and nd != arrive_dir:
+                    step += bend
+                new_cost = cost + step
+                next_state = (ni, nj, nd)
+                if new_cost < best.get(next_state, math.inf):
+                    best[next_state] = new_cost
+                    came_from[next_state] = state
+                    estimate = new_cost + self._estimate(ni, nj, goal)
+                    heapq.heappush(heap, (estimate, -new_cost, next(order), next_state))
+        return None
+
+
+def apply_route(wire, points):
+    """
+    Replaces a wire's bend nodes with new ones at the points of a route. The segment lengths are
+    reset to zero; recompute them with a `HarnessWireLength.LengthEngine`.
+    """
+    first = wire.nodes[0]
+    last = wire.nodes[-1]
+    wire.nodes[:] = [first] + [HarnessModel.Node(p, wire, 0, 0) for p in points] + [last]
+    wire.lengths = [0] * (len(wire.nodes) - 1)
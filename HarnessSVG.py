@@ -0,0 +1,270 @@
+"""
+This module exports harness drawings to SVG for printing, including 1:1 formboard drawings.
+
+The document is written element by element while the harness is walked once, so memory use does
+not grow with the size of the harness. Drawings are laid out in world units and sized in
+millimeters from the length scale, so they print at real size. Large formboards can be split into
+pages of a paper size, one SVG file per page, with some overlap to tape them together; the
+connectors and wires are sorted into the pages they overlap in one pass, so each page is written
+from its own objects.
+
+This module only needs `HarnessModel`; it does not need pygame or a display.
+"""
+
+import base64
+import math
+import os
+from xml.sax.saxutils import escape, quoteattr
+
+from HarnessModel import COLORS, GAUGE
+
+# Paper sizes in millimeters, portrait.
+PAGE_SIZES = {"A4": (210, 297), "A3": (297, 420), "A2": (420, 594), "A1": (594, 841), "A0": (841, 1189),
+              "Letter": (215.9, 279.4), "Tabloid": (279.4, 431.8)}
+# World units of empty space drawn around the harness.
+SVG_MARGIN = 20
+FONT_SIZE = 10
+# Wires of these colors are drawn with a thin dark casing so they show on white paper.
+CASED_COLORS = {"WHITE"}
+
+
+def _rgb(color):
+    """
+    Returns an (r, g, b) tuple as an SVG hex color.
+    """
+    return "#%02x%02x%02x" % tuple(color)
+
+
+def _image_data(filename):
+    """
+    Returns an image file as a data URI, or None if it cannot be read.
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    kind = "png" if data[:8] == b"\x89PNG\r\n\x1a\n" else "jpeg"
+    return "data:image/%s;base64,%s" % (kind, base64.b64encode(data).decode("ascii"))
+
+
+def _wire_bounds(wire):
+    """
+    Returns the (left, top, right, bottom) of a wire's nodes.
+    """
+    xs = [n.x for n in wire.nodes]
+    ys = [n.y for n in wire.nodes]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def svg_extent(connectors, wires, margin=SVG_MARGIN):
+    """
+    Returns the world-space bounds of a harness with a margin, or a small empty area if it is empty.
+
+    Returns:
+        tuple: A tuple of (left, top, right, bottom).
+    """
+    left = top = math.inf
+    right = bottom = -math.inf
+    for c in connectors:
+        left, top = min(left, c.rect.left), min(top, c.rect.top)
+        right, bottom = max(right, c.rect.right), max(bottom, c.rect.bottom)
+    for w in wires:
+        if w.nodes:
+            l, t, r, b = _wire_bounds(w)
+            left, top, right, bottom = min(left, l), min(top, t), max(right, r), max(bottom, b)
+    if left > right:
+        left = top = right = bottom = 0
+    return left - margin, top - margin, right + margin, bottom + margin
+
+
+def write_svg_document(f, connectors, wires, view, units_per_mm=1.0, pin_numbers=True, connector_names=True,
+                       wire_names=False, embed_images=True, label=None):
+    """
+    Streams one SVG document of the part of a harness inside a world-space rect.
+
+    Args:
+        f: A text file object to write to.
+        connectors (list): The connectors.
+        wires (list): The wires.
+        view (tuple): The (left, top, right, bottom) of the area to draw, in world units.
+        units_per_mm (float, optional): World units per millimeter on paper. Defaults to 1.0.
+        pin_numbers (bool, optional): Whether to label the pins. Defaults to True.
+        connector_names (bool, optional): Whether to label the connectors. Defaults to True.
+        wire_names (bool, optional): Whether to label the wires. Defaults to False.
+        embed_images (bool, optional): Whether to embed the connector images, rather than only
+            outline the connectors. Defaults to True.
+        label (str, optional): A caption for the top-left corner, such as a page number. Defaults to None.
+    """
+    _write_document(f, connectors, ((w, _wire_bounds(w)) for w in wires if len(w.nodes) >= 2), view,
+                    units_per_mm, pin_numbers, connector_names, wire_names, embed_images, label)
+
+
+def _write_document(f, connectors, wires, view, units_per_mm=1.0, pin_numbers=True, connector_names=True,
+                    wire_names=False, embed_images=True, label=None):
+    """
+    Streams one SVG document, as `write_svg_document`, of wires given with their bounds as
+    (wire, (left, top, right, bottom)) pairs.
+    """
+    left, top, right, bottom = view
+    width, height = right - left, bottom - top
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'width="%gmm" height="%gmm" viewBox="%g %g %g %g">\n'
+            % (width / units_per_mm, height / units_per_mm, left, top, width, height))
+
+    # One class per color and gauge keeps the per-wire markup short.
+    f.write("<style>\n")
+    f.write(".w{fill:none;stroke-linecap:round;stroke-linejoin:round}\n")
+    f.write(".case{fill:none;stroke:#404040;stroke-linecap:round;stroke-linejoin:round}\n")
+    for name, color in COLORS.items():
+        f.write(".c-%s{stroke:%s}\n" % (name, _rgb(color)))
+    for gauge, stroke in GAUGE.items():
+        f.write(".g-%s{stroke-width:%g}\n" % (gauge.replace("/", "_"), stroke))
+        f.write(".k-%s{stroke-width:%g}\n" % (gauge.replace("/", "_"), stroke + 0.6))
+    f.write(".c{fill:none;stroke:#000000;stroke-width:0.5}\n")
+    f.write("text{font-family:sans-serif;font-size:%gpx;text-anchor:middle;dominant-baseline:central}\n" % FONT_SIZE)
+    f.write("</style>\n")
+
+    # Connectors, with each distinct image embedded once in the definitions at the end.
+    images = {}
+    f.write('<g id="connectors">\n')
+    for c in connectors:
+        r = c.rect
+        if r.right < left or r.left > right or r.bottom < top or r.top > bottom:
+            continue
+        if embed_images:
+            image_id = images.setdefault(c.imageFile, ("img%d" % len(images), r.width, r.height))[0]
+            if c.direction == "left":
+                f.write('<use xlink:href="#%s" transform="translate(%g %g) scale(-1 1)"/>\n'
+                        % (image_id, r.right, r.top))
+            else:
+                f.write('<use xlink:href="#%s" x="%g" y="%g"/>\n' % (image_id, r.left, r.top))
+        f.write('<rect class="c" x="%g" y="%g" width="%g" height="%g"/>\n' % (r.left, r.top, r.width, r.height))
+        if connector_names:
+            f.write('<text x="%g" y="%g">%s</text>\n' % (r.centerx, r.centery - 20, escape(str(c.name))))
+        if pin_numbers:
+            for n in c.nodes:
+                f.write('<text x="%g" y="%g">%d</text>\n' % (n.x, n.y, n.get_display_pin()))
+    f.write("</g>\n")
+
+    f.write('<g id="wires">\n')
+    for w, (l, t, r, b) in wires:
+        if r < left or l > right or b < top or t > bottom:
+            continue
+        points = " ".join("%g,%g" % (n.x, n.y) for n in w.nodes)
+        color = w.get_color()
+        gauge = str(w.get_gauge()).replace("/", "_")
+        if color in CASED_COLORS:
+            f.write('<polyline class="case k-%s" points="%s"/>\n' % (gauge, points))
+        f.write('<polyline class="w c-%s g-%s" points="%s"><title>%s</title></polyline>\n'
+                % (color, gauge, points, escape(str(w.name))))
+        if wire_names:
+            first, last = w.nodes[0], w.nodes[-1]
+            f.write('<text x="%g" y="%g">%s</text>\n'
+                    % ((first.x + last.x) / 2, (first.y + last.y) / 2, escape(str(w.name))))
+    f.write("</g>\n")
+
+    if label:
+        f.write('<text x="%g" y="%g" style="text-anchor:start">%s</text>\n'
+                % (left + FONT_SIZE / 2, top + FONT_SIZE, escape(label)))
+
+    if images:
+        f.write("<defs>\n")
+        for filename, (image_id, image_width, image_height) in images.items():
+            data = _image_data(filename)
+            if data is None:
+                continue
+            f.write('<image id="%s" width="%g" height="%g" xlink:href=%s/>\n'
+                    % (image_id, image_width, image_height, quoteattr(data)))
+        f.write("</defs>\n")
+    f.write("</svg>\n")
+
+
+def write_svg(filepath, connectors, wires, units_per_mm=1.0, **options):
+    """
+    Writes a whole harness to one SVG file at real size.
+
+    Args:
+        filepath (str): The SVG file to write.
+        connectors (list): The connectors.
+        wires (list): The wires.
+        units_per_mm (float, optional): World units per millimeter on paper. Defaults to 1.0.
+        **options: Drawing options passed on to `write_svg_document`.
+    """
+    for c in connectors:
+        c.update()
+    with open(filepath, "w", encoding="utf-8") as f:
+        write_svg_document(f, connectors, wires, svg_extent(connectors, wires), units_per_mm, **options)
+
+
+def write_svg_pages(filepath, connectors, wires, page_size=PAGE_SIZES["A4"], units_per_mm=1.0, overlap=10,
+                    landscape=False, **options):
+    """
+    Writes a harness at real size tiled over pages, one SVG file per page.
+
+    Pages are named after `filepath` with the row and column appended, such as `board_r1_c2.svg`.
+
+    Args:
+        filepath (str): The base SVG file name.
+        connectors (list): The connectors.
+        wires (list): The wires.
+        page_size (tuple, optional): The (width, height) of a page in millimeters. Defaults to A4.
+        units_per_mm (float, optional): World units per millimeter on paper. Defaults to 1.0.
+        overlap (float, optional): Millimeters each page repeats of its neighbours. Defaults to 10.
+        landscape (bool, optional): Whether to turn the pages sideways. Defaults to False.
+        **options: Drawing options passed on to `write_svg_document`.
+
+    Returns:
+        list: The files written.
+    """
+    if landscape:
+        page_size = (page_size[1], page_size[0])
+    for c in connectors:
+        c.update()
+    left, top, right, bottom = svg_extent(connectors, wires)
+    page_width = page_size[0] * units_per_mm
+    page_height = page_size[1] * units_per_mm
+    step_x = page_width - overlap * units_per_mm
+    step_y = page_height - overlap * units_per_mm
+    if step_x <= 0 or step_y <= 0:
+        raise ValueError("page overlap must be smaller than the page")
+    columns = max(1, math.ceil((right - left - page_width) / step_x) + 1)
+    rows = max(1, math.ceil((bottom - top - page_height) / step_y) + 1)
+
+    # Sort the connectors and wires into the pages they overlap in one pass, so each page is
+    # written from its own objects and the export stays linear in the size of the harness.
+    def span(low, high, start, step, size, count):
+        first = max(0, math.floor((low - start - size) / step))
+        last = min(count - 1, math.floor((high - start) / step))
+        return range(first, last + 1)
+
+    page_connectors = [[[] for _ in range(columns)] for _ in range(rows)]
+    page_wires = [[[] for _ in range(columns)] for _ in range(rows)]
+    for c in connectors:
+        r = c.rect
+        for row in span(r.top, r.bottom, top, step_y, page_height, rows):
+            for column in span(r.left, r.right, left, step_x, page_width, columns):
+                page_connectors[row][column].append(c)
+    for w in wires:
+        if len(w.nodes) < 2:
+            continue
+        bounds = _wire_bounds(w)
+        for row in span(bounds[1], bounds[3], top, step_y, page_height, rows):
+            for column in span(bounds[0], bounds[2], left, step_x, page_width, columns):
+                page_wires[row][column].append((w, bounds))
+
+    stem, ext = os.path.splitext(filepath)
+    files = []
+    for row in range(rows):
+        for column in range(columns):
+            page_left = left + column * step_x
+            page_top = top + row * step_y
+            view = (page_left, page_top, page_left + page_width, page_top + page_height)
+            page_path = "%s_r%d_c%d%s" % (stem, row + 1, column + 1, ext or ".svg")
+            with open(page_path, "w", encoding="utf-8") as f:
+                _write_document(f, page_connectors[row][column], page_wires[row][column], view, units_per_mm,
+                                label="Row %d of %d, column %d of %d" % (row + 1, rows, column + 1, columns),
+                                **options)
+            files.append(page_path)
+    return files
@@ -0,0 +1,256 @@
+"""
+This module defines the selection tools of the editor: the spatial index that answers rubber-band
+queries, and the group move that drags a whole selection at once.
+
+The index keeps the bounds of the connectors and the positions of the wire bend nodes in arrays,
+so a query compares the whole harness against the band in a few vectorized operations. It is
+rebuilt on the first query after the harness changes. A group move keeps the starting positions
+of everything it moves, so each mouse event places the whole group with one array addition and
+only the wires attached to the group need their lengths recomputed.
+"""
+
+import HarnessModel
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+class Selection(list):
+    """
+    The list of selected objects, with a revision number that changes whenever the list does, so
+    the drawing frame can tell that the selection changed without comparing its contents.
+    """
+    def __init__(self, objects=()):
+        """
+        Initializes the Selection.
+
+        Args:
+            objects (iterable, optional): The objects selected at first. Defaults to ().
+        """
+        super().__init__(objects)
+        self.revision = 0
+
+    def _changed(self):
+        self.revision += 1
+
+    def append(self, obj):
+        super().append(obj)
+        self._changed()
+
+    def extend(self, objects):
+        super().extend(objects)
+        self._changed()
+
+    def insert(self, index, obj):
+        super().insert(index, obj)
+        self._changed()
+
+    def remove(self, obj):
+        super().remove(obj)
+        self._changed()
+
+    def pop(self, index=-1):
+        obj = super().pop(index)
+        self._changed()
+        return obj
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, objects):
+        self.extend(objects)
+        return self
+
+
+def selection_parts(selected):
+    """
+    Splits a selection into the connectors, the wires and the wire bend nodes it holds.
+
+    A selected bend node stands for its wire, and a selected wire moves all of its bend nodes.
+    Pin nodes stand for their connectors.
+
+    Args:
+        selected (list): The selected connectors, wires and nodes.
+
+    Returns:
+        tuple: A tuple of (connectors, wires, nodes) lists, in selection order and without repeats.
+    """
+    connectors = {}
+    wires = {}
+    nodes = {}
+    for obj in selected:
+        if isinstance(obj, HarnessModel.Node):
+            if isinstance(obj.parent, HarnessModel.Connector):
+                connectors[obj.parent] = None
+                continue
+            wires[obj.parent] = None
+            nodes[obj] = None
+        elif isinstance(obj, HarnessModel.Connector):
+            connectors[obj] = None
+        elif isinstance(obj, HarnessModel.Wire):
+            wires[obj] = None
+            for n in obj.nodes:
+                if n.parent is obj:
+                    nodes[n] = None
+    return list(connectors), list(wires), list(nodes)
+
+
+def attached_wires(wires, connectors=(), nodes=()):
+    """
+    Returns the wires that end on one of the connectors or pass through one of the nodes.
+    """
+    connectors = set(connectors)
+    nodes = set(nodes)
+    return [w for w in wires if any(n.parent in connectors or n in nodes for n in w.nodes)]
+
+
+class SpatialIndex():
+    """
+    Finds the connectors and wire bend nodes that lie inside a rectangle of the world.
+    """
+    def __init__(self, frame):
+        """
+        Initializes the SpatialIndex.
+
+        Args:
+            frame (DrawFrame): The drawing frame whose harness is indexed.
+        """
+        self.frame = frame
+        self.connectors = []
+        self.nodes = []
+        self._bounds = None
+        self._points = None
+        self._revision = None
+
+    def invalidate(self):
+        """
+        Makes the next query rebuild the index, after objects moved.
+        """
+        self._revision = None
+
+    def _build(self):
+        """
+        Rebuilds the index if the harness changed since it was built.
+        """
+        revision = self.frame.model_revision()
+        if revision == self._revision:
+            return
+        self.connectors = list(self.frame.connectors)
+        self.nodes = [n for w in self.frame.wires for n in w.nodes if n.parent is w]
+        bounds = [(c.rect.left, c.rect.top, c.rect.right, c.rect.bottom) for c in self.connectors]
+        points = [(n.x, n.y) for n in self.nodes]
+        if np is not None:
+            bounds = np.array(bounds, dtype=np.int64).reshape(-1, 4)
+            points = np.array(points, dtype=np.int64).reshape(-1, 2)
+        self._bounds = bounds
+        self._points = points
+        self._revision = revision
+
+    def query(self, left, top, right, bottom):
+        """
+        Returns the connectors and wire bend nodes that lie wholly inside a rectangle.
+
+        Args:
+            left (int): The left edge of the rectangle, in world coordinates.
+            top (int): The top edge.
+            right (int): The right edge.
+            bottom (int): The bottom edge.
+
+        Returns:
+            list: The connectors, then the nodes, in drawing order.
+        """
+        self._build()
+        if np is None:
+            return ([c for c, (l, t, r, b) in zip(self.connectors, self._bounds)
+                     if l >= left and t >= top and r <= right and b <= bottom] +
+                    [n for n, (x, y) in zip(self.nodes, self._points)
+                     if left <= x <= right and top <= y <= bottom])
+        b = self._bounds
+        inside = (b[:, 0] >= left) & (b[:, 1] >= top) & (b[:, 2] <= right) & (b[:, 3] <= bottom)
+        p = self._points
+        within = (p[:, 0] >= left) & (p[:, 0] <= right) & (p[:, 1] >= top) & (p[:, 1] <= bottom)
+        connectors = self.connectors
+        nodes = self.nodes
+        return [connectors[i] for i in np.flatnonzero(inside).tolist()] + \
+               [nodes[i] for i in np.flatnonzero(within).tolist()]
+
+
+class GroupMove():
+    """
+    Moves the connectors and wire bend nodes of a selection together, by an offset from where they
+    were when the move started.
+    """
+    def __init__(self, selected, wires):
+        """
+        Initializes the GroupMove.
+
+        Args:
+            selected (list): The selected objects; see `selection_parts`.
+            wires (list): The wires of the harness, to find the ones attached to the group.
+        """
+        self.connectors, self.node_wires, self.nodes = selection_parts(selected)
+        self.wires = attached_wires(wires, self.connectors, self.nodes)
+        self.offset = (0, 0)
+        corners = [(c.rect.x, c.rect.y) for c in self.connectors]
+        points = [(n.x, n.y) for n in self.nodes]
+        if np is not None:
+            corners = np.array(corners, dtype=np.int64).reshape(-1, 2)
+            points = np.array(points, dtype=np.int64).reshape(-1, 2)
+        self._corners = corners
+        self._points = points
+
+    def objects(self):
+        """
+        Returns the connectors the group moves and the wires whose bend nodes it moves, the objects
+        to report as moved. Reporting a wire rather than each of its nodes keeps the events few.
+        """
+        return self.connectors + self.node_wires
+
+    def move(self, dx, dy):
+        """
+        Places the group at an offset from its starting position and moves the connectors' pins.
+
+        Args:
+            dx (int): The offset in x, in world coordinates.
+            dy (int): The offset in y.
+
+        Returns:
+            bool: True if the group moved.
+        """
+        dx, dy = int(dx), int(dy)
+        if (dx, dy) == self.offset:
+            return False
+        if np is not None:
+            corners = (self._corners + (dx, dy)).tolist()
+            points = (self._points + (dx, dy)).tolist()
+        else:
+            corners = [(x + dx, y + dy) for x, y in self._corners]
+            points = [(x + dx, y + dy) for x, y in self._points]
+        for c, (x, y) in zip(self.connectors, corners):
+            c.rect.x = x
+            c.rect.y = y
+            c.update()
+        for n, (x, y) in zip(self.nodes, points):
+            n.x = x
+            n.y = y
+        self.offset = (dx, dy)
+        return True
@@ -0,0 +1,264 @@
+"""
+This module plans how the wires on the cut sheet are cut from spools.
+
+Cuts are grouped by (gauge, color, part number) and packed onto spools of a configurable length so
+that as few spools as possible are opened and the scrap is kept in as few remnants as possible.
+The fast greedy mode is best-fit decreasing; the improvement mode then moves and swaps cuts from
+the emptiest spools onto fuller ones, dropping spools that become empty, until no step helps or
+the time budget runs out.
+"""
+
+import bisect
+import csv
+import time
+
+HEADERS = ["Spool", "Gauge", "Color", "Part Number", "Spool Length", "Cut", "Wire Name", "Cut Length", "Remaining"]
+
+
+class Spool():
+    """
+    A spool of one wire type and the cuts assigned to it.
+    """
+    def __init__(self, key, length):
+        """
+        Initializes a Spool.
+
+        Args:
+            key (tuple): The (gauge, color, part number) of the wire on the spool.
+            length (float): The length of wire on the spool.
+        """
+        self.key = key
+        self.length = length
+        self.cuts = []
+        self.used = 0
+
+    @property
+    def remaining(self):
+        """
+        The length left on the spool after all its cuts.
+        """
+        return self.length - self.used
+
+    def add(self, cut):
+        """
+        Assigns a cut, a tuple of (wire, length consumed), to the spool.
+        """
+        self.cuts.append(cut)
+        self.used += cut[1]
+
+    def remove(self, index):
+        """
+        Removes and returns the cut at the given index.
+        """
+        cut = self.cuts.pop(index)
+        self.used -= cut[1]
+        return cut
+
+
+class SpoolPlan():
+    """
+    A spool-by-spool cutting plan.
+    """
+    def __init__(self, spools, oversize, kerf=0):
+        """
+        Initializes a SpoolPlan.
+
+        Args:
+            spools (list): The spools with their cuts.
+            oversize (list): The wires that are longer than a whole spool.
+            kerf (float, optional): The length lost with every cut. Defaults to 0.
+        """
+        self.spools = spools
+        self.oversize = oversize
+        self.kerf = kerf
+
+    def scrap(self):
+        """
+        Returns the total length left over on the opened spools.
+        """
+        return sum(s.remaining for s in self.spools)
+
+    def utilization(self):
+        """
+        Returns the fraction of the opened spool length that is used by cuts.
+        """
+        total = sum(s.length for s in self.spools)
+        return sum(s.used for s in self.spools) / total if total else 1.0
+
+    def rows(self):
+        """
+        Returns the plan as rows, one per cut, in the order of `HEADERS`.
+        """
+        rows = []
+        for i, spool in enumerate(self.spools, start=1):
+            gauge, color, partnumber = spool.key
+            remaining = spool.length
+            for j, (wire, consumed) in enumerate(spool.cuts, start=1):
+                remaining -= consumed
+                rows.append([i, gauge, color, partnumber, spool.length, j, wire.name,
+                             round(consumed - self.kerf, 3), round(remaining, 3)])
+        return rows
+
+    def write_csv(self, filepath):
+        """
+        Writes the plan to a CSV file.
+        """
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(self.rows())
+
+
+def _best_fit_decreasing(key, cuts, length, spools=None):
+    """
+    Packs cuts onto spools with best-fit decreasing.
+
+    Args:
+        key (tuple): The wire type of the cuts.
+        cuts (list): Tuples of (wire, length consumed), each no longer than `length`.
+        length (float): The spool length.
+        spools (list, optional): Partly used spools to fill before opening new ones.
+
+    Returns:
+        list: The spools.
+    """
+    spools = list(spools or [])
+    # Spools ordered by remaining length so the tightest fit is found with a binary search.
+    free = sorted((s.remaining, i) for i, s in enumerate(spools))
+    for cut in sorted(cuts, key=lambda c: -c[1]):
+        pos = bisect.bisect_left(free, (cut[1], -1))
+        if pos < len(free):
+            _, i = free.pop(pos)
+        else:
+            i = len(spools)
+            spools.append(Spool(key, length))
+        spools[i].add(cut)
+        bisect.insort(free, (spools[i].remaining, i))
+    return spools
+
+
+def _relieve(spool, spools):
+    """
+    Moves wire off a spool onto a fuller one.
+
+    Tries to move one of the spool's cuts onto a spool that is at least as full, or to swap it for
+    a shorter cut there. Either move makes the full spools fuller and this one emptier, so it
+    concentrates the scrap and eventually frees whole spools.
+
+    Returns:
+        bool: True if a cut was moved or swapped.
+    """
+    others = sorted((s for s in spools if s is not spool and s.used >= spool.used), key=lambda s: s.remaining)
+    for x in sorted(range(len(spool.cuts)), key=lambda i: -spool.cuts[i][1]):
+        cut = spool.cuts[x]
+        for other in others:
+            if other.remaining >= cut[1]:
+                spool.remove(x)
+                other.add(cut)
+                return True
+            # The shortest cut on the other spool that still makes room for this one.
+            swap = None
+            for y, other_cut in enumerate(other.cuts):
+                if cut[1] - other.remaining <= other_cut[1] < cut[1]:
+                    if swap is None or other_cut[1] < other.cuts[swap][1]:
+                        swap = y
+            if swap is not None:
+                other_cut = other.remove(swap)
+                spool.remove(x)
+                other.add(cut)
+                spool.add(other_cut)
+                return True
+    return False
+
+
+def _improve(spools, deadline):
+    """
+    Improves a packing with move and swap steps until the deadline.
+
+    The emptiest spool that can still be relieved is repeatedly relieved; spools that become empty
+    are dropped. Every step strictly concentrates the used length, so the search ends on its own once
+    no spool can be relieved.
+    """
+    stuck = set()
+    while time.perf_counter() < deadline:
+        candidates = [s for s in spools if id(s) not in stuck]
+        if not candidates:
+            break
+        spool = min(candidates, key=lambda s: s.used)
+        if _relieve(spool, spools):
+            stuck.clear()
+            if not spool.cuts:
+                spools.remove(spool)
+        else:
+            stuck.add(id(spool))
+    return spools
+
+
+def plan_spools(wires, spool_length, spool_lengths=None, kerf=0, mode="greedy", time_budget=1.0, progress=None):
+    """
+    Plans the spools needed to cut a list of wires.
+
+    Args:
+        wires (list): The wires to cut; their length is `Wire.get_total_length`.
+        spool_length (float): The default spool length.
+        spool_lengths (dict, optional): Spool lengths per (gauge, color, part number). Defaults to None.
+        kerf (float, optional): The length lost with every cut. Defaults to 0.
+        mode (str, optional): "greedy" or "improve". Defaults to "greedy".
+        time_budget (float, optional): Seconds the improvement mode may run. Defaults to 1.0.
+        progress (function, optional): Called with (done, total) wire types as the improvement mode
+            works through them, as by a background job that may be cancelled. Defaults to None.
+
+    Returns:
+        SpoolPlan: The cutting plan.
+    """
+    if mode not in ("greedy", "improve"):
+        raise ValueError("unknown spool planning mode " + str(mode))
+    spool_lengths = spool_lengths or {}
+
+    groups = {}
+    for w in wires:
+        length = w.get_total_length()
+        if length > 0:
+            groups.setdefault((w.get_gauge(), w.get_color(), w.partnumber), []).append((w, length + kerf))
+
+    spools = []
+    oversize = []
+    packed = {}
+    for key, cuts in groups.items():
+        length = spool_lengths.get(key, spool_length)
+        fitting = [c for c in cuts if c[1] <= length]
+        oversize.extend(c[0] for c in cuts if c[1] > length)
+        packed[key] = (_best_fit_decreasing(key, fitting, length), length)
+
+    if mode == "improve":
+        deadline = time.perf_counter() + time_budget
+        keys = list(packed)
+        for n, key in enumerate(keys):
+            if progress is not None:
+                progress(n, len(keys))
+            # Share the remaining budget evenly between the wire types still to improve.
+            group_deadline = time.perf_counter() + (deadline - time.perf_counter()) / (len(keys) - n)
+            group_spools, length = packed[key]
+            packed[key] = (_improve(group_spools, group_deadline), length)
+
+    for key, (group_spools, length) in packed.items():
+        spools.extend(sorted(group_spools, key=lambda s: s.remaining))
+    return SpoolPlan(spools, oversize, kerf)
+
+
+def write_spool_plan(filepath, wires, spool_length, **options):
+    """
+    Plans the spools needed to cut a list of wires and writes the plan to a CSV file.
+
+    Args:
+        filepath (str): The CSV file.
+        wires (list): The wires to cut.
+        spool_length (float): The default spool length.
+        **options: Further arguments for `plan_spools`.
+
+    Returns:
+        SpoolPlan: The plan written.
+    """
+    plan = plan_spools(wires, spool_length, **options)
+    plan.write_csv(filepath)
+    return plan
@@ -0,0 +1,177 @@
+"""
+This module computes wire segment lengths from the geometry of the harness.
+
+Lengths are measured between the centers of consecutive wire nodes in world units and
+converted to real units with a configurable scale. Service-loop allowances are stored on
+each wire and added on top of the routed length by `Wire.get_total_length`.
+"""
+
+import math
+
+np = None
+
+
+def _import_numpy():
+    """
+    Imports NumPy on first use, so importing this module stays fast.
+
+    Returns:
+        module: The numpy module, or None if it is not installed.
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except Exception:
+            np = False
+    return np or None
+
+
+UNITS = {"mm": 1.0, "in": 25.4}
+
+
+def has_lengths(wires):
+    """
+    Returns whether any of the wires has a segment length set, as a harness saved with its
+    lengths does. A harness whose lengths are all zero has never been measured.
+    """
+    return any(any(w.lengths) for w in wires)
+
+
+class LengthEngine():
+    """
+    Computes and updates `Wire.lengths` from node positions.
+    """
+    def __init__(self, units_per_length=1.0, unit="mm", precision=1, service_loops=(0, 0)):
+        """
+        Initializes the LengthEngine.
+
+        Args:
+            units_per_length (float, optional): World units per one `unit` of real length. Defaults to 1.0.
+            unit (str, optional): The real length unit, "mm" or "in". Defaults to "mm".
+            precision (int, optional): Decimal places lengths are rounded to. Defaults to 1.
+            service_loops (tuple, optional): Default (start, end) allowances for new wires. Defaults to (0, 0).
+        """
+        if unit not in UNITS:
+            raise ValueError("unknown length unit " + str(unit))
+        self.units_per_length = float(units_per_length)
+        self.unit = unit
+        self.precision = precision
+        self.service_loops = tuple(service_loops)
+
+    def set_scale(self, units_per_length, unit=None):
+        """
+        Sets the number of world units per real length unit.
+        """
+        if unit is not None:
+            if unit not in UNITS:
+                raise ValueError("unknown length unit " + str(unit))
+            self.unit = unit
+        self.units_per_length = float(units_per_length)
+
+    def convert(self, length, unit):
+        """
+        Converts a length in the engine's unit to another unit.
+        """
+        return length * UNITS[self.unit] / UNITS[unit]
+
+    def apply_service_loops(self, wire):
+        """
+        Applies the engine's default service-loop allowances to a wire.
+        """
+        wire.service_loops = list(self.service_loops)
+
+    def _measure(self, p1, p2):
+        """
+        Returns the real length between two world positions.
+        """
+        dist = math.hypot(p2[0] - p1[0], p2[1] - p1[1]) / self.units_per_length
+        return round(dist, self.precision)
+
+    def segment_lengths(self, wire):
+        """
+        Returns the lengths of all segments of a wire.
+        """
+        centers = [(n.x, n.y) for n in wire.nodes]
+        return [self._measure(centers[i], centers[i + 1]) for i in range(len(centers) - 1)]
+
+    def update_wire(self, wire):
+        """
+        Recomputes every segment length of a wire.
+        """
+        wire.lengths = self.segment_lengths(wire)
+
+    def update_segments(self, wire, indices):
+        """
+        Recomputes only the given segment indices of a wire.
+
+        Args:
+            wire (Wire): The wire to update.
+            indices (iterable): Segment indices; segment i joins node i and node i + 1.
+        """
+        if len(wire.lengths) != len(wire.nodes) - 1:
+            self.update_wire(wire)
+            return
+        nodes = wire.nodes
+        for i in indices:
+            if 0 <= i < len(wire.lengths):
+                wire.lengths[i] = self._measure((nodes[i].x, nodes[i].y), (nodes[i + 1].x, nodes[i + 1].y))
+
+    def update_node(self, node):
+        """
+        Recomputes the two segments adjacent to an intermediate wire node.
+        """
+        wire = node.parent
+        for i, n in enumerate(wire.nodes):
+            if n is node:
+                self.update_segments(wire, (i - 1, i))
+                return
+
+    def update_connector(self, connector, wires):
+        """
+        Recomputes the end segments of wires attached to a connector's pins.
+
+        The connector's pin nodes must already be at their new positions (see `Connector.update`).
+        """
+        for w in wires:
+            if not w.nodes:
+                continue
+            if w.nodes[0].parent is connector:
+                self.update_segments(w, (0,))
+            if w.nodes[-1].parent is connector:
+                self.update_segments(w, (len(w.nodes) - 2,))
+
+    def update_all(self, wires):
+        """
+        Recomputes the segment lengths of every wire in a single vectorized pass.
+        """
+        if _import_numpy() is None:
+            for w in wires:
+                self.update_wire(w)
+            return
+
+        for w in wires:
+            if not w.nodes:
+                w.lengths = []
+        wires = [w for w in wires if w.nodes]
+        counts = [len(w.nodes) for w in wires]
+        total = sum(counts)
+        if total == 0:
+            return
+        nodes = [n for w in wires for n in w.nodes]
+        xs = np.fromiter([n.x for n in nodes], dtype=np.float64, count=total)
+        ys = np.fromiter([n.y for n in nodes], dtype=np.float64, count=total)
+
+        seg = np.hypot(np.diff(xs), np.diff(ys)) / self.units_per_length
+        seg = np.round(seg, self.precision)
+
+        # Drop the bogus segments that join the last node of one wire to the first node of the next.
+        ends = np.cumsum(counts)
+        seg = np.delete(seg, ends[:-1] - 1).tolist()
+
+        start = 0
+        for w, n in zip(wires, counts):
+            stop = start + n - 1
+            w.lengths = seg[start:stop]
+            start = stop
@@ -1,7 +1,12 @@
 """
 This module provides an undo/redo framework for the HarnessIT application.
+
+Undoing or redoing an action sends its changes to the model event bus as one batch.
 """
 
+from HarnessEvents import bus, CREATED, DELETED, MOVED, CHANGED
+from HarnessModel import flip_connectors
+
 class UndoManager:
     """
     A class that manages undo and redo operations.
@@ -26,22 +31,32 @@ class UndoManager:
     def undo(self):
         """
         Undoes the last action.
+
+        Returns:
+            The action that was undone, or None if there was nothing to undo.
         """
         if not self.undo_stack:
-            return
+            return None
         action = self.undo_stack.pop()
-        action.undo()
+        with bus.transaction():
+            action.undo()
         self.redo_stack.append(action)
+        return action
 
     def redo(self):
         """
         Redoes the last undone action.
+
+        Returns:
+            The action that was redone, or None if there was nothing to redo.
         """
         if not self.redo_stack:
-            return
+            return None
         action = self.redo_stack.pop()
-        action.redo()
+        with bus.transaction():
+            action.redo()
         self.undo_stack.append(action)
+        return action
 
     def clear(self):
         """
@@ -73,12 +88,14 @@ class MoveAction:
         Undoes the move action.
         """
         self.obj.rect.center = self.old_pos
+        bus.emit(MOVED, self.obj)
 
     def redo(self):
         """
         Redoes the move action.
         """
         self.obj.rect.center = self.new_pos
+        bus.emit(MOVED, self.obj)
 
 
 class CreateAction:
@@ -103,9 +120,11 @@ class CreateAction:
         if isinstance(self.obj, self.app.HarnessComponents.Connector):
             if self.obj in self.app.HDF.connectors:
                 self.app.HDF.connectors.remove(self.obj)
+                bus.emit(DELETED, self.obj)
         elif isinstance(self.obj, self.app.HarnessComponents.Wire):
             if self.obj in self.app.HDF.wires:
                 self.app.HDF.wires.remove(self.obj)
+                bus.emit(DELETED, self.obj)
 
     def redo(self):
         """
@@ -114,9 +133,11 @@ class CreateAction:
         if isinstance(self.obj, self.app.HarnessComponents.Connector):
             if self.obj not in self.app.HDF.connectors:
                 self.app.HDF.connectors.append(self.obj)
+                bus.emit(CREATED, self.obj)
         elif isinstance(self.obj, self.app.HarnessComponents.Wire):
             if self.obj not in self.app.HDF.wires:
                 self.app.HDF.wires.append(self.obj)
+                bus.emit(CREATED, self.obj)
 
 
 class DeleteAction:
@@ -141,9 +162,11 @@ class DeleteAction:
         if isinstance(self.obj, self.app.HarnessComponents.Connector):
             if self.obj not in self.app.HDF.connectors:
                 self.app.HDF.connectors.append(self.obj)
+                bus.emit(CREATED, self.obj)
         elif isinstance(self.obj, self.app.HarnessComponents.Wire):
             if self.obj not in self.app.HDF.wires:
                 self.app.HDF.wires.append(self.obj)
+                bus.emit(CREATED, self.obj)
 
     def redo(self):
         """
@@ -152,9 +175,11 @@ class DeleteAction:
         if isinstance(self.obj, self.app.HarnessComponents.Connector):
             if self.obj in self.app.HDF.connectors:
                 self.app.HDF.connectors.remove(self.obj)
+                bus.emit(DELETED, self.obj)
         elif isinstance(self.obj, self.app.HarnessComponents.Wire):
             if self.obj in self.app.HDF.wires:
                 self.app.HDF.wires.remove(self.obj)
+                bus.emit(DELETED, self.obj)
 
 
 class FlipAction:
@@ -184,6 +209,196 @@ class FlipAction:
         """
         self.obj.flip(self.app)
 
+class GroupMoveAction:
+    """
+    An action that represents moving a selection of objects together.
+    """
+    def __init__(self, group):
+        """
+        Initializes a GroupMoveAction.
+
+        Args:
+            group (HarnessSelection.GroupMove): The move, at the offset it ended at.
+        """
+        self.group = group
+        self.offset = group.offset
+
+    def undo(self):
+        """
+        Undoes the group move.
+        """
+        self.group.move(0, 0)
+        for obj in self.group.objects():
+            bus.emit(MOVED, obj)
+
+    def redo(self):
+        """
+        Redoes the group move.
+        """
+        self.group.move(*self.offset)
+        for obj in self.group.objects():
+            bus.emit(MOVED, obj)
+
+
+class GroupFlipAction:
+    """
+    An action that represents flipping several connectors at once.
+    """
+    def __init__(self, app, connectors):
+        """
+        Initializes a GroupFlipAction.
+
+        Args:
+            app: The main application instance.
+            connectors: The connectors that were flipped.
+        """
+        self.app = app
+        self.connectors = connectors
+
+    def undo(self):
+        """
+        Undoes the group flip action.
+        """
+        flip_connectors(self.connectors, self.app.HDF.wires)
+
+    def redo(self):
+        """
+        Redoes the group flip action.
+        """
+        flip_connectors(self.connectors, self.app.HDF.wires)
+
+
+class GroupDeleteAction:
+    """
+    An action that represents deleting several objects at once.
+
+    The harness lists are filtered in one pass, rather than searched once per object.
+    """
+    def __init__(self, app, objects):
+        """
+        Initializes a GroupDeleteAction.
+
+        Args:
+            app: The main application instance.
+            objects: The connectors and wires that were deleted.
+        """
+        self.app = app
+        self.objects = objects
+
+    def undo(self):
+        """
+        Undoes the group delete action.
+        """
+        hdf = self.app.HDF
+        present = set(hdf.connectors)
+        present.update(hdf.wires)
+        for obj in self.objects:
+            if obj in present:
+                continue
+            if isinstance(obj, self.app.HarnessComponents.Connector):
+                hdf.connectors.append(obj)
+            else:
+                hdf.wires.append(obj)
+            bus.emit(CREATED, obj)
+
+    def redo(self):
+        """
+        Redoes the group delete action.
+        """
+        doomed = set(self.objects)
+        for objects in (self.app.HDF.connectors, self.app.HDF.wires):
+            kept = []
+            for obj in objects:
+                if obj in doomed:
+                    bus.emit(DELETED, obj)
+                else:
+                    kept.append(obj)
+            objects[:] = kept
+
+class RouteAction:
+    """
+    An action that represents rerouting wires.
+    """
+    def __init__(self, changes):
+        """
+        Initializes a RouteAction with the wires as they are now, after routing.
+
+        Args:
+            changes: Tuples of (wire, nodes, lengths) with each wire's nodes and lengths before it
+                was routed.
+        """
+        self.changes = [(wire, nodes, lengths, list(wire.nodes), list(wire.lengths))
+                        for wire, nodes, lengths in changes]
+
+    def undo(self):
+        """
+        Undoes the route action.
+        """
+        for wire, old_nodes, old_lengths, _, _ in self.changes:
+            wire.nodes[:] = old_nodes
+            wire.lengths = old_lengths
+            bus.emit(CHANGED, wire, property="nodes")
+
+    def redo(self):
+        """
+        Redoes the route action.
+        """
+        for wire, _, _, new_nodes, new_lengths in self.changes:
+            wire.nodes[:] = new_nodes
+            wire.lengths = new_lengths
+            bus.emit(CHANGED, wire, property="nodes")
+
+class LayoutAction:
+    """
+    An action that represents placing connectors automatically.
+    """
+    def __init__(self, connectors, old_centers, nodes, old_points, wires):
+        """
+        Initializes a LayoutAction with the connectors and bend nodes where they are now, after
+        the layout.
+
+        Args:
+            connectors: The connectors that were placed.
+            old_centers: The centers of the connectors before.
+            nodes: The bend nodes of the wires on the connectors.
+            old_points: The (x, y) positions of the nodes before.
+            wires: The wires on the connectors.
+        """
+        self.connectors = connectors
+        self.old_centers = old_centers
+        self.new_centers = [c.rect.center for c in connectors]
+        self.nodes = nodes
+        self.old_points = old_points
+        self.new_points = [(n.x, n.y) for n in nodes]
+        self.wires = wires
+
+    def _place(self, centers, points):
+        """
+        Moves the connectors and nodes to the given positions.
+        """
+        for c, center in zip(self.connectors, centers):
+            c.rect.center = center
+            c.update()
+            bus.emit(MOVED, c)
+        for n, (x, y) in zip(self.nodes, points):
+            n.x = x
+            n.y = y
+        for w in self.wires:
+            bus.emit(MOVED, w)
+
+    def undo(self):
+        """
+        Undoes the layout action.
+        """
+        self._place(self.old_centers, self.old_points)
+
+    def redo(self):
+        """
+        Redoes the layout action.
+        """
+        self._place(self.new_centers, self.new_points)
+
+
 class CopyAction:
     """
     An action that represents copying an object.
@@ -239,9 +454,11 @@ class PasteAction:
             if isinstance(obj, self.app.HarnessComponents.Connector):
                 if obj in self.app.HDF.connectors:
                     self.app.HDF.connectors.remove(obj)
+                    bus.emit(DELETED, obj)
             elif isinstance(obj, self.app.HarnessComponents.Wire):
                 if obj in self.app.HDF.wires:
                     self.app.HDF.wires.remove(obj)
+                    bus.emit(DELETED, obj)
 
     def redo(self):
         """
@@ -251,6 +468,8 @@ class PasteAction:
             if isinstance(obj, self.app.HarnessComponents.Connector):
                 if obj not in self.app.HDF.connectors:
                     self.app.HDF.connectors.append(obj)
+                    bus.emit(CREATED, obj)
             elif isinstance(obj, self.app.HarnessComponents.Wire):
                 if obj not in self.app.HDF.wires:
                     self.app.HDF.wires.append(obj)
+                    bus.emit(CREATED, obj)